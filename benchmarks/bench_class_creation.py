@@ -0,0 +1,185 @@
+"""
+Benchmark of the creation of programmable tuple classes
+
+The time for defining many classes is measured, as what happens when a large
+number of programmable tuple classes are defined at import time. The time
+for the first construction of an object of each class is measured
+separately, since some of the preparation of the classes is deferred to it.
+
+The package in this checkout is measured alongside the package at another
+revision of the repository, by default the first revision, which is the
+original code. Each measurement is run in a fresh process, alternating
+between the revisions, so that they are affected by the noise of the machine
+alike, and the best of the repetitions is reported.
+
+Run it with ``python benchmarks/bench_class_creation.py`` from anywhere in a
+git checkout. The revision to compare against is given by ``--against``, and
+an empty revision only measures the package in this checkout.
+"""
+
+
+import argparse
+import io
+import os.path
+import subprocess
+import sys
+import tarfile
+import tempfile
+import time
+
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def define_classes(n_classes, bases):
+    """Defines the given number of classes of various kinds
+
+    :param bases: The pair of the programmable tuple and expression bases.
+    :returns: The list of the classes with their arguments for construction.
+    """
+
+    classes = []
+    for i in range(n_classes):
+        base = bases[i % 2]
+
+        class Point(base, auto_defining=True):
+            """A point with its norm"""
+
+            __data_fields__ = ['norm']
+
+            def __init__(self, x, y):
+                """Initializes the point"""
+                self.norm = abs(x) + abs(y)
+
+            def flip(self):
+                """Gets the flipped point"""
+                return self._update(x=self.y, y=self.x)
+
+        class Labelled(Point):
+            """A point with a label"""
+
+            __data_fields__ = ['upper']
+
+            def __init__(self, x, y, label):
+                """Initializes the labelled point"""
+                self.super().__init__(x, y)
+                self.label = label
+                self.upper = label.upper()
+
+        classes.append((Point, (1, 2)))
+        classes.append((Labelled, (1, 2, 'a')))
+        continue
+
+    return classes
+
+
+def measure(package_dir, n_classes):
+    """Measures the package in the given directory in this process
+
+    :returns: The times in seconds for defining the classes and for their
+        first construction.
+    """
+
+    sys.path.insert(0, package_dir)
+    from programmabletuple import ProgrammableTuple, ProgrammableExpr
+
+    begin = time.perf_counter()
+    classes = define_classes(
+        n_classes, (ProgrammableTuple, ProgrammableExpr)
+    )
+    define_time = time.perf_counter() - begin
+
+    begin = time.perf_counter()
+    for cls, cls_args in classes:
+        cls(*cls_args)
+        continue
+    construct_time = time.perf_counter() - begin
+
+    return define_time, construct_time
+
+
+def extract_revision(rev, dest):
+    """Extracts the package at the given revision into the directory"""
+    archive = subprocess.run(
+        ['git', '-C', ROOT, 'archive', '--format=tar', rev,
+         'programmabletuple'],
+        stdout=subprocess.PIPE, check=True
+    ).stdout
+    with tarfile.open(fileobj=io.BytesIO(archive)) as tar:
+        tar.extractall(dest)
+
+
+def find_first_revision():
+    """Finds the first revision of the repository"""
+    return subprocess.run(
+        ['git', '-C', ROOT, 'rev-list', '--max-parents=0', 'HEAD'],
+        stdout=subprocess.PIPE, check=True, universal_newlines=True
+    ).stdout.split()[-1][0:7]
+
+
+def run_measurement(package_dir, n_classes):
+    """Runs a measurement in a fresh process"""
+    output = subprocess.run(
+        [sys.executable, os.path.abspath(__file__), '-n', str(n_classes),
+         '--package-dir', package_dir],
+        stdout=subprocess.PIPE, check=True, universal_newlines=True
+    ).stdout
+    return tuple(float(i) for i in output.split())
+
+
+def main():
+    """Runs the benchmark"""
+
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    parser.add_argument('-n', type=int, default=500,
+                        help='The number of pairs of classes to define')
+    parser.add_argument('-r', type=int, default=5,
+                        help='The number of repetitions')
+    parser.add_argument('--against', default=None,
+                        help='The revision to compare against')
+    parser.add_argument('--package-dir', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.package_dir is not None:
+        print('{} {}'.format(*measure(args.package_dir, args.n)))
+        return
+
+    against = args.against
+    if against is None:
+        against = find_first_revision()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        packages = [('this checkout', ROOT)]
+        if against:
+            extract_revision(against, tmp)
+            packages.append((against, tmp))
+
+        best = [None] * len(packages)
+        for _ in range(args.r):
+            for idx, (_, package_dir) in enumerate(packages):
+                times = run_measurement(package_dir, args.n)
+                if best[idx] is None:
+                    best[idx] = times
+                else:
+                    best[idx] = tuple(map(min, best[idx], times))
+                continue
+            continue
+
+    n_classes = args.n * 2
+    print('{:28}'.format('us per class') + ''.join(
+        '{:>16}'.format(label) for label, _ in packages
+    ))
+    rows = [
+        ('Class definition', [i[0] for i in best]),
+        ('First construction', [i[1] for i in best]),
+        ('Total', [i[0] + i[1] for i in best]),
+    ]
+    for title, times in rows:
+        print('{:28}'.format(title) + ''.join(
+            '{:16.2f}'.format(i / n_classes * 1e6) for i in times
+        ))
+        continue
+
+
+if __name__ == '__main__':
+    main()
@@ -6,9 +6,19 @@ Programmable tuple
 """
 
 
+import builtins
 import functools
+import inspect
 import itertools
 import collections
+import collections.abc
+import dis
+import operator
+import pickle
+import threading
+import time
+import types
+import weakref
 
 
 #
@@ -37,8 +47,49 @@ class ProgrammableTupleMeta(type):
 
     """
 
-    def __new__(mcs, name, bases, nmspc, auto_defining=False):
-        """Generates a new type instance for programmable tuple class"""
+    def __new__(mcs, name, bases, nmspc, auto_defining=False,
+                cache_hash=False, intern=False, pickle_content=False,
+                memoize=False, memoize_ttl=None, memoize_typed=False,
+                proxy_dict=False):
+        """Generates a new type instance for programmable tuple class
+
+        :param bool auto_defining: If the defining fields are going to be
+            assigned automatically from the arguments of the initializer.
+        :param bool cache_hash: If the hash of the objects is going to be
+            computed only once and cached in a hidden slot. The hash
+            function given in the class is cached as well, which needs to be
+            given whenever the equality comparison is given. This is only
+            supported for classes that are not tuple subclasses, and the
+            caching is inherited by subclasses.
+        :param bool intern: If the objects are going to be interned, so that
+            objects with equal values of the same types for the defining
+            fields are going to be the same object. This holds for objects
+            constructed, made directly by methods like :py:meth:`_make` and
+            :py:meth:`_replace`, or unpickled with the content, where
+            different values of the data fields raise ValueError. The
+            canonical objects are held weakly, and this is only supported
+            for classes that are not tuple subclasses.
+        :param bool pickle_content: If the objects are going to be pickled
+            with the values of all the fields and unpickled without running
+            the initializer. Under protocol 5, bytes and bytearray fields are
+            pickled as buffers able to be transferred out of band. This is
+            inherited by subclasses.
+        :param memoize: If the objects constructed are going to be cached by
+            the arguments to the initializer, so that constructions with
+            equal arguments give the cached object without running the
+            initializer. True for an unbounded cache, or an integer for the
+            maximum size of a least-recently-used cache. This is only for the
+            class itself, not its subclasses.
+        :param float memoize_ttl: The number of seconds the objects are kept
+            in the construction cache.
+        :param bool memoize_typed: If arguments of different types are cached
+            separately, like ``1`` and ``1.0``.
+        :param bool proxy_dict: If the proxy objects for the initialization
+            are going to have a dictionary, so that the initializer can set
+            attributes other than the fields, like temporaries. By default,
+            the proxy objects only have slots for the fields. This is
+            inherited by subclasses.
+        """
 
         # Make a shallow copy of the original namespace. This new copy can be
         # used for the new programmable tuple class, while the original copy
@@ -46,31 +97,132 @@ class ProgrammableTupleMeta(type):
         new_nmspc = dict(nmspc)
 
         # Fields determination.
-        fields, defining_count = _determine_fields(bases, new_nmspc)
+        arg_layout = _ArgLayout(nmspc.get('__init__'))
+        fields, defining_count = _determine_fields(
+            bases, new_nmspc, arg_layout
+        )
+        lazy_fields = _determine_lazy_fields(new_nmspc, fields)
+        derived_fields = _determine_derived_fields(
+            bases, new_nmspc, fields, defining_count
+        )
+
+        # Whether the content is going to be held by the tuple itself.
+        is_tuple = any(issubclass(i, tuple) for i in bases)
+        if is_tuple and cache_hash:
+            raise ValueError(
+                'Hash caching is not supported for tuple subclasses.'
+            )
+        if cache_hash and '__eq__' in nmspc and '__hash__' not in nmspc:
+            raise ValueError(
+                'Hash caching needs __hash__ given together with __eq__.'
+            )
+        if is_tuple and intern:
+            raise ValueError(
+                'Interning is not supported for tuple subclasses.'
+            )
+        if is_tuple and lazy_fields:
+            raise ValueError(
+                'Lazy fields are not supported for tuple subclasses.'
+            )
 
-        # Prepare the proxy class for initialization.
-        proxy_class = _form_proxy_class(name, bases, nmspc, auto_defining)
+        # The table of canonical objects for interning.
+        intern_table = weakref.WeakValueDictionary() if intern else None
 
-        # Patch the initialization methods.
-        new_nmspc['__new__'] = _form_new_method(proxy_class)
-        new_nmspc['__init__'] = _form_init_method(proxy_class.__init__)
+        # The cache of constructed objects.
+        if memoize:
+            construction_cache = _ConstructionCache(
+                None if memoize is True else memoize, memoize_ttl,
+                memoize_typed
+            )
+        elif memoize_ttl is not None:
+            raise ValueError(
+                'Time to live is given without memoization.'
+            )
+        elif memoize_typed:
+            raise ValueError(
+                'Typed caching is given without memoization.'
+            )
+        else:
+            construction_cache = None
 
         # Set empty slots for tuple subclasses, since all the information is
         # going to be handled by the tuple. Or we need a slot for the actual
-        # content.
-        if any(issubclass(i, tuple) for i in bases):
-            slots = []
-        else:
-            slots = ['__content__']
+        # content, and possibly the cached hash, unless they are already
+        # given by a base class.
+        slots = []
+        if not is_tuple:
+            if not _has_attr(bases, '__content__'):
+                slots.append('__content__')
+            if cache_hash and not _has_attr(bases, _HASH_SLOT):
+                slots.append(_HASH_SLOT)
+            if intern and not _has_attr(bases, '__weakref__'):
+                slots.append('__weakref__')
+            for fn, _ in lazy_fields:
+                if not _has_attr(bases, _LAZY_SLOT.format(fn)):
+                    slots.append(_LAZY_SLOT.format(fn))
+                continue
         new_nmspc['__slots__'] = slots
 
+        # Set some fields in the new class, since they are going to be used.
+        # They are given in the name space, which is cheaper than setting
+        # them on the class afterwards.
+        new_nmspc.update(
+            __fields__=fields,
+            __defining_count__=defining_count,
+            __proxy_spec__=(name, bases, nmspc, auto_defining, is_tuple),
+            # Extra keyword arguments are assigned as attributes of any
+            # names, and lazy fields are cached in the dictionary of the
+            # proxy objects.
+            __proxy_dict__=proxy_dict or any(
+                i.__proxy_dict__ for i in _gen_programmable_tuple_bases(bases)
+            ) or (
+                auto_defining and arg_layout.var_keyword is not None
+            ) or len(lazy_fields) > 0,
+            __arg_layout__=arg_layout,
+            __intern_table__=intern_table,
+            __construction_cache__=construction_cache,
+            __derived_fields__=derived_fields,
+            __update_plan__=_form_update_plan(
+                fields, defining_count, derived_fields, intern_table
+            ),
+        )
+
+        # Patch the initialization methods. The proxy class for the
+        # initialization, together with the specialized __new__ method, is
+        # only formed on the first construction, so that defining many
+        # classes at import time stays cheap. The methods are given in the
+        # name space as well when the initializer is given in the class.
+        raw_init = nmspc.get('__init__')
+        if raw_init is not None:
+            new_nmspc['__new__'], new_nmspc['__init__'] = _form_init_methods(
+                lambda: cls, raw_init, nmspc.get('__qualname__', name)
+            )
+
+        # Pickle the content directly.
+        if pickle_content:
+            new_nmspc['__reduce_ex__'] = _reduce_content
+
         # Initialize the programmable tuple class.
         cls = type.__new__(mcs, name, bases, new_nmspc)
+        if raw_init is None:
+            cls.__new__, cls.__init__ = _form_init_methods(
+                lambda: cls, super(cls, cls).__init__, cls.__qualname__
+            )
 
-        # Update some fields in the new class, since they are going to be used.
-        cls.__fields__ = fields
-        cls.__defining_count__ = defining_count
-        cls.__Proxy_Class__ = proxy_class
+        # Install the descriptors for reading the fields.
+        _install_field_descriptors(cls, fields, is_tuple)
+        _install_lazy_fields(cls, lazy_fields)
+
+        # Install the hash function with caching, and the equality
+        # comparison taking advantage of it. The ones given in the class are
+        # kept, with the hash function given cached as well.
+        if cache_hash:
+            hash_slot = _get_class_attr(cls, _HASH_SLOT)
+            cls.__hash__ = _form_cached_hash(
+                hash_slot, nmspc.get('__hash__')
+            )
+            if '__eq__' not in nmspc:
+                cls.__eq__ = _form_cached_eq(hash_slot)
 
         # Return the new class
         return cls
@@ -84,6 +236,73 @@ class ProgrammableTupleMeta(type):
 
         super().__init__(*args)
 
+    @property
+    def __Proxy_Class__(cls):
+        """The proxy class for the initialization
+
+        It is formed on the first access, normally by the first construction
+        of an object of the class.
+        """
+        try:
+            return cls.__dict__['__proxy_class__']
+        except KeyError:
+            return _build_proxy_class(cls)
+
+
+#
+# The public decorators
+# ---------------------
+#
+
+
+def lazy_field(func):
+    """Decorates a method into a lazily computed data field
+
+    The method is called with the object to compute the value of the field on
+    its first access, and the value is cached in a hidden slot of the object.
+    Different from the data fields in ``__data_fields__``, lazy fields are
+    not set during the initialization, and they are not contained in the
+    ``__fields__`` of the class. So they are not compared, hashed, pickled or
+    serialized, and objects from :py:meth:`_update`, :py:meth:`_make` or
+    :py:meth:`_load_from_dict` compute them only when they are accessed.
+
+    The value should depend only on the fields of the object. Lazy fields
+    are only supported for classes that are not tuple subclasses.
+    """
+    return _LazyField(func)
+
+
+def derived_field(*defining_names):
+    """Decorates a method into a data field derived from defining fields
+
+    The decorated method computes the value of the data field from the
+    object. During the initialization, it is called only when the field is
+    not set by the initializer. The given names of the defining fields that
+    the value depends on are used by :py:meth:`_update`. When all the data
+    fields of a class are derived fields with their dependencies declared,
+    updating the defining fields no longer runs the initializer. The values
+    of the unaffected data fields are copied, and only the derived fields
+    depending on the updated fields are computed again. So any validation in
+    the initializer is skipped by the updating, and such classes should have
+    initializers doing nothing more than setting the defining fields. For
+    them, setting the derived fields in the initializer raises ValueError.
+
+    Derived fields can read other derived fields, which are computed on
+    their first access during both the initialization and the updating. The
+    dependencies of such a field need to include the dependencies of the
+    fields it reads.
+
+    :param defining_names: The names of the defining fields that the value
+        depends on. When none is given, the dependencies are unknown and the
+        updating always runs the initializer.
+    """
+
+    def decorator(func):
+        """Decorates the method"""
+        return _DerivedField(func, defining_names if defining_names else None)
+
+    return decorator
+
 
 #
 # The private functions
@@ -94,11 +313,13 @@ class ProgrammableTupleMeta(type):
 #
 
 
-def _determine_fields(bases, nmspc):
+def _determine_fields(bases, nmspc, arg_layout):
     """Determines the fields for the new programmable tuple
 
     :param tuple bases: The base classes of the new class
     :param dict nmspc: The name space dictionary for the new class
+    :param _ArgLayout arg_layout: The layout of the arguments of the
+        initializer, which gives the defining fields.
     :returns: The ordered dictionary of all the fields of the new class, field
         names as keys and the location as values. The order is consistent
         with the order of the fields. And the number of defining fields.
@@ -116,19 +337,13 @@ def _determine_fields(bases, nmspc):
     # The new data fields that is added for this class
     if '__data_fields__' in nmspc:
         fields.update(nmspc['__data_fields__'])
+    fields.update(
+        fn for fn, val in nmspc.items() if isinstance(val, _DerivedField)
+    )
 
     # Get all the defining fields
-    try:
-        init_meth = nmspc['__init__']
-        init_argnames = _get_argnames(init_meth)
-    except KeyError:
-        defining_fields = []
-        defining_count = 0
-    except AttributeError:
-        raise ValueError('Initializer needs to be a function.')
-    else:
-        defining_fields = init_argnames[1:]
-        defining_count = len(defining_fields)
+    defining_fields = arg_layout.names
+    defining_count = len(defining_fields)
 
     # Remove the defining fields that is already added as data fields from
     # base classes.
@@ -143,13 +358,285 @@ def _determine_fields(bases, nmspc):
     return fields, defining_count
 
 
+#
+# Argument layout
+# ^^^^^^^^^^^^^^^
+#
+
+
+_BIND_TEMPLATE = """\
+def __init__({params}):
+    return ({values}), {extra}
+"""
+
+
+class _ArgLayout(object):
+
+    """Layout of the arguments of the initializer of a class
+
+    The defining fields are the parameters of the initializer after
+    ``self``, with the positional parameters, the parameter for extra
+    positional arguments, and the keyword-only parameters in that order. The
+    value of the field for extra positional arguments is the tuple of them.
+    Extra keyword arguments are not defining fields.
+
+    The layout is resolved once for each class from the code of the
+    initializer, which is cheap enough for the creation of the class. The
+    binding of arguments to the defining fields is done by a function
+    generated with the same parameters and defaults as the initializer, so
+    that the binding is done by the interpreter, with its usual errors for
+    invalid arguments. It gives the tuple of the values of the defining
+    fields, and the dictionary of extra keyword arguments, or None when they
+    are not accepted. The function is only generated on first use, normally
+    with the proxy class, and its code is shared by the initializers of the
+    same shape, with only the names of the parameters replaced.
+    """
+
+    __slots__ = [
+        'names',
+        'n_positional',
+        'var_positional',
+        'var_keyword',
+        '_init',
+        '_n_positional_only',
+        '_bind',
+    ]
+
+    def __init__(self, init):
+        """Resolves the layout of the arguments of an initializer
+
+        :param init: The initializer given in the class, None when it is
+            inherited, in which case there is no defining field and no
+            binding function.
+        """
+
+        self.names = ()
+        self.n_positional = 0
+        self.var_positional = False
+        self.var_keyword = None
+        self._init = None
+        self._n_positional_only = 0
+        self._bind = None
+
+        if init is None:
+            return
+        if not hasattr(init, '__code__'):
+            raise ValueError('Initializer needs to be a function.')
+
+        # The first argument is for self.
+        code = init.__code__
+        n_args = code.co_argcount
+        if n_args == 0:
+            return
+        n_kw_only = code.co_kwonlyargcount
+        varnames = code.co_varnames
+
+        names = list(varnames[1:n_args])
+        kw_only = varnames[n_args:n_args + n_kw_only]
+        extra_idx = n_args + n_kw_only
+        if code.co_flags & inspect.CO_VARARGS:
+            self.var_positional = True
+            names.append(varnames[extra_idx])
+            extra_idx += 1
+        if code.co_flags & inspect.CO_VARKEYWORDS:
+            self.var_keyword = varnames[extra_idx]
+        names.extend(kw_only)
+
+        self.names = tuple(names)
+        self.n_positional = n_args - 1
+        self._init = init
+        self._n_positional_only = max(code.co_posonlyargcount - 1, 0)
+
+    @property
+    def bind(self):
+        """The function binding the arguments, None for unknown layouts"""
+        if self._bind is None and self._init is not None:
+            self._bind = self._form_bind()
+        return self._bind
+
+    def _form_bind(self):
+        """Forms the function binding the arguments"""
+
+        init = self._init
+        names = self.names
+        n_positional = self.n_positional
+        n_defaults = len(init.__defaults__ or ())
+        kw_defaults = init.__kwdefaults__ or {}
+
+        n_positional_only = self._n_positional_only
+        var_positional = self.var_positional
+        kw_start = n_positional + 1 if var_positional else n_positional
+        kw_with_defaults = tuple(i in kw_defaults for i in names[kw_start:])
+        var_keyword = self.var_keyword
+        shape = (
+            '__init__', n_positional, n_defaults, n_positional_only,
+            var_positional, kw_with_defaults, var_keyword is not None
+        )
+
+        # The parameters are generated by placeholders, which are renamed
+        # into the actual names. The actual defaults are set on the function
+        # afterwards.
+        if var_keyword is not None:
+            names += (var_keyword, )
+
+        def form_source():
+            """Forms the source code for the shape"""
+            params = [_form_placeholder(i) for i in range(len(names))]
+            if var_keyword is None:
+                extra = None
+            else:
+                extra = params.pop()
+            srcs = []
+            for idx, param in enumerate(params[0:n_positional]):
+                if idx >= n_positional - n_defaults:
+                    srcs.append('{}=None'.format(param))
+                else:
+                    srcs.append(param)
+                if idx + 1 == n_positional_only:
+                    srcs.append('/')
+                continue
+            if var_positional:
+                srcs.append('*' + params[n_positional])
+            elif kw_start < len(names):
+                srcs.append('*')
+            for param, default in zip(params[kw_start:], kw_with_defaults):
+                if default:
+                    srcs.append('{}=None'.format(param))
+                else:
+                    srcs.append(param)
+                continue
+            if extra is not None:
+                srcs.append('**' + extra)
+            return _BIND_TEMPLATE.format(
+                params=', '.join(srcs),
+                values=''.join('{}, '.format(i) for i in params),
+                extra=extra
+            )
+
+        # Make the errors for invalid arguments name the initializer.
+        bind = _form_generated_function(
+            shape, form_source, '__init__', {}, names, init.__qualname__
+        )
+        bind.__defaults__ = init.__defaults__
+        bind.__kwdefaults__ = init.__kwdefaults__
+        return bind
+
+    def split(self, values):
+        """Splits the values of the defining fields into arguments
+
+        :returns: The positional and the keyword arguments for the
+            initializer to get the given values of the defining fields.
+        """
+
+        n_positional = self.n_positional
+        if self.var_positional:
+            args = tuple(values[0:n_positional]) + tuple(values[n_positional])
+            n_positional += 1
+        else:
+            args = tuple(values[0:n_positional])
+        kwargs = dict(zip(
+            self.names[n_positional:], values[n_positional:]
+        ))
+        return args, kwargs
+
+
+def _make_from_defining(cls, values):
+    """Makes an object of a class through the initializer
+
+    :param values: The values of the defining fields of the class.
+    """
+    args, kwargs = cls.__arg_layout__.split(values)
+    return cls(*args, **kwargs)
+
+
 #
 # Proxy class formation
 # ^^^^^^^^^^^^^^^^^^^^^
 #
 
 
-def _form_proxy_class(name, bases, orig_nmspc, auto_defining):
+_PROXY_LOCK = threading.RLock()
+
+
+def _build_proxy_class(cls):
+    """Builds the proxy class of a class
+
+    This is deferred from the creation of the class to the first access of
+    its proxy class, normally by the first construction of an object of a
+    subclass. The proxy classes of the programmable tuple bases are built
+    recursively on the way, hence the lock is reentrant.
+    """
+
+    with _PROXY_LOCK:
+        # Another thread could have built it while we are waiting.
+        if '__proxy_class__' in cls.__dict__:
+            return cls.__dict__['__proxy_class__']
+
+        proxy_class = _form_proxy_class(cls)
+        cls.__proxy_class__ = proxy_class
+
+    return proxy_class
+
+
+def _build_new_method(cls):
+    """Builds the actual __new__ method of a class
+
+    This is deferred from the creation of the class to its first
+    construction. The class of the proxy objects is formed directly from the
+    name space of the class, rather than as a subclass of the proxy class,
+    so that classes not subclassed never need their proxy classes.
+    """
+
+    with _PROXY_LOCK:
+        if '__slotted_class__' in cls.__dict__:
+            return
+
+        is_tuple = cls.__proxy_spec__[4]
+        slotted_class = _form_proxy_class(cls, slotted=True)
+        cls.__new__ = staticmethod(_form_new_method(
+            slotted_class, cls.__fields__, cls.__defining_count__, is_tuple,
+            cls.__proxy_spec__[3], cls.__arg_layout__,
+            cls.__intern_table__, cls.__construction_cache__
+        ))
+        cls.__slotted_class__ = slotted_class
+
+    return
+
+
+def _form_lazy_new_method(raw_init, qualname):
+    """Forms the stub __new__ method before the proxy class is built
+
+    On the first call, the actual __new__ method is built, and the stub
+    replaces itself with the actual method.
+    """
+
+    def __new__(_cls, *args, **kwargs):
+        """Builds the actual __new__ method and delegates to it"""
+        _build_new_method(_cls)
+        return _cls.__new__(_cls, *args, **kwargs)
+
+    return _wrap_new_method(__new__, raw_init, qualname)
+
+
+def _form_init_methods(get_cls, raw_init, qualname):
+    """Forms the initialization methods of a class before it is built
+
+    :param get_cls: The function getting the class, which is only called
+        when the methods are called.
+    :param raw_init: The initializer as written, or as inherited.
+    :param str qualname: The qualified name of the class.
+    :returns: The stub __new__ method, as a static method, and the
+        decorated initializer.
+    """
+    return (
+        staticmethod(_form_lazy_new_method(raw_init, qualname)),
+        _form_init_method(
+            lambda: get_cls().__Proxy_Class__.__init__, raw_init
+        )
+    )
+
+
+def _form_proxy_class(cls, slotted=False):
     """Forms a proxy class for initializing programmable tuple
 
     The generated proxy class will have got all the behaviour of the new
@@ -158,30 +645,64 @@ def _form_proxy_class(name, bases, orig_nmspc, auto_defining):
     ``self``. Then the actual defining and data fields can be read from the
     proxy object and set in the actual immutable class instance.
 
-    :param str name: The name of the new named tuple class
-    :param tuple bases: The basis of the new named tuple class
-    :param dict orig_nmspc: The name space dictionary of the named tuple class
-        before any tweaking by the programmable tuple metaclass.
-    :param bool auto_defining: If the defining attributes are going to be
-        automatically assigned.
+    The proxy classes have empty slots, so that they can be combined freely
+    for multiple inheritance. The objects are actually created from a
+    slotted proxy class, which is formed in the same way from the proxy
+    classes of the bases, just with the slots for the fields, rather than a
+    dictionary. The dictionary is still given when it is needed by the
+    class, like for lazy fields whose descriptors cache the values in the
+    dictionary of the proxy objects, or when some fields cannot have slots
+    due to attributes of the proxy class with the same name.
+
+    For classes updated incrementally, the derived fields are guarded in the
+    slotted proxy class against being set by the initializer, since the
+    updating would not set them in the same way.
+
+    :param cls: The programmable tuple class.
+    :param bool slotted: If the slotted proxy class is to be formed.
     """
 
+    name, bases, orig_nmspc, auto_defining, _ = cls.__proxy_spec__
+    arg_layout = cls.__arg_layout__
+
     # Retrieve the proxy classes for the base classes.
     proxy_bases = tuple(
         i.__Proxy_Class__ for i in _gen_programmable_tuple_bases(bases)
     )
+    if len(proxy_bases) == 0:
+        proxy_bases = (object, )
 
     # Derive the new proxy class from the proxy classes of the bases.
-    proxy_class = type(
-        '{}ProxyClass'.format(name),
-        proxy_bases if len(proxy_bases) > 0 else (object, ),
-        orig_nmspc
-    )
+    proxy_nmspc = dict(orig_nmspc)
+    if slotted:
+        fields = cls.__fields__
+        slots = [
+            fn for fn in fields if fn not in proxy_nmspc and fn != 'super'
+            and not _has_attr(proxy_bases, fn)
+        ]
+        if cls.__proxy_dict__ or len(slots) < len(fields):
+            slots.append('__dict__')
+        if cls.__update_plan__ is not None:
+            for fn, (func, _) in cls.__derived_fields__.items():
+                proxy_nmspc[fn] = _GuardedDerivedField(func, fn)
+                continue
+    else:
+        slots = ()
+    proxy_nmspc['__slots__'] = slots
 
     # Decorate the initializer if automatic assignment of defining class is
     # requested.
-    if auto_defining:
-        proxy_class.__init__ = _add_auto_defining(proxy_class.__init__)
+    init = proxy_nmspc.get('__init__')
+    if auto_defining and init is not None:
+        proxy_nmspc['__init__'] = _add_auto_defining(init, arg_layout)
+
+    proxy_class = type(
+        '{}ProxyClass'.format(name), proxy_bases, proxy_nmspc
+    )
+    if auto_defining and init is None:
+        proxy_class.__init__ = _add_auto_defining(
+            proxy_class.__init__, arg_layout
+        )
 
     # HACK: Patch a local version of the built-in super function so that any
     # calling with programmable tuple class will in fact be dispatched to the
@@ -190,132 +711,1462 @@ def _form_proxy_class(name, bases, orig_nmspc, auto_defining):
     def patched_super(self, cls=proxy_class):
         """Patched super function for initialization"""
         if isinstance(cls, ProgrammableTupleMeta):
-            cls = cls.__Proxy_Class__
+            if cls.__dict__.get('__slotted_class__') is type(self):
+                cls = type(self)
+            else:
+                cls = cls.__Proxy_Class__
         return super(cls, self)
     proxy_class.super = patched_super
 
     return proxy_class
 
 
-def _add_auto_defining(init):
+def _add_auto_defining(init, arg_layout):
     """Decorates __init__ to assign defining fields automatically
 
     After the decoration, all the arguments will be assigned as attributes of
-    ``self`` before the invocation of the actual initializer.
+    ``self`` before the invocation of the actual initializer, according to
+    the layout of the arguments, with the defaults filled in. The original
+    initializer can be retrieved from the ``__wrapped__`` attribute of the
+    result.
     """
 
+    bind = arg_layout.bind
+    names = arg_layout.names
+
     @functools.wraps(init)
     def decorated(self, *args, **kwargs):
         """The decorated initializer"""
 
-        # Get the names of the defining fields.
-        argnames = _get_argnames(init)
+        # Assign all the values given to the initializer.
+        if bind is not None:
+            values, extra = bind(*args, **kwargs)
+            for field, value in zip(names, values):
+                setattr(self, field, value)
+                continue
+            if extra:
+                for field, value in extra.items():
+                    setattr(self, field, value)
+                    continue
+
+        # Invoke the actual initializer.
+        init(self, *args, **kwargs)
+
+    return decorated
+
+
+#
+# Field descriptors
+# ^^^^^^^^^^^^^^^^^
+#
+
+
+_MISSING = object()
+
+
+class _FieldProperty(property):
+
+    """Property for reading a field of programmable tuples
+
+    This subclass of the built-in property is used merely to tell the
+    descriptors installed by the metaclass apart from the ones given by the
+    users.
+    """
+
+    pass
+
+
+def _install_field_descriptors(cls, fields, is_tuple):
+    """Installs the descriptors for the fields of a programmable tuple class
+
+    Similar to the ``namedtuple`` in the standard library, each field is
+    given a property reading the value at its location. Tuple subclasses
+    read directly from the tuple by ``operator.itemgetter``, while others read
+    from the content tuple.
+
+    Since the locations of the fields can change in subclasses, the
+    descriptors from the base classes are always overridden. But any other
+    attribute with the same name as a field is retained, the same as the
+    resolution of the fields by the ``__getattr__`` method.
+    """
+
+    for fn, idx in fields.items():
+
+        # The attribute is looked up through the cached resolution of the
+        # class first, and only other attributes are checked exactly.
+        attr = getattr(cls, fn, _MISSING)
+        if attr is not _MISSING and not isinstance(attr, _FieldProperty):
+            try:
+                attr = _get_class_attr(cls, fn)
+            except AttributeError:
+                pass
+            else:
+                if not isinstance(attr, _FieldProperty):
+                    continue
+
+        if is_tuple:
+            getter = operator.itemgetter(idx)
+        else:
+            getter = _form_content_getter(idx)
+
+        setattr(cls, fn, _FieldProperty(
+            getter, doc='Alias for field number {}'.format(idx)
+        ))
+        continue
+
+    return
+
+
+def _form_content_getter(idx):
+    """Forms the getter for a field stored in the content tuple"""
+
+    def getter(self):
+        """Gets the field from the content"""
+        return self.__content__[idx]
+
+    return getter
+
+
+#
+# Lazy fields
+# ^^^^^^^^^^^
+#
+
+
+_LAZY_SLOT = '__lazy_{}__'
+
+
+class _LazyField(object):
+
+    """Lazily computed data field
+
+    Objects of this class are given by the :py:func:`lazy_field` decorator.
+    In the proxy classes, they serve as non-data descriptors caching the
+    value in the dictionary of the proxy object. In the programmable tuple
+    classes, they are replaced by properties caching the value in the hidden
+    slot.
+    """
+
+    def __init__(self, func):
+        """Initializes the lazy field with the function computing it"""
+        self.func = func
+        self.name = func.__name__
+        self.__doc__ = func.__doc__
+
+    def __set_name__(self, owner, name):
+        """Sets the name of the field"""
+        self.name = name
+
+    def __get__(self, obj, owner=None):
+        """Computes the value for proxy objects and caches it"""
+        if obj is None:
+            return self
+        val = self.func(obj)
+        obj.__dict__[self.name] = val
+        return val
+
+
+def _determine_lazy_fields(nmspc, fields):
+    """Determines the lazy fields newly defined in a class
+
+    :returns: The list of pairs of the names of the lazy fields and their
+        functions.
+    """
+
+    lazy_fields = []
+    for fn, val in nmspc.items():
+        if type(val) is not _LazyField:
+            continue
+        if fn in fields:
+            raise ValueError(
+                'Lazy field {} cannot be a normal field as well.'.format(fn)
+            )
+        lazy_fields.append((fn, val.func))
+        continue
+
+    return lazy_fields
+
+
+def _install_lazy_fields(cls, lazy_fields):
+    """Installs the properties for the lazy fields of a class"""
+
+    for fn, func in lazy_fields:
+        slot = _get_class_attr(cls, _LAZY_SLOT.format(fn))
+        setattr(cls, fn, property(
+            _form_lazy_getter(func, slot), doc=func.__doc__
+        ))
+        continue
+
+    return
+
+
+def _form_lazy_getter(func, slot):
+    """Forms the getter of a lazy field cached in the given slot
+
+    Similar to the hash caching, the slot is accessed through its descriptor
+    directly to bypass the immutability of the programmable tuples.
+    """
+
+    get_cache = slot.__get__
+    set_cache = slot.__set__
+
+    def getter(self):
+        """Gets the cached value or computes it"""
+        try:
+            return get_cache(self)
+        except AttributeError:
+            pass
+        val = func(self)
+        set_cache(self, val)
+        return val
+
+    return getter
+
+
+#
+# Derived fields
+# ^^^^^^^^^^^^^^
+#
+
+
+class _DerivedField(_LazyField):
+
+    """Data field derived from defining fields
+
+    Objects of this class are given by the :py:func:`derived_field`
+    decorator. In the proxy classes, they compute the value of the field when
+    it is not set by the initializer. They are removed from the programmable
+    tuple classes, where the fields are read by the normal field descriptors.
+    """
+
+    def __init__(self, func, deps):
+        """Initializes the derived field
+
+        :param func: The function computing the value.
+        :param deps: The tuple of the names of the defining fields that the
+            value depends on, None when unknown.
+        """
+        super().__init__(func)
+        self.deps = deps
+
+
+class _GuardedDerivedField(_LazyField):
+
+    """Derived field not to be set by the initializer
+
+    This data descriptor is used in the proxy objects of the classes updated
+    incrementally, where the values of the derived fields always need to be
+    the ones computed from the defining fields.
+    """
+
+    def __init__(self, func, name):
+        """Initializes the guarded field"""
+        super().__init__(func)
+        self.name = name
+
+    def __get__(self, obj, owner=None):
+        """Gets the value cached, or computes it"""
+        if obj is None:
+            return self
+        try:
+            return obj.__dict__[self.name]
+        except KeyError:
+            return super().__get__(obj, owner)
+
+    def __set__(self, obj, val):
+        """Rejects the setting by the initializer"""
+        raise ValueError((
+            'Derived field {} cannot be set by the initializer, since the '
+            'class is updated incrementally from its dependencies'
+        ).format(self.name))
+
+
+def _determine_derived_fields(bases, nmspc, fields, defining_count):
+    """Determines the derived fields of a new class
+
+    The newly defined derived fields are removed from the given name space.
+
+    :returns: The dictionary from the names of all the derived fields,
+        including the ones from the bases, to the pairs of their functions
+        and dependencies.
+    """
+
+    derived_fields = {}
+    for base in reversed(list(_gen_programmable_tuple_bases(bases))):
+        derived_fields.update(base.__derived_fields__)
+        continue
+
+    defining_fields = list(fields)[0:defining_count]
+    for fn, val in list(nmspc.items()):
+        if not isinstance(val, _DerivedField):
+            continue
+        if fn in defining_fields:
+            raise ValueError(
+                'Derived field {} cannot be a defining field.'.format(fn)
+            )
+        if val.deps is not None:
+            for i in val.deps:
+                if i not in defining_fields:
+                    raise ValueError(
+                        'Invalid dependency {} of derived field {}.'.format(
+                            i, fn
+                        )
+                    )
+                continue
+        derived_fields[fn] = (val.func, val.deps)
+        del nmspc[fn]
+        continue
+
+    # Fields that are no longer data fields in the class.
+    for fn in list(derived_fields):
+        if fn not in fields or fn in defining_fields:
+            del derived_fields[fn]
+        continue
+
+    return derived_fields
+
+
+def _form_update_plan(fields, defining_count, derived_fields, intern_table):
+    """Forms the plan for updating the defining fields incrementally
+
+    :returns: The dictionary from the names of the defining fields to the
+        list of the locations and functions of the derived fields depending
+        on them, in the order of the fields. None when incremental updating
+        is not requested by any derived field, when any data field is not a
+        derived field with known dependencies, or when the objects are
+        interned.
+    """
+
+    if intern_table is not None or not derived_fields:
+        return None
+
+    defining_fields = list(fields)[0:defining_count]
+    plan = {i: [] for i in defining_fields}
+    for fn, idx in itertools.islice(fields.items(), defining_count, None):
+        try:
+            func, deps = derived_fields[fn]
+        except KeyError:
+            return None
+        if deps is None or any(i not in plan for i in deps):
+            return None
+        for i in deps:
+            plan[i].append((idx, func))
+            continue
+        continue
+
+    return plan
+
+
+def _update_incrementally(obj, plan, kwargs):
+    """Updates the defining fields of an object incrementally
+
+    The values of the data fields not affected are copied, and the affected
+    ones are computed from the object with the defining fields updated.
+    """
+
+    cls = type(obj)
+    fields = cls.__fields__
+    content = list(obj.__content__)
+
+    affected = {}
+    for fn, val in kwargs.items():
+        try:
+            steps = plan[fn]
+        except KeyError:
+            raise ValueError(
+                'Got unexpected field names {}'.format(
+                    [i for i in kwargs if i not in plan]
+                )
+            )
+        content[fields[fn]] = val
+        affected.update(steps)
+        continue
+
+    if affected:
+        _compute_derived_fields(cls, content, affected)
+
+    return _make_programmable_tuple(cls, content)
+
+
+def _compute_derived_fields(cls, content, steps):
+    """Computes the affected derived fields into the values of the fields
+
+    The derived fields are computed from a proxy object with the defining
+    fields and the unaffected derived fields set from the given values. The
+    affected ones are computed on their first access, the same as during the
+    initialization, so that derived fields reading other derived fields get
+    their updated values, regardless of the order of the fields.
+
+    :param list content: The values of all the fields, with the defining
+        fields updated. The affected derived fields are set in place.
+    :param steps: The mapping from the locations of the affected derived
+        fields to their functions.
+    """
+
+    slotted_class = cls.__dict__.get('__slotted_class__')
+    if slotted_class is None:
+        _build_new_method(cls)
+        slotted_class = cls.__slotted_class__
+
+    proxy = object.__new__(slotted_class)
+    proxy_dict = proxy.__dict__
+    defining_count = cls.__defining_count__
+    names = list(cls.__fields__)
+    for idx, fn in enumerate(names):
+        if idx < defining_count:
+            setattr(proxy, fn, content[idx])
+        elif idx not in steps:
+            proxy_dict[fn] = content[idx]
+        continue
+
+    for idx in steps:
+        content[idx] = getattr(proxy, names[idx])
+        continue
+
+    return
+
+
+#
+# Hash caching
+# ^^^^^^^^^^^^
+#
+
+
+_HASH_SLOT = '__hash_cache__'
+
+
+def _form_cached_hash(slot, raw_hash=None):
+    """Forms the hash function with the result cached in the given slot
+
+    The hash is computed lazily on the first call, so that objects with
+    unhashable defining fields can still be created. The slot is accessed
+    through its descriptor directly to bypass the immutability of the
+    programmable tuples.
+
+    :param raw_hash: The hash function given in the class, None for the
+        default hash.
+    """
+
+    get_cache = slot.__get__
+    set_cache = slot.__set__
+
+    def __hash__(self):
+        """The default hash with the result cached"""
+        try:
+            return get_cache(self)
+        except AttributeError:
+            pass
+        if raw_hash is None:
+            hash_ = hash((self.__class__, ) + self._defining_values)
+        else:
+            hash_ = raw_hash(self)
+        set_cache(self, hash_)
+        return hash_
+
+    if raw_hash is not None:
+        functools.update_wrapper(__hash__, raw_hash)
+    return __hash__
+
+
+def _form_cached_eq(slot):
+    """Forms the equality comparison using the hash cached in the given slot
+
+    When the hashes of both of the objects have been cached, objects with
+    different hashes are rejected without comparing their fields.
+    """
+
+    get_cache = slot.__get__
+
+    def __eq__(self, other):
+        """Equality comparison using the cached hash"""
+        if self is other:
+            return True
+        if self.__class__ is not other.__class__:
+            return False
+        try:
+            if get_cache(self) != get_cache(other):
+                return False
+        except (AttributeError, TypeError):
+            # Not cached yet, or other objects posing as the class.
+            pass
+        return _eq_defining(
+            self.__content__, other.__content__, self.__defining_count__
+        )
+
+    return __eq__
+
+
+#
+# Construction caching
+# ^^^^^^^^^^^^^^^^^^^^
+#
+
+
+_CacheInfo = collections.namedtuple(
+    'CacheInfo', ['hits', 'misses', 'evictions', 'maxsize', 'currsize']
+)
+
+
+class _ConstructionCache(object):
+
+    """Cache of the constructed objects of a memoized class
+
+    The cache is an ordered dictionary from the keys formed from the
+    arguments to the pairs of the objects and their expiration time. The
+    least recently used objects are evicted when the cache is full. Expired
+    objects are evicted when they are looked up, and from the front of the
+    dictionary when new objects are cached, so that the cache does not grow
+    with expired objects. Unhashable arguments bypass the cache.
+    """
+
+    __slots__ = [
+        '_entries', '_maxsize', '_ttl', 'typed', 'clock',
+        'hits', 'misses', 'evictions'
+    ]
+
+    def __init__(self, maxsize, ttl, typed=False, clock=time.monotonic):
+        """Initializes an empty cache
+
+        :param maxsize: The maximum number of objects, None for unbounded.
+        :param ttl: The number of seconds the objects are kept, None for no
+            expiration.
+        :param bool typed: If the types of the arguments are in the keys.
+        :param clock: The function giving the current time in seconds.
+        """
+        if maxsize is not None and maxsize < 1:
+            raise ValueError(
+                'Invalid size {} for the construction cache.'.format(maxsize)
+            )
+        self._entries = collections.OrderedDict()
+        self._maxsize = maxsize
+        self._ttl = ttl
+        self.typed = typed
+        self.clock = clock
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key):
+        """Gets the cached object for the key, None when not cached"""
+
+        try:
+            obj, expiration = self._entries[key]
+        except KeyError:
+            self.misses += 1
+            return None
+        except TypeError:
+            return None
+
+        if expiration is not None and self.clock() >= expiration:
+            self._entries.pop(key, None)
+            self.evictions += 1
+            self.misses += 1
+            return None
+
+        if self._maxsize is not None:
+            try:
+                self._entries.move_to_end(key)
+            except KeyError:
+                pass
+        self.hits += 1
+        return obj
+
+    def put(self, key, obj):
+        """Caches the object for the key"""
+
+        entries = self._entries
+        expiration = None
+        if self._ttl is not None:
+            now = self.clock()
+            expiration = now + self._ttl
+            while entries:
+                _, (_, front_expiration) = next(iter(entries.items()))
+                if now < front_expiration:
+                    break
+                entries.popitem(last=False)
+                self.evictions += 1
+                continue
+
+        try:
+            entries[key] = (obj, expiration)
+        except TypeError:
+            return
+
+        if self._maxsize is not None:
+            while len(self._entries) > self._maxsize:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+                continue
+
+    def info(self):
+        """Gets the statistics of the cache"""
+        return _CacheInfo(
+            self.hits, self.misses, self.evictions, self._maxsize,
+            len(self._entries)
+        )
+
+    def clear(self):
+        """Clears the cache and its statistics"""
+        self._entries.clear()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+
+#
+# Pickling of the content
+# ^^^^^^^^^^^^^^^^^^^^^^^
+#
+
+
+_BUFFER_TYPES = (bytes, bytearray)
+
+
+def _reduce_content(self, protocol):
+    """Reduces a programmable tuple to the values of all its fields
+
+    This function is used as the ``__reduce_ex__`` method of classes with
+    content pickling. The object will be restored by
+    :py:func:`_restore_content` without the initialization process. Under
+    protocol 5, values of the buffer types are wrapped in ``PickleBuffer``
+    so that they can be transferred out of band, with their types recorded
+    for restoring.
+    """
+
+    values = tuple(self.__content__)
+    buffer_types = ()
+
+    if protocol >= 5 and hasattr(pickle, 'PickleBuffer'):
+        buffer_idxes = [
+            i for i, v in enumerate(values) if type(v) in _BUFFER_TYPES
+        ]
+        if buffer_idxes:
+            values = list(values)
+            buffer_types = tuple(
+                (i, type(values[i])) for i in buffer_idxes
+            )
+            for i in buffer_idxes:
+                values[i] = pickle.PickleBuffer(values[i])
+                continue
+            values = tuple(values)
+
+    return _restore_content, (type(self), values, buffer_types)
+
+
+def _restore_content(cls, values, buffer_types=()):
+    """Restores a programmable tuple from the values of all its fields
+
+    :param cls: The programmable tuple class.
+    :param tuple values: The values of all the fields.
+    :param buffer_types: The pairs of the indices and the types of the
+        values pickled as buffers. Buffers transferred out of band are
+        converted back into the given type.
+    """
+
+    if buffer_types:
+        values = list(values)
+        for idx, type_ in buffer_types:
+            if type(values[idx]) is not type_:
+                values[idx] = type_(values[idx])
+            continue
+
+    return _make_programmable_tuple(cls, values)
+
+
+#
+# Initialization methods patching
+# ^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^
+#
+
+
+_NEW_METH_TEMPLATE = """\
+def __new__(_cls, *args, **kwargs):
+{memo_lookup}\
+{bind}\
+{lookup}\
+    _proxy = _object_new(_proxy_class)
+{assign}\
+{init}\
+    try:
+        _values = ({reads})
+    except AttributeError:
+        _values = _get_field_values(
+            _fields, lambda fn: getattr(_proxy, fn), AttributeError
+        )
+{make}\
+{intern}\
+{memo_store}\
+    return _self
+"""
+
+_BIND = """\
+    _defining, _extra = _bind(*args, **kwargs)
+"""
+
+_INIT = """\
+    _init(_proxy, *args, **kwargs)
+"""
+
+_INIT_EXPLAINED = """\
+    try:
+        _init(_proxy, *args, **kwargs)
+    except AttributeError as _exc:
+        _explain_proxy_error(_exc, _proxy, _fields, _cls)
+        raise
+"""
+
+_AUTO_DEFINING_ASSIGN = """\
+    {targets} = _defining
+"""
+
+_AUTO_DEFINING_EXTRA = """\
+    if _extra:
+        for _fn, _val in _extra.items():
+            _setattr(_proxy, _fn, _val)
+"""
+
+_MAKE_TUPLE = """\
+    _self = _tuple_new(_cls, _values)
+"""
+
+_MAKE_EXPR = """\
+    _self = _object_new(_cls)
+    _object_setattr(_self, '__content__', _values)
+"""
+
+_INTERN_LOOKUP = """\
+    if not _extra:
+        try:
+            _canon = _intern_table.get(_intern_key(_defining))
+        except TypeError:
+            _canon = None
+        if _canon is not None:
+            return _canon
+"""
+
+_INTERN_STORE = """\
+    try:
+        _self = _intern_table.setdefault(
+            _intern_key(_values[0:_defining_count]), _self
+        )
+    except TypeError:
+        pass
+"""
+
+_MEMO_LOOKUP = """\
+    _memo_key = _memo_form_key(args, kwargs, _memo_typed)
+    _memo_hit = _memo_get(_memo_key)
+    if _memo_hit is not None:
+        return _memo_hit
+"""
+
+_MEMO_STORE = """\
+    _memo_put(_memo_key, _self)
+"""
+
+
+def _form_new_method(proxy_class, fields, defining_count, is_tuple,
+                     auto_defining, arg_layout, intern_table=None,
+                     construction_cache=None):
+    """Forms the __new__ method for the class
+
+    The function returned from this function, which should be used as the
+    __new__ method of the programmable tuple class, will be the core of how
+    the programmable tuples work. Basically a proxy object will be created to
+    be initialized by the user-given initializer. Then the values of the
+    fields are going to be read from the attributes of this proxy object to
+    form the actual immutable object.
+
+    Since the construction of objects is normally the hottest path, the
+    method is generated as specialized code for each class, in the same way
+    as the ``namedtuple`` in the standard library. The reading of the
+    fields, the automatic assignment of the defining fields, and the way the
+    content is stored are all resolved here rather than for each object.
+    The arguments are bound to the defining fields by the binding function
+    of the layout of the arguments, after which the automatic assignment is
+    a single unpacking into the attributes of the proxy object. The fields
+    are generated as placeholders renamed into the actual names, so the
+    code is only compiled once for all the classes of the same shape.
+
+    For interned classes, the table of the canonical objects is firstly
+    looked up with the values of the defining fields bound from the
+    arguments.
+    This is based on the advised practice that the defining fields of an
+    object can reproduce it. When there is no hit, the object is constructed
+    and then interned according to the actual values of its defining fields.
+
+    For memoized classes, the construction cache is looked up even before
+    that, by the arguments as they are given.
+
+    :param proxy_class: The proxy class for the initialization.
+    :param OrderedDict fields: The fields of the programmable tuple class.
+    :param int defining_count: The number of defining fields.
+    :param bool is_tuple: If the class is a subclass of tuple.
+    :param bool auto_defining: If the defining fields are assigned
+        automatically, in which case the initializer of the proxy class is
+        the one decorated by :py:func:`_add_auto_defining`.
+    :param _ArgLayout arg_layout: The layout of the arguments of the
+        initializer given in the class.
+    :param intern_table: The weak-value mapping from the values of the
+        defining fields to the canonical objects, for interned classes.
+    :param construction_cache: The cache of the constructed objects, for
+        memoized classes.
+    """
+
+    init = proxy_class.__init__
+    if auto_defining:
+        init = init.__wrapped__
+    interned = intern_table is not None
+    memoized = construction_cache is not None
+
+    # The arguments can only be bound for initializers given in the class,
+    # and the binding function is only formed when it is used.
+    if interned or auto_defining:
+        bind = arg_layout.bind
+    else:
+        bind = None
+    if bind is None:
+        interned_lookup = assigned = False
+    else:
+        interned_lookup = interned
+        assigned = auto_defining
+
+    n_assigned = len(arg_layout.names) if assigned else 0
+    assigned_extra = assigned and arg_layout.var_keyword is not None
+    explained = not proxy_class.__dictoffset__
+    shape = (
+        '__new__', memoized, interned_lookup, assigned, n_assigned,
+        assigned_extra, explained, len(fields), is_tuple, interned
+    )
+
+    def form_source():
+        """Forms the source code for the shape"""
+        placeholders = [_form_placeholder(i) for i in range(len(fields))]
+        assign = ''
+        if n_assigned > 0:
+            assign += _AUTO_DEFINING_ASSIGN.format(targets=''.join(
+                '_proxy.{}, '.format(i) for i in placeholders[0:n_assigned]
+            ))
+        if assigned_extra:
+            assign += _AUTO_DEFINING_EXTRA
+        return _NEW_METH_TEMPLATE.format(
+            memo_lookup=_MEMO_LOOKUP if memoized else '',
+            bind=_BIND if interned_lookup or assigned else '',
+            lookup=_INTERN_LOOKUP if interned_lookup else '',
+            assign=assign,
+            init=_INIT_EXPLAINED if explained else _INIT,
+            reads=''.join('_proxy.{}, '.format(i) for i in placeholders),
+            make=_MAKE_TUPLE if is_tuple else _MAKE_EXPR,
+            intern=_INTERN_STORE if interned else '',
+            memo_store=_MEMO_STORE if memoized else ''
+        )
+
+    nmspc = {
+        '_proxy_class': proxy_class,
+        '_init': init,
+        '_bind': bind,
+        '_defining_count': defining_count,
+        '_intern_table': intern_table,
+        '_intern_key': _form_intern_key,
+        '_fields': fields,
+        '_get_field_values': _get_field_values,
+        '_explain_proxy_error': _explain_proxy_error,
+        '_setattr': setattr,
+        '_object_new': object.__new__,
+        '_object_setattr': object.__setattr__,
+        '_tuple_new': tuple.__new__,
+    }
+    if memoized:
+        nmspc.update(
+            _memo_form_key=_form_memo_key,
+            _memo_typed=construction_cache.typed,
+            _memo_get=construction_cache.get,
+            _memo_put=construction_cache.put,
+        )
+    new_meth = _form_generated_function(
+        shape, form_source, '__new__', nmspc, tuple(fields)
+    )
+
+    return _wrap_new_method(
+        new_meth, proxy_class.__init__, proxy_class.__qualname__
+    )
+
+
+def _wrap_new_method(new_meth, init, qualname):
+    """Sets the metadata of a __new__ method from the initializer
+
+    The docstring and the signature are taken from the initializer. But the
+    name is kept as the __new__ method of the class, since pickling by
+    reference, like for ``cls.__new__`` with keyword arguments under the
+    older protocols, needs the method to be found by its qualified name.
+    """
+    functools.update_wrapper(
+        new_meth, init, assigned=('__module__', '__doc__'), updated=()
+    )
+    new_meth.__qualname__ = '{}.__new__'.format(qualname)
+    return new_meth
+
+
+_KWD_MARK = object()
+
+
+def _explain_proxy_error(exc, proxy, fields, cls):
+    """Explains the errors for attributes of proxy objects without fields
+
+    The proxy objects without dictionaries only have the slots for the
+    fields. When the error is for any other attribute of the proxy object,
+    a new error naming the attribute and the ``proxy_dict`` option is
+    raised from it. Otherwise nothing is done.
+    """
+
+    name = getattr(exc, 'name', None)
+    if name is None or getattr(exc, 'obj', None) is not proxy:
+        # Errors for setting attributes do not give the name.
+        name = _find_stored_attr(exc, proxy)
+        if name is None:
+            return
+
+    if name in fields:
+        return
+    raise AttributeError((
+        'Attribute {} is not a field of {}, so it cannot be set or read in '
+        'the initializer. Create the class with proxy_dict=True for other '
+        'attributes, like temporaries.'
+    ).format(name, cls.__name__)) from exc
+
+
+def _find_stored_attr(exc, proxy):
+    """Finds the attribute of the proxy object failed to be stored
+
+    Rather than the message of the error, which differs among the versions
+    and the implementations of Python, the instruction raising the error is
+    looked up in the innermost frame of the traceback. It is only trusted
+    when it stores an attribute in a frame holding the proxy object.
+
+    :returns: The name of the attribute, or None when it is not found.
+    """
+
+    tb = exc.__traceback__
+    if tb is None:
+        return None
+    while tb.tb_next is not None:
+        tb = tb.tb_next
+    frame = tb.tb_frame
+
+    if not any(i is proxy for i in frame.f_locals.values()):
+        return None
+    for instr in dis.get_instructions(frame.f_code):
+        if instr.offset == tb.tb_lasti:
+            if instr.opname == 'STORE_ATTR':
+                return instr.argval
+            break
+        continue
+
+    return None
+
+
+def _form_memo_key(args, kwargs, typed=False):
+    """Forms the key of the construction cache from the arguments
+
+    In the same way as the ``functools.lru_cache``, the keyword arguments are
+    flattened after a marker, so that they are not confused with positional
+    arguments. And they are normalized by sorting, so that their order does
+    not matter. For typed caching, the types of the arguments are appended.
+    """
+    key = args
+    if kwargs:
+        items = sorted(kwargs.items())
+        key += (_KWD_MARK, )
+        for item in items:
+            key += item
+            continue
+    if typed:
+        key += tuple(type(i) for i in args)
+        if kwargs:
+            key += tuple(type(v) for _, v in items)
+    return key
+
+
+def _form_init_method(get_proxy_init, raw_init):
+    """Decorate the user-given initialization function
+
+    Although the actual actions of the user-given initializer is moved to the
+    initialization of the proxy object, we would still like to see the
+    docstring for the initializer during development.
+
+    More importantly, since the default Python ``super`` is slightly awkward
+    to use inside the initializer, we want to be able to call the initializer
+    of super class directly. So this function could decorate the given
+    initializer into a version that is automatically disabled when called on
+    a programmable tuple object.
+
+    Since the proxy class is built lazily, the initializer of the proxy
+    class is only retrieved by ``get_proxy_init`` when it is called, and the
+    metadata is taken from ``raw_init``, the initializer as written.
+
+    """
+
+    @functools.wraps(raw_init)
+    def decorared(self, *args, **kwargs):
+        """The decorated initializer"""
+        if isinstance(type(self), ProgrammableTupleMeta):
+            # When it is automatically called after the creation of a
+            # programmable tuple, do nothing.
+            pass
+        else:
+            # When it is probably called explicitly by a subclass
+            # initializer, do the action.
+            get_proxy_init()(self, *args, **kwargs)
+
+    return decorared
+
+
+#
+# Utilities
+# ^^^^^^^^^
+#
+
+
+_GENERATED_CODES = {}  # From the shape to the code and its placeholders.
+
+
+def _form_generated_function(shape, form_source, name, nmspc, names,
+                             qualname=None):
+    """Forms a function from generated source code
+
+    The source code is only formed and compiled for the first use of its
+    shape, and the code of the function is shared by all the later uses.
+    The placeholder names in the code, for attributes and for local
+    variables, are renamed into the actual ones, which need not be valid
+    identifiers.
+
+    :param shape: The hashable key determining the source code.
+    :param form_source: The function forming the source code defining the
+        function, with the placeholders from :py:func:`_form_placeholder`.
+    :param str name: The name of the function defined.
+    :param dict nmspc: The global name space for the function.
+    :param tuple names: The actual names for the placeholders of the
+        indices.
+    :param str qualname: The qualified name of the function, by default the
+        name.
+    """
+
+    try:
+        code, names_slots, varnames_slots = _GENERATED_CODES[shape]
+    except KeyError:
+        scratch = {}
+        exec(form_source(), scratch)
+        code = scratch[name].__code__
+        code, names_slots, varnames_slots = _GENERATED_CODES.setdefault(
+            shape, (
+                code, _find_placeholders(code.co_names),
+                _find_placeholders(code.co_varnames)
+            )
+        )
+
+    replacements = {}
+    if names_slots:
+        co_names = list(code.co_names)
+        for pos, idx in names_slots:
+            co_names[pos] = names[idx]
+            continue
+        replacements['co_names'] = tuple(co_names)
+    if varnames_slots:
+        co_varnames = list(code.co_varnames)
+        for pos, idx in varnames_slots:
+            co_varnames[pos] = names[idx]
+            continue
+        replacements['co_varnames'] = tuple(co_varnames)
+    if qualname is not None and hasattr(code, 'co_qualname'):
+        replacements['co_qualname'] = qualname
+    if replacements:
+        code = code.replace(**replacements)
+
+    nmspc.setdefault('__builtins__', builtins)
+    func = types.FunctionType(code, nmspc, name)
+    if qualname is not None:
+        func.__qualname__ = qualname
+    return func
+
+
+_PLACEHOLDER_PREFIX = '_name_'
+
+
+def _form_placeholder(idx):
+    """Forms the placeholder name for the name of the given index"""
+    return '{}{}'.format(_PLACEHOLDER_PREFIX, idx)
+
+
+def _find_placeholders(names):
+    """Finds the placeholders in the names of a code object
+
+    :returns: The list of pairs of the positions and the indices of the
+        placeholders.
+    """
+    return [
+        (pos, int(i[len(_PLACEHOLDER_PREFIX):]))
+        for pos, i in enumerate(names) if i.startswith(_PLACEHOLDER_PREFIX)
+    ]
+
+
+def _has_attr(bases, attr):
+    """Tests if any of the given bases have got the given attribute"""
+    return any(hasattr(i, attr) for i in bases)
+
+
+def _get_class_attr(cls, attr):
+    """Gets an attribute of a class without invoking the descriptors"""
+    for klass in cls.__mro__:
+        if attr in klass.__dict__:
+            return klass.__dict__[attr]
+        continue
+    raise AttributeError(attr)
+
+
+def _gen_programmable_tuple_bases(raw_bases):
+    """Generates the programmable tuple bases
+
+    For subclassing programmable tuples, we need to read some information
+    from only the bases which are programmable tuples themselves. This
+    function will filter only the programmable tuple subclasses to read the
+    information.
+    """
+
+    for base in raw_bases:
+        if isinstance(base, ProgrammableTupleMeta):
+            yield base
+        continue
+
+    return
+
+
+#
+# The utility functions
+# =====================
+#
+# These are utility functions useful for both the meta-class and the base
+# class.
+#
+
+
+def _get_field_values(fields, query, non_exist_exc):
+    """Gets the values of all the fields
+
+    :param OrderedDict fields: The ordered dictionary for the fields.
+    :param Callable query: A callable function going to be called with the
+        field name to get the value.
+    :param non_exist_exc: The exception class for failed field value query.
+    :returns: A list of the values of all the fields in order.
+    """
+
+    values = []
+    for i in fields.keys():
+        try:
+            values.append(query(i))
+        except non_exist_exc:
+            raise AttributeError(
+                'Attribute {} is not set'.format(i)
+            )
+        continue
+
+    return values
+
+
+def _iter_field_items(obj, full):
+    """Iterates over the pairs of field names and values of an object
+
+    :param obj: The programmable tuple object.
+    :param bool full: If the data fields are included.
+    """
+    if full:
+        names = obj._gen_field_names()
+    else:
+        names = obj._gen_defining_field_names()
+    return zip(names, obj.__content__)
+
+
+def _find_shared(obj, full):
+    """Finds the programmable tuples occurring multiple times in an object
+
+    The object is traversed iteratively, without descending into objects
+    that have been met.
+
+    :param obj: The root programmable tuple object.
+    :param bool full: If the data fields are traversed as well.
+    :returns: The set of the identities of the shared objects.
+    """
+
+    met = {id(obj)}
+    shared = set()
+    stack = [obj]
+    while stack:
+        for _, val in _iter_field_items(stack.pop(), full):
+            if not isinstance(type(val), ProgrammableTupleMeta):
+                continue
+            if id(val) in met:
+                shared.add(id(val))
+            else:
+                met.add(id(val))
+                stack.append(val)
+            continue
+        continue
+
+    return shared
+
+
+_SPECIAL_KEYS = frozenset(['__class__', '__id__'])
+
+_LOADED = object()
+
+
+class _RefResolver(object):
+
+    """Resolver of the references in dictionaries of programmable tuples
+
+    The references are in the form of a dictionary with only the ``__ref__``
+    key, which refers to the dictionary with the same ``__id__`` value
+    somewhere in the tree. The table of the dictionaries with identifiers is
+    only built when the first reference is met.
+    """
+
+    __slots__ = ['_root', '_defs']
+
+    def __init__(self, root):
+        """Initializes the resolver for the tree of the given dictionary"""
+        self._root = root
+        self._defs = None
+
+    def resolve(self, dict_):
+        """Resolves the given dictionary if it is a reference"""
+
+        if '__ref__' not in dict_:
+            return dict_
+
+        if self._defs is None:
+            self._defs = {}
+            met = {id(self._root)}
+            stack = [self._root]
+            while stack:
+                curr = stack.pop()
+                if '__id__' in curr:
+                    self._defs[curr['__id__']] = curr
+                for i in curr.values():
+                    if isinstance(i, dict) and id(i) not in met:
+                        met.add(id(i))
+                        stack.append(i)
+                    continue
+                continue
+
+        try:
+            return self._defs[dict_['__ref__']]
+        except KeyError:
+            raise ValueError(
+                'Unresolved reference {}'.format(dict_['__ref__'])
+            )
+
+
+def _eq_defining(content, other_content, defining_count):
+    """Tests if the defining fields of two content tuples are equal
+
+    No new tuple is created for the comparison. For classes without data
+    fields, the content tuples are compared directly, or the defining values
+    are compared one by one, with identical values skipped.
+
+    Note that for programmable tuples, the content tuples are the objects
+    themselves, which need to be compared as plain tuples.
+    """
+
+    if defining_count == len(content):
+        return tuple.__eq__(content, other_content)
+
+    for i in range(defining_count):
+        val = content[i]
+        other_val = other_content[i]
+        if val is not other_val and not val == other_val:
+            return False
+        continue
+
+    return True
 
-        # Assign all the values given to the initializer.
-        for field, value in itertools.chain(
-                zip(argnames[1:], args),
-                kwargs.items()
-        ):
-            setattr(self, field, value)
 
-        # Invoke the actual initializer.
-        init(self, *args, **kwargs)
+def _form_content_maker(cls):
+    """Forms a function making objects of the given class from field values
 
-    return decorated
+    This function has the same effect as :py:func:`_make_programmable_tuple`
+    for the given class, just the storage of the content and the interning
+    are resolved only once.
+    """
 
+    if issubclass(cls, tuple):
+        return functools.partial(tuple.__new__, cls)
 
-#
-# Initialization methods patching
-# ^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^
-#
+    intern_table = cls.__intern_table__
+    defining_count = cls.__defining_count__
 
+    def make(data_values):
+        """Makes the programmable tuple object"""
+        tp = object.__new__(cls)
+        content = tuple(data_values)
+        object.__setattr__(tp, '__content__', content)
+        if intern_table is not None:
+            tp = _intern_made(intern_table, content[0:defining_count], tp)
+        return tp
 
-def _form_new_method(proxy_class):
-    """Forms the __new__ method for the class
+    return make
 
-    The function returned from this function, which should be used as the
-    __new__ method of the programmable tuple class, will be the core of how
-    the programmable tuples work. Basically a proxy object will be created to
-    be initialized by the user-given initializer. Then the values of the
-    fields are going to be read from the attributes of this proxy object to
-    form the actual immutable object.
 
+def _form_mapping_reader(fields):
+    """Forms a function reading the values of the fields from a mapping
+
+    The function returns a tuple of the values in the order of the fields,
+    and raises ``KeyError`` for any missing field.
     """
 
-    @functools.wraps(proxy_class.__init__)
-    def new_meth(cls, *args, **kwargs):
-        """Set a new object of the programmable tuple class"""
+    n_fields = len(fields)
+    if n_fields == 0:
+        return lambda _: ()
+    elif n_fields == 1:
+        field, = fields
+        return lambda mapping: (mapping[field], )
+    else:
+        return operator.itemgetter(*fields)
+
 
-        # Initialize the proxy object by user-defined initializer.
-        proxy = proxy_class(*args, **kwargs)
+def _resolve_bulk_replacements(cls, objs, columns, kwargs, n_fields):
+    """Resolves the replacements of fields for many objects
+
+    :param cls: The programmable tuple class.
+    :param objs: The objects to replace fields in.
+    :param columns: The mapping from field names to the sequences of values
+        for each object, can be None.
+    :param kwargs: The mapping from field names to the values for all the
+        objects.
+    :param int n_fields: The number of leading fields that can be replaced.
+    :returns: The list of the objects, and the lists of the pairs of the
+        locations and the columns, and the locations and the values.
+    """
 
-        # Get the values of all the fields.
-        values = _get_field_values(
-            cls.__fields__, lambda fn: getattr(proxy, fn), AttributeError
+    objs = list(objs)
+    for obj in objs:
+        if type(obj) is not cls:
+            raise ValueError(
+                'Invalid object {!r} for class {}'.format(obj, cls.__name__)
+            )
+    if columns is None:
+        columns = {}
+
+    fields = cls.__fields__
+    invalid = [
+        i for i in itertools.chain(columns, kwargs)
+        if fields.get(i, n_fields) >= n_fields
+    ]
+    if invalid:
+        raise ValueError(
+            'Got unexpected field names {}'.format(invalid)
+        )
+    both = [i for i in columns if i in kwargs]
+    if both:
+        raise ValueError(
+            'Fields {} are given both as columns and values'.format(both)
         )
 
-        # Make the actual programmable tuple from the proxy object.
-        return _make_programmable_tuple(cls, values)
+    resolved_columns = []
+    for fn, col in columns.items():
+        if len(col) != len(objs):
+            raise ValueError(
+                'Column {} has {} values for {} objects'.format(
+                    fn, len(col), len(objs)
+                )
+            )
+        resolved_columns.append((fields[fn], col))
+        continue
 
-    return new_meth
+    return objs, resolved_columns, [
+        (fields[fn], val) for fn, val in kwargs.items()
+    ]
 
 
-def _form_init_method(proxy_init):
-    """Decorate the user-given initialization function
+def _get_construction_cache(cls):
+    """Gets the construction cache of a class, which must be memoized"""
+    cache = cls.__dict__.get('__construction_cache__')
+    if cache is None:
+        raise ValueError(
+            'Class {} is not memoized'.format(cls.__name__)
+        )
+    return cache
 
-    Although the actual actions of the user-given initializer is moved to the
-    initialization of the proxy object, we would still like to see the
-    docstring for the initializer during development.
 
-    More importantly, since the default Python ``super`` is slightly awkward
-    to use inside the initializer, we want to be able to call the initializer
-    of super class directly. So this function could decorate the given
-    initializer into a version that is automatically disabled when called on
-    a programmable tuple object.
+def _make_programmable_tuple(cls, data_values):
+    """Makes a programmable tuple object
+
+    This function will actually make a programmable tuple object of the given
+    class according to the sequence of values for the fields. It is the
+    function that is actually used to make the object during the
+    initialization process. It can also be used for other purposes where we
+    already got values of all the fields and the initialization process needs
+    to be skipped.
 
+    :param cls: The class of the programmable tuple.
+    :param data_values: A sequence of values for all the fields of the
+        programmable tuple.
+    :returns: A value of the programmable tuple with the given data fields.
+        For interned classes, it is the canonical object for the values of
+        the defining fields.
     """
 
-    @functools.wraps(proxy_init)
-    def decorared(self, *args, **kwargs):
-        """The decorated initializer"""
-        if isinstance(type(self), ProgrammableTupleMeta):
-            # When it is automatically called after the creation of a
-            # programmable tuple, do nothing.
-            pass
-        else:
-            # When it is probably called explicitly by a subclass
-            # initializer, do the action.
-            proxy_init(self, *args, **kwargs)
+    if issubclass(cls, tuple):
+        # For subclass of tuples.
+        #
+        # Create the tuple.
+        tp = tuple.__new__(cls, data_values)
+    else:
+        # For non-subclass of tuples.
+        content = tuple(data_values)
+        tp = object.__new__(cls)
+        object.__setattr__(tp, '__content__', content)
 
-    return decorared
+        intern_table = cls.__intern_table__
+        if intern_table is not None:
+            tp = _intern_made(
+                intern_table, content[0:cls.__defining_count__], tp
+            )
 
+    return tp
 
-#
-# Utilities
-# ^^^^^^^^^
-#
 
+def _form_intern_key(values):
+    """Forms the key of the intern table from the values of defining fields
 
-def _get_argnames(func):
-    """Gets the names of the argument of a function"""
-    return func.__code__.co_varnames[0:func.__code__.co_argcount]
+    In the same way as the typed construction cache, the types of the values
+    are appended, so that equal values of different types, like ``1``,
+    ``1.0`` and ``True``, are not interned into the same object.
+    """
+    return values + tuple(type(i) for i in values)
 
 
-def _gen_programmable_tuple_bases(raw_bases):
-    """Generates the programmable tuple bases
+def _intern_made(intern_table, defining, obj):
+    """Interns an object made without the initialization
 
-    For subclassing programmable tuples, we need to read some information
-    from only the bases which are programmable tuples themselves. This
-    function will filter only the programmable tuple subclasses to read the
-    information.
+    Since the canonical object is given in place of the object made, the
+    values of the data fields given need to be the ones of the canonical
+    object, or ValueError is raised.
+
+    :returns: The canonical object for the values of the defining fields,
+        which is the given object when there is none yet or the values are
+        unhashable.
     """
 
-    for base in raw_bases:
-        if isinstance(base, ProgrammableTupleMeta):
-            yield base
-        continue
+    try:
+        canonical = intern_table.setdefault(_form_intern_key(defining), obj)
+    except TypeError:
+        return obj
 
-    return
+    if canonical is not obj and canonical.__content__ != obj.__content__:
+        raise ValueError((
+            'Data fields differ from the interned object {!r} with the '
+            'same defining fields'
+        ).format(canonical))
+    return canonical
 
 
 #
@@ -348,7 +2199,11 @@ class _UtilMethodsMixin(object):
     #
 
     def __getattr__(self, attr):
-        """Gets the attribute of the given name"""
+        """Gets the attribute of the given name
+
+        Normally the fields are read by the descriptors installed by the
+        metaclass, this is only a fallback for the rest of the cases.
+        """
         try:
             return self.__content__[self.__fields__[attr]]
         except KeyError:
@@ -390,11 +2245,18 @@ class _UtilMethodsMixin(object):
 
         """
 
-        return (
-            self.__class__ == other.__class__ and
-            self._defining_values == other._defining_values
+        if self is other:
+            return True
+        if self.__class__ is not other.__class__:
+            return False
+        return _eq_defining(
+            self.__content__, other.__content__, self.__defining_count__
         )
 
+    def __ne__(self, other):
+        """Inequality comparison, the negation of the equality"""
+        return not self.__eq__(other)
+
     #
     # Generation of objects of the same type
     #
@@ -406,10 +2268,19 @@ class _UtilMethodsMixin(object):
         just with the defining fields given in the keyword arguments replaced
         by their new given value. After the new values of the defining fields
         are formed, the initialization process will be performed.
+
+        For classes with all the data fields declared by
+        :py:func:`derived_field` with their dependencies, the initialization
+        process is skipped, and only the derived fields depending on the
+        updated fields are computed again.
         """
 
+        plan = self.__update_plan__
+        if plan is not None:
+            return _update_incrementally(self, plan, kwargs)
+
         # Make the updated result.
-        result = type(self)(*(map(
+        result = _make_from_defining(type(self), list(map(
             kwargs.pop,
             self._gen_defining_field_names(),
             self.__content__
@@ -450,6 +2321,97 @@ class _UtilMethodsMixin(object):
         result = self._make(**values_dict)
         return result
 
+    @classmethod
+    def _replace_many(cls, objs, columns=None, **kwargs):
+        """Replaces fields in many objects of the class
+
+        This method is the bulk version of the :py:meth:`_replace` method.
+        The locations of the fields are resolved only once for all the
+        objects, and the initialization process is not performed.
+
+        :param Iterable objs: The objects of exactly this class.
+        :param Mapping columns: The mapping from field names to the sequences
+            of their new values for each of the objects.
+        :param kwargs: The new values of the fields for all the objects.
+        :returns: The list of the new objects.
+        """
+
+        objs, columns, replacements = _resolve_bulk_replacements(
+            cls, objs, columns, kwargs, len(cls.__fields__)
+        )
+        make = _form_content_maker(cls)
+
+        result = []
+        for row, obj in enumerate(objs):
+            content = list(obj.__content__)
+            for idx, val in replacements:
+                content[idx] = val
+                continue
+            for idx, col in columns:
+                content[idx] = col[row]
+                continue
+            result.append(make(content))
+            continue
+
+        return result
+
+    @classmethod
+    def _update_many(cls, objs, columns=None, **kwargs):
+        """Updates defining fields in many objects of the class
+
+        This method is the bulk version of the :py:meth:`_update` method,
+        with the locations of the fields resolved only once for all the
+        objects. The initialization process is performed for the new
+        objects, unless the class can be updated incrementally with derived
+        fields, in which case the affected derived fields are resolved only
+        once as well.
+
+        :param Iterable objs: The objects of exactly this class.
+        :param Mapping columns: The mapping from defining field names to the
+            sequences of their new values for each of the objects.
+        :param kwargs: The new values of the defining fields for all the
+            objects.
+        :returns: The list of the new objects.
+        """
+
+        defining_count = cls.__defining_count__
+        objs, columns, replacements = _resolve_bulk_replacements(
+            cls, objs, columns, kwargs, defining_count
+        )
+        plan = cls.__update_plan__
+        make = _form_content_maker(cls)
+
+        if plan is not None:
+            fields = list(cls.__fields__)
+            steps = {}
+            for idx, _ in itertools.chain(replacements, columns):
+                steps.update(plan[fields[idx]])
+                continue
+
+        result = []
+        for row, obj in enumerate(objs):
+            if plan is None:
+                content = list(obj.__content__[0:defining_count])
+            else:
+                content = list(obj.__content__)
+            for idx, val in replacements:
+                content[idx] = val
+                continue
+            for idx, col in columns:
+                content[idx] = col[row]
+                continue
+
+            if plan is None:
+                result.append(_make_from_defining(cls, content))
+                continue
+
+            if steps:
+                _compute_derived_fields(cls, content, steps)
+            result.append(make(content))
+            continue
+
+        return result
+
     @classmethod
     def _make(cls, **kwargs):
         """Makes a new programmable tuple object directly
@@ -476,6 +2438,102 @@ class _UtilMethodsMixin(object):
         # Make the programmable tuple.
         return _make_programmable_tuple(cls, values)
 
+    @classmethod
+    def _from_rows(cls, rows, init=True):
+        """Makes programmable tuple objects in bulk from rows
+
+        Compared with making the objects one by one, the layout of the rows
+        is resolved only once for all the rows. The rows need to be all
+        sequences or all mappings, which is determined from the first row.
+
+        :param Iterable rows: The rows for the objects. When the
+            initialization process is performed, sequences are used as the
+            positional arguments and mappings as the keyword arguments to the
+            initializer. Or they need to give the values of all the fields,
+            as sequences in the order of the fields or as mappings from the
+            field names, like the :py:meth:`_make` method.
+        :param bool init: If the initialization process is going to be
+            performed.
+        :returns: The list of the programmable tuple objects.
+        """
+
+        rows = iter(rows)
+        try:
+            first = next(rows)
+        except StopIteration:
+            return []
+        rows = itertools.chain((first, ), rows)
+        is_mapping = isinstance(first, collections.abc.Mapping)
+
+        if init:
+            if is_mapping:
+                return [cls(**i) for i in rows]
+            else:
+                return [cls(*i) for i in rows]
+
+        make = _form_content_maker(cls)
+        fields = cls.__fields__
+        n_fields = len(fields)
+        if is_mapping:
+            get_values = _form_mapping_reader(fields)
+
+        result = []
+        for row in rows:
+            if is_mapping:
+                try:
+                    values = get_values(row)
+                except KeyError:
+                    # Get the error for the missing fields.
+                    _get_field_values(fields, row.__getitem__, KeyError)
+                if len(row) != n_fields:
+                    raise ValueError('Invalid field(s) {} for {}'.format(
+                        tuple(i for i in row.keys() if i not in fields),
+                        cls.__name__
+                    ))
+            else:
+                values = row
+                if len(values) != n_fields:
+                    raise ValueError(
+                        '{} values are given for the {} fields of {}'.format(
+                            len(values), n_fields, cls.__name__
+                        )
+                    )
+            result.append(make(values))
+            continue
+
+        return result
+
+    @classmethod
+    def _make_many(cls, rows):
+        """Makes programmable tuple objects in bulk directly
+
+        This method is the bulk version of the :py:meth:`_make` method, with
+        the initialization process bypassed. The rows can be either sequences
+        of the values of all the fields in order, or mappings from the field
+        names to the values.
+
+        :returns: The list of the programmable tuple objects.
+        """
+        return cls._from_rows(rows, init=False)
+
+    #
+    # Construction cache
+    #
+
+    @classmethod
+    def _cache_info(cls):
+        """Gets the statistics of the construction cache of a memoized class
+
+        :returns: A named tuple of the numbers of hits, misses and evictions,
+            the maximum size, and the current size of the cache.
+        """
+        return _get_construction_cache(cls).info()
+
+    @classmethod
+    def _cache_clear(cls):
+        """Clears the construction cache of a memoized class"""
+        _get_construction_cache(cls).clear()
+
     #
     # Simple string formatting
     #
@@ -520,7 +2578,8 @@ class _UtilMethodsMixin(object):
     # Dictionary forming and parsing
     #
 
-    def _asdict(self, full=False, class_tags=False):
+    def _asdict(self, full=False, class_tags=False, refs=False,
+                alias=False):
         """Returns an dictionary which maps field names to values
 
         This method will convert a programmable tuple into a dictionary,
@@ -529,6 +2588,11 @@ class _UtilMethodsMixin(object):
         going to be cast into dictionary recursively. In this way,
         this method can be used for serialization into JSON or YAML.
 
+        The conversion is performed iteratively, so deep nesting is not
+        limited by the recursion limit of Python. By default, each occurrence
+        of a shared object is converted into a separate dictionary, the same
+        as for the objects not shared.
+
         :param bool full: If the data fields are going to be contained as
             well, by default only the defining fields are contained.
         :param Mapping class_tags: The mapping from class to a string,
@@ -536,124 +2600,232 @@ class _UtilMethodsMixin(object):
             the dictionaries. By default, the ``__class__`` attribute will
             not be added. But when it is added, it is required that the
             mapping contains all the classes that is needed.
+        :param bool refs: If the reference mode is going to be used, where
+            objects occurring multiple times are emitted only once. Their
+            dictionary at the first occurrence in depth-first order is given
+            an integral ``__id__``, and each of the later occurrences is
+            given as a dictionary with only the ``__ref__`` key for the
+            identifier.
+        :param bool alias: If each distinct object is going to be converted
+            only once, with the same dictionary object used for all its
+            occurrences. This is faster for trees with a lot of sharing, but
+            mutating the dictionary of a shared object changes all its
+            occurrences, and serializers like YAML emit them as aliases.
         :returns: The dictionary for the current programmable tuple.
         """
 
-        # Get the field names to be added to the dictionary.
-        if full:
-            included_fields = self._gen_field_names()
-        else:
-            included_fields = self._gen_defining_field_names()
-
-        # Populate the dictionary.
-        dict_ = {}
-        for fn in included_fields:
-            val = getattr(self, fn)
-            if isinstance(type(val), ProgrammableTupleMeta):
-                # Recurse for programmable tuple children.
-                val = val._asdict(full=full, class_tags=class_tags)
-            dict_[fn] = val
-            continue
+        shared = _find_shared(self, full) if refs else ()
+        memo = {}  # From object identity to dictionary or reference.
+        ref_ids = {}  # From object identity to the reference identifier.
+
+        def open_dict(obj):
+            """Opens a new dictionary for a newly met object"""
+            dict_ = {}
+            if id(obj) in shared:
+                ref_id = len(ref_ids)
+                ref_ids[id(obj)] = ref_id
+                dict_['__id__'] = ref_id
+                memo[id(obj)] = {'__ref__': ref_id}
+            elif alias:
+                memo[id(obj)] = dict_
+            return dict_
+
+        root = open_dict(self)
+        stack = [(self, root, _iter_field_items(self, full))]
+        while stack:
+            obj, dict_, items = stack[-1]
+
+            for fn, val in items:
+                if isinstance(type(val), ProgrammableTupleMeta):
+                    if id(val) in memo:
+                        val = memo[id(val)]
+                        if not alias:
+                            # References are copied like other values.
+                            val = dict(val)
+                    else:
+                        # Descend into the new programmable tuple child.
+                        child = open_dict(val)
+                        dict_[fn] = child
+                        stack.append(
+                            (val, child, _iter_field_items(val, full))
+                        )
+                        break
+                dict_[fn] = val
+                continue
+            else:
+                # Add the class attribute after all fields are added.
+                if class_tags:
+                    dict_['__class__'] = class_tags[type(obj)]
+                stack.pop()
 
-        # Add the class attribute.
-        if class_tags:
-            dict_['__class__'] = class_tags[type(self)]
+            continue
 
-        return dict_
+        return root
 
     @classmethod
     def _load_from_dict(cls, dict_, full=False, class_tags=None,
-                        top=True):
+                        top=True, dedupe=False):
         """Loads a programmable tuple object from its dictionary form
 
         This method is the opposite of the method :py:meth:`_asdict`. It will
         also recursively resolve the nested dictionaries when they were in
         fact serialized from programmable tuples.
 
+        The loading is performed iteratively with an explicit stack. A
+        dictionary object occurring multiple times is loaded only once, and
+        the references from the reference mode of :py:meth:`_asdict` are
+        resolved to the dictionaries with the identifiers. Cyclic references
+        raise ValueError, since immutable objects cannot contain themselves.
+
         :param dict dict_: The dictionary to load.
         :param bool full: If the data fields are going to be read and used as
             well. By default, the programmable tuple objects are going to be
             initialized from only the defining fields.
         :param Mapping class_tags: The mapping from class tags in the
             ``__class__`` string to the actual class.
-        :param bool top: If we are at the top of the recursion tree.
+        :param bool top: If the given dictionary is at the top of the tree,
+            where the current class is used when no class tag is given.
+        :param bool dedupe: If structurally identical dictionaries are going
+            to be loaded into the same object. Dictionaries are identical
+            when they have the same class, the values of the same types
+            that are equal, and the nested dictionaries loaded into the same
+            objects. Only objects with all the other values hashable can be
+            deduplicated.
         :returns: The programmable tuple from parsing the dictionary.
         """
 
-        # Resolve the class of the current object.
-        try:
-            class_tag = dict_['__class__']
-        except KeyError:
-            # When the class tag is not given in the dictionary.
-            if top:
-                # Try to use the current class if we are at top.
-                obj_class = cls
-            else:
-                # When we are not at the top, return a copy of the dictionary
-                # directly.
-                return dict(dict_)
-        else:
-            # When a class tag is given, try to resolve the class tag.
-            if class_tag in class_tags:
-                obj_class = class_tags[class_tag]
-            else:
-                raise ValueError(
-                    'The class for tag {} cannot be resolved'.format(class_tag)
-                )
+        if class_tags is None:
+            class_tags = {}
 
-        # Now we have the class, and next need to read the values of the
-        # fields.
-        if full:
+        refs = _RefResolver(dict_)
+        root = refs.resolve(dict_)
 
-            # When a full construction is to be performed, we need to get the
-            # dictionary of all the fields.
-            content = {}
-            for i, v in dict_.items():
-                # Skip the special class tag.
-                if i == '__class__':
-                    continue
-                # Implicit else.
-                if isinstance(v, dict):
-                    # Recurse for dictionaries.
-                    val = cls._load_from_dict(
-                        v, full=True, class_tags=class_tags, top=False
-                    )
-                else:
-                    val = v
-                content[i] = val
-                continue
-            # Return the result.
-            return obj_class._make(**content)
+        memo = {}  # From dictionary identity to the loaded value.
+        canonical = {}  # From the structure to the loaded object.
+        field_plans = {}  # From class to the names of defining fields.
+        loading = set()  # Identities of the dictionaries loading children.
 
-        else:
+        stack = [(root, top)]
+        while stack:
+            curr, is_top = stack[-1]
+            if id(curr) in memo:
+                stack.pop()
+                continue
 
-            # When we disable full loading, we only need to pick up the
-            # values of the defining attributes.
-            defining = {}
-            for fn in obj_class._gen_defining_field_names():
+            # Resolve the class of the current object.
+            try:
+                class_tag = curr['__class__']
+            except KeyError:
+                # When the class tag is not given in the dictionary.
+                if is_top:
+                    # Try to use the current class if we are at top.
+                    obj_class = cls
+                else:
+                    # When we are not at the top, use a copy of the
+                    # dictionary directly.
+                    memo[id(curr)] = dict(curr)
+                    stack.pop()
+                    continue
+            else:
+                # When a class tag is given, try to resolve the class tag.
                 try:
-                    val = dict_[fn]
+                    obj_class = class_tags[class_tag]
                 except KeyError:
-                    raise ValueError((
-                        'The definition property {} of class {} is '
-                        'not given').format(fn, obj_class)
+                    raise ValueError(
+                        'The class for tag {} cannot be resolved'.format(
+                            class_tag
+                        )
                     )
-                if isinstance(val, dict):
-                    val = cls._load_from_dict(
-                        val, full=False, class_tags=class_tags, top=False
+
+            # Get the names of the fields to read.
+            if full:
+                # When a full construction is to be performed, we need all
+                # the fields given in the dictionary.
+                names = [i for i in curr if i not in _SPECIAL_KEYS]
+            else:
+                # When we disable full loading, we only need to pick up the
+                # values of the defining attributes.
+                try:
+                    names = field_plans[obj_class]
+                except KeyError:
+                    names = tuple(obj_class._gen_defining_field_names())
+                    field_plans[obj_class] = names
+                for fn in names:
+                    if fn not in curr:
+                        raise ValueError((
+                            'The definition property {} of class {} is '
+                            'not given').format(fn, obj_class)
+                        )
+                    continue
+
+            # Load the children dictionaries first.
+            pending = [
+                child for child in (
+                    refs.resolve(curr[i]) for i in names
+                    if isinstance(curr[i], dict)
+                ) if id(child) not in memo
+            ]
+            if pending:
+                # The children being loaded can only be met again through
+                # a cycle of references.
+                if any(id(i) in loading for i in pending):
+                    raise ValueError(
+                        'Cyclic reference in class {}'.format(
+                            obj_class.__name__
+                        )
                     )
-                defining[fn] = val
+                loading.add(id(curr))
+                stack.extend((i, False) for i in reversed(pending))
                 continue
-            # Return the result.
-            return obj_class(**defining)
+
+            raw_values = [curr[i] for i in names]
+            values = tuple(
+                memo[id(refs.resolve(val))] if isinstance(val, dict) else val
+                for val in raw_values
+            )
+
+            # Use the identical object that has been loaded. The nested
+            # objects loaded are already canonical, so they are keyed by
+            # their identities, without hashing the subtrees again.
+            obj = None
+            if dedupe:
+                key = (obj_class, tuple(names), tuple(
+                    (_LOADED, id(val)) if isinstance(raw, dict)
+                    else (type(val), val)
+                    for raw, val in zip(raw_values, values)
+                ))
+                try:
+                    obj = canonical.get(key)
+                except TypeError:
+                    key = None
+
+            if obj is None:
+                if full:
+                    obj = obj_class._make(**dict(zip(names, values)))
+                else:
+                    obj = _make_from_defining(obj_class, values)
+                if dedupe and key is not None:
+                    canonical[key] = obj
+
+            memo[id(curr)] = obj
+            loading.discard(id(curr))
+            stack.pop()
+            continue
+
+        return memo[id(root)]
 
     #
     # Pickling support
     #
 
-    def __getnewargs__(self):
-        """Gets the arguments to be used for the new function"""
-        return self._defining_values
+    def __getnewargs_ex__(self):
+        """Gets the arguments to be used for the new function
+
+        The values of the defining fields are given as the arguments
+        according to the layout of the arguments of the initializer, with
+        the keyword-only ones as keyword arguments.
+        """
+        return self.__arg_layout__.split(self._defining_values)
 
     # Disable the getting and setting of states for pickling.
     __getstate__ = lambda _: False
@@ -730,65 +2902,3 @@ class ProgrammableExpr(_UtilMethodsMixin, metaclass=ProgrammableTupleMeta):
     """
 
     pass
-
-
-#
-# The utility functions
-# =====================
-#
-# These are utility functions useful for both the meta-class and the base
-# class.
-#
-
-
-def _get_field_values(fields, query, non_exist_exc):
-    """Gets the values of all the fields
-
-    :param OrderedDict fields: The ordered dictionary for the fields.
-    :param Callable query: A callable function going to be called with the
-        field name to get the value.
-    :param non_exist_exc: The exception class for failed field value query.
-    :returns: A list of the values of all the fields in order.
-    """
-
-    values = []
-    for i in fields.keys():
-        try:
-            values.append(query(i))
-        except non_exist_exc:
-            raise AttributeError(
-                'Attribute {} is not set'.format(i)
-            )
-        continue
-
-    return values
-
-
-def _make_programmable_tuple(cls, data_values):
-    """Makes a programmable tuple object
-
-    This function will actually make a programmable tuple object of the given
-    class according to the sequence of values for the fields. It is the
-    function that is actually used to make the object during the
-    initialization process. It can also be used for other purposes where we
-    already got values of all the fields and the initialization process needs
-    to be skipped.
-
-    :param cls: The class of the programmable tuple.
-    :param data_values: A sequence of values for all the fields of the
-        programmable tuple.
-    :returns: A value of the programmable tuple with the given data fields.
-    """
-
-    if issubclass(cls, tuple):
-        # For subclass of tuples.
-        #
-        # Create the tuple.
-        tp = tuple.__new__(cls, data_values)
-    else:
-        # For non-subclass of tuples.
-        content = tuple(data_values)
-        tp = object.__new__(cls)
-        tp.__content__ = content
-
-    return tp
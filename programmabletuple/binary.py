@@ -0,0 +1,456 @@
+"""
+===================================================
+Compact binary serialization of programmable tuples
+===================================================
+
+Compared with the dictionary form of programmable tuples, the binary format
+here does not repeat the names of the fields for each object. The format
+starts with a header table of the classes involved and their layouts of the
+fields, then the values follow positionally. Objects occurring multiple times
+are written only once, with back-references for the later occurrences.
+
+The format is,
+
+1. The magic bytes ``PTB`` and the version byte.
+2. A flag byte, telling if the data fields are included.
+3. The class table, with the number of classes, then for each class, its tag,
+   its number of defining fields, its number of written fields, and the
+   names of the written fields.
+4. The encoded root value.
+
+Integers in the format are encoded as LEB128 variable-length integers, with
+signed ones zigzag-encoded first. Each value starts with a type byte. Objects
+are numbered by the order of their starts, which is used by the
+back-references.
+
+"""
+
+
+import struct
+
+from . import (
+    ProgrammableTupleMeta, _form_content_maker, _make_from_defining
+)
+
+
+#
+# Constants of the format
+# -----------------------
+#
+
+
+_MAGIC = b'PTB\x01'
+
+_FLAG_FULL = 0x01
+
+_NONE = 0x00
+_FALSE = 0x01
+_TRUE = 0x02
+_INT = 0x03
+_FLOAT = 0x04
+_STR = 0x05
+_BYTES = 0x06
+_TUPLE = 0x07
+_LIST = 0x08
+_DICT = 0x09
+_OBJECT = 0x0A
+_BACKREF = 0x0B
+
+_DOUBLE = struct.Struct('<d')
+
+
+#
+# Public functions
+# ----------------
+#
+
+
+def dumps(obj, full=True, class_tags=None):
+    """Serializes a value with programmable tuples into bytes
+
+    Besides programmable tuples, the value can contain ``None``, booleans,
+    integers, floats, strings, bytes, tuples, lists and dictionaries.
+
+    :param obj: The value to serialize, normally a programmable tuple.
+    :param bool full: If the data fields are written as well. Only the
+        defining fields are written otherwise, and the objects can only be
+        loaded through the initializer.
+    :param Mapping class_tags: The mapping from classes to their tags in the
+        class table. By default, the qualified names of the classes are used.
+    :returns: The bytes of the serialization.
+    """
+
+    classes = _ClassTable(full, class_tags)
+    body = bytearray()
+    _encode(obj, body, classes)
+
+    out = bytearray(_MAGIC)
+    out.append(_FLAG_FULL if full else 0)
+    classes.write(out)
+    out += body
+    return bytes(out)
+
+
+def loads(data, classes, make=False):
+    """Loads a value with programmable tuples from bytes
+
+    :param bytes data: The serialization from :py:func:`dumps`.
+    :param classes: The mapping from class tags to the classes, or an
+        iterable of the classes when the default tags are used.
+    :param bool make: If the objects are made directly from the values of all
+        the fields with the initialization process bypassed, like the
+        ``_make`` method. This requires the data fields to be written.
+    :returns: The loaded value.
+    """
+
+    data = memoryview(data)
+    if bytes(data[0:len(_MAGIC)]) != _MAGIC:
+        raise ValueError('Invalid binary serialization of programmable tuples')
+    pos = len(_MAGIC)
+
+    full = bool(data[pos] & _FLAG_FULL)
+    pos += 1
+    if make and not full:
+        raise ValueError(
+            'Objects cannot be made directly without the data fields'
+        )
+
+    if not hasattr(classes, 'keys'):
+        classes = {_get_default_tag(i): i for i in classes}
+
+    plans, pos = _read_class_table(data, pos, classes, full, make)
+    val, pos = _decode(data, pos, plans)
+    if pos != len(data):
+        raise ValueError('Trailing bytes in the binary serialization')
+    return val
+
+
+def dump(obj, fp, full=True, class_tags=None):
+    """Serializes a value with programmable tuples into a binary file"""
+    fp.write(dumps(obj, full=full, class_tags=class_tags))
+
+
+def load(fp, classes, make=False):
+    """Loads a value with programmable tuples from a binary file"""
+    return loads(fp.read(), classes, make=make)
+
+
+#
+# Encoding
+# --------
+#
+
+
+class _ClassTable(object):
+
+    """The table of classes met during the encoding"""
+
+    __slots__ = ['_full', '_class_tags', '_indices', '_classes']
+
+    def __init__(self, full, class_tags):
+        """Initializes an empty class table"""
+        self._full = full
+        self._class_tags = class_tags
+        self._indices = {}
+        self._classes = []
+
+    def index(self, cls):
+        """Gets the index of the class and its number of written fields"""
+        try:
+            return self._indices[cls]
+        except KeyError:
+            pass
+        n_fields = len(cls.__fields__) if self._full else (
+            cls.__defining_count__
+        )
+        entry = (len(self._classes), n_fields)
+        self._indices[cls] = entry
+        self._classes.append(cls)
+        return entry
+
+    def write(self, out):
+        """Writes the class table"""
+        _write_uint(out, len(self._classes))
+        for cls in self._classes:
+            if self._class_tags is None:
+                tag = _get_default_tag(cls)
+            else:
+                tag = self._class_tags[cls]
+            _write_str(out, tag)
+            _write_uint(out, cls.__defining_count__)
+            _, n_fields = self._indices[cls]
+            _write_uint(out, n_fields)
+            for fn in list(cls.__fields__)[0:n_fields]:
+                _write_str(out, fn)
+                continue
+            continue
+
+
+def _encode(obj, out, classes):
+    """Encodes a value iteratively in pre-order"""
+
+    memo = {}  # From object identity to object index.
+
+    stack = [obj]
+    while stack:
+        val = stack.pop()
+        type_ = type(val)
+
+        if isinstance(type_, ProgrammableTupleMeta):
+            if id(val) in memo:
+                out.append(_BACKREF)
+                _write_uint(out, memo[id(val)])
+                continue
+            memo[id(val)] = len(memo)
+            idx, n_fields = classes.index(type_)
+            out.append(_OBJECT)
+            _write_uint(out, idx)
+            stack.extend(reversed(val.__content__[0:n_fields]))
+        elif val is None:
+            out.append(_NONE)
+        elif type_ is bool:
+            out.append(_TRUE if val else _FALSE)
+        elif type_ is int:
+            out.append(_INT)
+            _write_uint(out, val * 2 if val >= 0 else -val * 2 - 1)
+        elif type_ is float:
+            out.append(_FLOAT)
+            out += _DOUBLE.pack(val)
+        elif type_ is str:
+            out.append(_STR)
+            _write_str(out, val)
+        elif type_ is bytes:
+            out.append(_BYTES)
+            _write_uint(out, len(val))
+            out += val
+        elif type_ is tuple or type_ is list:
+            out.append(_TUPLE if type_ is tuple else _LIST)
+            _write_uint(out, len(val))
+            stack.extend(reversed(val))
+        elif type_ is dict:
+            out.append(_DICT)
+            _write_uint(out, len(val))
+            for k, v in reversed(list(val.items())):
+                stack.append(v)
+                stack.append(k)
+                continue
+        else:
+            raise TypeError(
+                'Values of type {} cannot be serialized'.format(
+                    type_.__name__
+                )
+            )
+
+        continue
+
+
+def _write_uint(out, val):
+    """Writes an unsigned integer as LEB128"""
+    while val >= 0x80:
+        out.append((val & 0x7F) | 0x80)
+        val >>= 7
+    out.append(val)
+
+
+def _write_str(out, val):
+    """Writes a string as its UTF-8 encoding with the length"""
+    encoded = val.encode('utf-8')
+    _write_uint(out, len(encoded))
+    out += encoded
+
+
+def _get_default_tag(cls):
+    """Gets the default tag for a class"""
+    return '{}.{}'.format(cls.__module__, cls.__qualname__)
+
+
+#
+# Decoding
+# --------
+#
+
+
+def _read_uint(data, pos):
+    """Reads an unsigned LEB128 integer
+
+    :returns: The integer and the new position.
+    """
+    result = 0
+    shift = 0
+    while True:
+        byte = data[pos]
+        pos += 1
+        result |= (byte & 0x7F) << shift
+        if byte < 0x80:
+            return result, pos
+        shift += 7
+
+
+def _read_str(data, pos):
+    """Reads a string with its length"""
+    size, pos = _read_uint(data, pos)
+    end = pos + size
+    return str(data[pos:end], 'utf-8'), end
+
+
+def _read_class_table(data, pos, classes, full, make):
+    """Reads the class table
+
+    :returns: The list of the plans for constructing the objects of each
+        class, as pairs of the number of values and a function making the
+        object from the list of the values. And the new position.
+    """
+
+    n_classes, pos = _read_uint(data, pos)
+    plans = []
+    for _ in range(n_classes):
+        tag, pos = _read_str(data, pos)
+        defining_count, pos = _read_uint(data, pos)
+        n_fields, pos = _read_uint(data, pos)
+        names = []
+        for _ in range(n_fields):
+            name, pos = _read_str(data, pos)
+            names.append(name)
+            continue
+
+        try:
+            cls = classes[tag]
+        except KeyError:
+            raise ValueError(
+                'The class for tag {} cannot be resolved'.format(tag)
+            )
+        plans.append((n_fields, _form_class_maker(
+            cls, names, defining_count, full, make
+        )))
+        continue
+
+    return plans, pos
+
+
+def _form_class_maker(cls, names, defining_count, full, make):
+    """Forms the function making objects from the written values"""
+
+    local_fields = list(cls.__fields__)
+    if full:
+        expected = local_fields
+    else:
+        expected = local_fields[0:cls.__defining_count__]
+    if defining_count != cls.__defining_count__ or (
+            sorted(names) != sorted(expected)
+    ):
+        raise ValueError(
+            'The layout {} does not match the fields of class {}'.format(
+                names, cls.__name__
+            )
+        )
+
+    # The order of the values in the local layout, when it is different.
+    if names == expected:
+        order = None
+    else:
+        positions = {v: i for i, v in enumerate(names)}
+        order = [positions[i] for i in expected]
+
+    if make:
+        make_content = _form_content_maker(cls)
+    else:
+        def make_content(values):
+            """Makes the object through the initializer"""
+            return _make_from_defining(cls, values[0:defining_count])
+
+    if order is None:
+        return make_content
+    return lambda values: make_content([values[i] for i in order])
+
+
+_CONTAINERS = {_TUPLE: tuple, _LIST: list}
+
+
+def _decode(data, pos, plans):
+    """Decodes a value iteratively
+
+    Each of the frames on the stack is a list of the kind of the value, the
+    number of remaining children, the list of the children, and the
+    additional information.
+
+    :returns: The decoded value and the new position.
+    """
+
+    objects = []
+    stack = []
+
+    while True:
+        tag = data[pos]
+        pos += 1
+
+        if tag == _NONE:
+            val = None
+        elif tag == _FALSE:
+            val = False
+        elif tag == _TRUE:
+            val = True
+        elif tag == _INT:
+            val, pos = _read_uint(data, pos)
+            val = val // 2 if val % 2 == 0 else -(val + 1) // 2
+        elif tag == _FLOAT:
+            val, = _DOUBLE.unpack_from(data, pos)
+            pos += _DOUBLE.size
+        elif tag == _STR:
+            val, pos = _read_str(data, pos)
+        elif tag == _BYTES:
+            size, pos = _read_uint(data, pos)
+            val = bytes(data[pos:pos + size])
+            pos += size
+        elif tag == _BACKREF:
+            idx, pos = _read_uint(data, pos)
+            val = objects[idx]
+            if val is None:
+                raise ValueError('Invalid back-reference {}'.format(idx))
+        elif tag in _CONTAINERS or tag == _DICT or tag == _OBJECT:
+            if tag == _OBJECT:
+                class_idx, pos = _read_uint(data, pos)
+                n_children, make = plans[class_idx]
+                info = (make, len(objects))
+                objects.append(None)
+            else:
+                n_children, pos = _read_uint(data, pos)
+                if tag == _DICT:
+                    n_children *= 2
+                info = None
+            frame = [tag, n_children, [], info]
+            if n_children > 0:
+                stack.append(frame)
+                continue
+            val = _finalize(frame, objects)
+        else:
+            raise ValueError('Invalid type byte {}'.format(tag))
+
+        # Deliver the value to the enclosing frames.
+        while True:
+            if not stack:
+                return val, pos
+            frame = stack[-1]
+            frame[2].append(val)
+            frame[1] -= 1
+            if frame[1] > 0:
+                break
+            stack.pop()
+            val = _finalize(frame, objects)
+            continue
+
+        continue
+
+
+def _finalize(frame, objects):
+    """Finalizes a container or object frame with all the children read"""
+
+    tag, _, children, info = frame
+    if tag == _OBJECT:
+        make, idx = info
+        val = make(children)
+        objects[idx] = val
+        return val
+    elif tag == _DICT:
+        return dict(zip(children[0::2], children[1::2]))
+    else:
+        return _CONTAINERS[tag](children)
@@ -0,0 +1,372 @@
+"""
+=======================================
+Columnar storage of programmable tuples
+=======================================
+
+For a large number of small programmable tuple objects, storing the objects
+one by one incurs the per-object overhead and makes scanning over a field
+slow. The container here stores the values of each field as a separate
+column, a list, an ``array.array``, or a NumPy array when it is available.
+The programmable tuple objects are only materialized on demand.
+
+"""
+
+
+import array
+import collections
+import itertools
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+from . import ProgrammableTupleMeta, _form_content_maker
+
+
+class ProgrammableTupleColumns(object):
+
+    """Columnar collection of programmable tuples
+
+    The collection is bound to a programmable tuple class, and the values for
+    each of the fields in ``__fields__`` are stored as a separate column. By
+    default, the columns are plain lists. For fields with primitive values, a
+    type code of ``array.array`` can be given, then the column is stored as a
+    compact array, or as a NumPy array with the corresponding type when
+    NumPy is requested.
+
+    Indexing the collection with an integer materializes the programmable
+    tuple object at the row, with the initialization process bypassed, while
+    indexing with a slice gives a new collection. The operations on the
+    collection never mutate it, but return new collections.
+
+    """
+
+    __slots__ = [
+        '_cls',
+        '_columns',
+        '_typecodes',
+        '_use_numpy',
+        '_make',
+    ]
+
+    def __init__(self, cls, columns=None, typecodes=None, use_numpy=False):
+        """Initializes the collection
+
+        :param cls: The programmable tuple class for the rows.
+        :param Mapping columns: The mapping from the names of all the fields
+            to the sequences of their values. By default, an empty collection
+            is created.
+        :param Mapping typecodes: The mapping from field names to the type
+            codes of ``array.array`` for the typed columns.
+        :param bool use_numpy: If the typed columns are going to be stored as
+            NumPy arrays.
+        """
+
+        if not isinstance(cls, ProgrammableTupleMeta):
+            raise ValueError(
+                'Invalid programmable tuple class {}'.format(cls)
+            )
+        if use_numpy and numpy is None:
+            raise ImportError('NumPy is not available.')
+
+        self._cls = cls
+        self._typecodes = dict(typecodes) if typecodes is not None else {}
+        self._use_numpy = use_numpy
+        self._make = _form_content_maker(cls)
+
+        invalid_fields = [
+            i for i in self._typecodes if i not in cls.__fields__
+        ]
+        if columns is not None:
+            invalid_fields.extend(
+                i for i in columns if i not in cls.__fields__
+            )
+        if invalid_fields:
+            raise ValueError('Invalid field(s) {} for {}'.format(
+                tuple(invalid_fields), cls.__name__
+            ))
+
+        self._columns = collections.OrderedDict()
+        for fn in cls.__fields__:
+            if columns is None:
+                values = ()
+            else:
+                try:
+                    values = columns[fn]
+                except KeyError:
+                    raise ValueError(
+                        'Column for field {} is not given'.format(fn)
+                    )
+            self._columns[fn] = self._new_column(fn, values)
+            continue
+
+        if len(set(len(i) for i in self._columns.values())) > 1:
+            raise ValueError('The columns have different lengths.')
+
+    @classmethod
+    def from_objects(cls, pt_cls, objects, typecodes=None, use_numpy=False):
+        """Makes a collection from programmable tuple objects
+
+        :param pt_cls: The programmable tuple class of the objects.
+        :param Iterable objects: The programmable tuple objects.
+        :returns: The collection with the objects as rows.
+        """
+
+        objects = list(objects)
+        columns = {}
+        for fn, idx in pt_cls.__fields__.items():
+            columns[fn] = [i.__content__[idx] for i in objects]
+            continue
+
+        return cls(
+            pt_cls, columns, typecodes=typecodes, use_numpy=use_numpy
+        )
+
+    #
+    # Basic information
+    #
+
+    @property
+    def cls(self):
+        """The programmable tuple class of the rows"""
+        return self._cls
+
+    def __len__(self):
+        """Gets the number of rows"""
+        for i in self._columns.values():
+            return len(i)
+        return 0
+
+    def column(self, field):
+        """Gets the column for the given field
+
+        The actual storage of the column is returned, which should not be
+        mutated.
+        """
+        try:
+            return self._columns[field]
+        except KeyError:
+            raise ValueError('Invalid field {} for {}'.format(
+                field, self._cls.__name__
+            ))
+
+    #
+    # Row access
+    #
+
+    def __getitem__(self, idx):
+        """Gets the object at the row or the collection of the slice"""
+
+        if isinstance(idx, slice):
+            return self.take(range(*idx.indices(len(self))))
+
+        return self._make([
+            _get_value(i, idx) for i in self._columns.values()
+        ])
+
+    def __iter__(self):
+        """Iterates over the programmable tuple objects of the rows"""
+        return map(self._make, self.iter_rows())
+
+    def iter_rows(self, fields=None):
+        """Iterates over the rows as plain tuples
+
+        :param Iterable fields: The fields to be included in the rows, all the
+            fields by default.
+        """
+        columns = self.project(*fields) if fields is not None else (
+            self._columns
+        )
+        return zip(*[_to_list(i) for i in columns.values()])
+
+    #
+    # Adding rows
+    #
+
+    def extend(self, objects):
+        """Gets a new collection with the given objects appended"""
+
+        objects = list(objects)
+        for obj in objects:
+            if type(obj) is not self._cls:
+                raise ValueError(
+                    'Invalid object {!r} for {}'.format(
+                        obj, self._cls.__name__
+                    )
+                )
+            continue
+
+        columns = {}
+        for fn, idx in self._cls.__fields__.items():
+            columns[fn] = list(_to_list(self._columns[fn]))
+            columns[fn].extend(i.__content__[idx] for i in objects)
+            continue
+
+        return self._derive(columns)
+
+    #
+    # Vectorized operations
+    #
+
+    def take(self, indices):
+        """Gets a new collection with the rows at the given indices"""
+
+        if not isinstance(indices, (range, list)) and not _is_array(indices):
+            indices = list(indices)
+
+        columns = {}
+        for fn, column in self._columns.items():
+            if _is_array(column):
+                columns[fn] = column[numpy.asarray(indices, dtype=numpy.intp)]
+            else:
+                columns[fn] = [column[i] for i in indices]
+            continue
+
+        return self._derive(columns)
+
+    def filter(self, mask):
+        """Gets a new collection with only the rows selected by the mask
+
+        :param mask: A sequence of booleans for the rows, like the result of
+            a vectorized comparison on a NumPy column.
+        """
+
+        if len(mask) != len(self):
+            raise ValueError('The mask does not match the number of rows.')
+
+        columns = {}
+        for fn, column in self._columns.items():
+            if _is_array(column):
+                columns[fn] = column[numpy.asarray(mask, dtype=bool)]
+            else:
+                columns[fn] = list(itertools.compress(column, mask))
+            continue
+
+        return self._derive(columns)
+
+    def argsort(self, *fields, reverse=False):
+        """Gets the indices of the rows sorted by the given fields
+
+        The sorting is stable. When all the key columns are NumPy arrays,
+        the sorting is performed by NumPy.
+
+        :param fields: The names of the key fields, the first one is the
+            primary key.
+        :param bool reverse: If the rows are sorted in descending order.
+        """
+
+        if not fields:
+            raise ValueError('No field is given for sorting.')
+        keys = [self.column(i) for i in fields]
+        n_rows = len(self)
+
+        if all(_is_array(i) for i in keys):
+            if not reverse:
+                return numpy.lexsort(keys[::-1])
+            # Stable descending sort by sorting the reversed rows.
+            order = numpy.lexsort([i[::-1] for i in keys[::-1]])
+            return (n_rows - 1) - order[::-1]
+
+        if len(keys) == 1:
+            key, = keys
+            key = key.__getitem__
+        else:
+            key_rows = list(zip(*[_to_list(i) for i in keys]))
+            key = key_rows.__getitem__
+        return sorted(range(n_rows), key=key, reverse=reverse)
+
+    def sort(self, *fields, reverse=False):
+        """Gets a new collection with the rows sorted by the given fields"""
+        return self.take(self.argsort(*fields, reverse=reverse))
+
+    def project(self, *fields):
+        """Gets the columns for the given fields
+
+        :returns: An ordered dictionary from the given field names to their
+            columns.
+        """
+        return collections.OrderedDict(
+            (i, self.column(i)) for i in fields
+        )
+
+    def to_numpy(self, fields=None):
+        """Gets the columns as NumPy arrays
+
+        Typed columns are converted without going through Python objects,
+        while columns of Python lists are converted by NumPy as usual.
+
+        :param Iterable fields: The fields to be converted, all the fields by
+            default.
+        :returns: An ordered dictionary from field names to the arrays.
+        """
+
+        if numpy is None:
+            raise ImportError('NumPy is not available.')
+
+        if fields is None:
+            fields = self._columns.keys()
+
+        result = collections.OrderedDict()
+        for fn in fields:
+            column = self.column(fn)
+            if isinstance(column, array.array):
+                result[fn] = numpy.frombuffer(
+                    column, dtype=column.typecode
+                ).copy()
+            else:
+                result[fn] = numpy.asarray(column)
+            continue
+
+        return result
+
+    #
+    # Internal methods
+    #
+
+    def _new_column(self, field, values):
+        """Makes a new column for the given field"""
+
+        typecode = self._typecodes.get(field)
+        if typecode is None:
+            return list(values)
+        elif self._use_numpy:
+            if isinstance(values, array.array):
+                values = numpy.frombuffer(values, dtype=values.typecode)
+            elif not isinstance(values, numpy.ndarray):
+                values = list(values)
+            return numpy.array(values, dtype=typecode)
+        else:
+            return array.array(typecode, values)
+
+    def _derive(self, columns):
+        """Derives a new collection with the same settings"""
+        return type(self)(
+            self._cls, columns, typecodes=self._typecodes,
+            use_numpy=self._use_numpy
+        )
+
+    def __repr__(self):
+        """Formats the collection"""
+        return '{}({}, {} rows)'.format(
+            type(self).__name__, self._cls.__name__, len(self)
+        )
+
+
+def _is_array(obj):
+    """Tests if the given object is a NumPy array"""
+    return numpy is not None and isinstance(obj, numpy.ndarray)
+
+
+def _get_value(column, idx):
+    """Gets the value in a column as a plain Python object"""
+    if _is_array(column):
+        return column.item(idx)
+    return column[idx]
+
+
+def _to_list(column):
+    """Gets the values in a column as plain Python objects"""
+    if _is_array(column):
+        return column.tolist()
+    return column
@@ -0,0 +1,272 @@
+"""
+===================================================
+Memory-mapped on-disk stores of programmable tuples
+===================================================
+
+Flat programmable tuples, with only primitive values in their fields, can be
+appended to a file as the fixed binary records of
+:py:mod:`programmabletuple.records`. The file is read through ``mmap``, so
+that the records can be accessed randomly by index without loading the whole
+file, either as lazy views or as materialized objects.
+
+The file starts with the magic bytes ``PTMS`` and the length of the header
+as a 64-bit unsigned integer, then the header serializing the layout. The
+records follow from the next 8-byte boundary. The number of records is given
+by the size of the file.
+
+"""
+
+
+import mmap
+import os
+import struct
+
+from .records import RecordLayout, _align
+
+
+_MAGIC = b'PTMS'
+
+_PREAMBLE = struct.Struct('<4sQ')
+
+
+class MmapStore(object):
+
+    """Append-only on-disk store of programmable tuples
+
+    The stores can be used as context managers, which closes them on exit.
+    Views read from the store are invalidated after it is closed.
+    """
+
+    __slots__ = [
+        '_path',
+        '_cls',
+        '_formats',
+        '_readonly',
+        '_file',
+        '_layout',
+        '_start',
+        '_count',
+        '_map',
+    ]
+
+    def __init__(self, path, cls, formats=None, readonly=False):
+        """Opens the store at the given path
+
+        :param path: The path of the file, which is created when it does not
+            exist, unless the store is opened as read-only.
+        :param cls: The programmable tuple class of the records, whose fields
+            need to match the fields in the existing file.
+        :param formats: The formats of the fields for the records, see
+            :py:class:`RecordLayout`. For new files, the formats are inferred
+            from the first objects appended by default. For existing files,
+            the formats are read from the file, and they need to match when
+            given.
+        :param bool readonly: If the store is opened for reading only.
+        """
+
+        self._path = path
+        self._cls = cls
+        self._formats = formats
+        self._readonly = readonly
+        self._layout = None
+        self._start = 0
+        self._count = 0
+        self._map = None
+
+        if readonly:
+            self._file = open(path, 'rb')
+        elif os.path.exists(path):
+            self._file = open(path, 'r+b')
+        else:
+            self._file = open(path, 'w+b')
+
+        try:
+            self._read_header()
+        except Exception:
+            self._file.close()
+            raise
+
+    def _read_header(self):
+        """Reads the header of an existing file"""
+
+        file_size = os.fstat(self._file.fileno()).st_size
+        if file_size == 0:
+            return
+
+        self._file.seek(0)
+        preamble = self._file.read(_PREAMBLE.size)
+        try:
+            magic, header_len = _PREAMBLE.unpack(preamble)
+        except struct.error:
+            magic = None
+        if magic != _MAGIC:
+            raise ValueError(
+                'Invalid store of programmable tuples {}'.format(self._path)
+            )
+
+        layout = RecordLayout.from_header(
+            self._cls, self._file.read(header_len)
+        )
+        if self._formats is not None:
+            expected = RecordLayout(self._cls, self._formats).formats
+        else:
+            expected = layout.formats
+        if layout.formats != expected:
+            raise ValueError(
+                'The formats {} do not match the formats of the store'.format(
+                    self._formats
+                )
+            )
+
+        self._layout = layout
+        self._start = _align(_PREAMBLE.size + header_len)
+        self._count = max(0, file_size - self._start) // layout.size
+
+        # Drop any trailing partial record from an interrupted write.
+        end = self._start + self._count * layout.size
+        if not self._readonly and file_size > end:
+            self._file.truncate(end)
+
+    def _write_header(self, layout):
+        """Writes the header for a new file"""
+
+        header = layout.to_header()
+        start = _align(_PREAMBLE.size + len(header))
+        self._file.seek(0)
+        self._file.write(_PREAMBLE.pack(_MAGIC, len(header)))
+        self._file.write(header)
+        self._file.write(b'\x00' * (start - _PREAMBLE.size - len(header)))
+
+        self._layout = layout
+        self._start = start
+
+    #
+    # Appending
+    #
+
+    def append(self, obj):
+        """Appends an object to the store"""
+        self.extend([obj])
+
+    def extend(self, objs):
+        """Appends the objects to the store
+
+        :returns: The number of objects appended.
+        """
+
+        if self._readonly:
+            raise ValueError('The store is opened as read-only')
+
+        objs = list(objs)
+        if not objs:
+            return 0
+        for i in objs:
+            if type(i) is not self._cls:
+                raise ValueError(
+                    'Invalid object {!r} for class {}'.format(
+                        i, self._cls.__name__
+                    )
+                )
+
+        layout = self._layout
+        if layout is None:
+            if self._formats is None:
+                layout = RecordLayout.infer(self._cls, objs)
+            else:
+                layout = RecordLayout(self._cls, self._formats)
+
+        # Pack everything first, so that nothing is written on failure.
+        size = layout.size
+        buf = bytearray(size * len(objs))
+        for idx, obj in enumerate(objs):
+            layout.pack_into(buf, idx * size, obj)
+            continue
+
+        if self._layout is None:
+            self._write_header(layout)
+        self._file.seek(self._start + self._count * size)
+        self._file.write(buf)
+        self._file.flush()
+        self._count += len(objs)
+        return len(objs)
+
+    #
+    # Access of the records
+    #
+
+    @property
+    def layout(self):
+        """The layout of the records, None before any records are written"""
+        return self._layout
+
+    def __len__(self):
+        """Gets the number of records"""
+        return self._count
+
+    def _get_map(self):
+        """Gets the memory map covering all the records"""
+        end = self._start + self._count * self._layout.size
+        if self._map is None or len(self._map) < end:
+            # Earlier maps are left to the views still referencing them.
+            self._map = mmap.mmap(
+                self._file.fileno(), end, access=mmap.ACCESS_READ
+            )
+        return self._map
+
+    def _get_offset(self, idx):
+        """Gets the offset of the record with the given index"""
+        if idx < 0:
+            idx += self._count
+        if not 0 <= idx < self._count:
+            raise IndexError('Record index out of range')
+        return self._start + idx * self._layout.size
+
+    def __getitem__(self, idx):
+        """Gets the lazy view of the record with the given index"""
+        offset = self._get_offset(idx)
+        return self._layout.view(self._get_map(), offset)
+
+    def __iter__(self):
+        """Iterates over the lazy views of all the records"""
+        if self._count == 0:
+            return
+        view = self._layout.view
+        buf = self._get_map()
+        size = self._layout.size
+        for i in range(self._count):
+            yield view(buf, self._start + i * size)
+            continue
+
+    def materialize(self, idx):
+        """Makes the actual object of the record with the given index"""
+        offset = self._get_offset(idx)
+        return self._layout.make(self._get_map(), offset)
+
+    def materialize_all(self):
+        """Makes the actual objects of all the records"""
+        return [self.materialize(i) for i in range(self._count)]
+
+    #
+    # Life cycle
+    #
+
+    def close(self):
+        """Closes the store"""
+        if self._map is not None:
+            self._map.close()
+            self._map = None
+        self._file.close()
+
+    def __enter__(self):
+        """Enters the context"""
+        return self
+
+    def __exit__(self, *_):
+        """Closes the store on exit"""
+        self.close()
+
+    def __repr__(self):
+        """Formats the store"""
+        return '{}({!r}, {} x {})'.format(
+            type(self).__name__, self._path, self._count, self._cls.__name__
+        )
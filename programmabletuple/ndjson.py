@@ -0,0 +1,138 @@
+"""
+======================================
+Streaming JSON for programmable tuples
+======================================
+
+The :py:meth:`_asdict` and :py:meth:`_load_from_dict` methods need the entire
+intermediate dictionary tree in memory. The functions here write programmable
+tuples into file-like objects as JSON directly, chunk by chunk, and read
+newline-delimited JSON (NDJSON) back one record at a time.
+
+The JSON written for each object is the same as the JSON serialization of the
+result of :py:meth:`_asdict` with the same options, so that it can be read
+back by :py:meth:`_load_from_dict` as well.
+
+"""
+
+
+import json
+
+from . import ProgrammableTupleMeta, _iter_field_items
+
+
+def iterencode(obj, full=False, class_tags=None):
+    """Encodes a programmable tuple object as JSON chunk by chunk
+
+    Nested programmable tuples in the fields are encoded iteratively without
+    forming their dictionaries. Other values are encoded by the ``json``
+    module, where any programmable tuples inside them are encoded through
+    their dictionary form.
+
+    :param obj: The programmable tuple object to encode.
+    :param bool full: If the data fields are going to be included.
+    :param Mapping class_tags: The mapping from classes to their tags, which
+        are going to be set to the ``__class__`` keys.
+    :returns: An iterator of the string chunks of the JSON document.
+    """
+
+    def default(val):
+        """Encodes programmable tuples inside other values"""
+        if isinstance(type(val), ProgrammableTupleMeta):
+            return val._asdict(full=full, class_tags=class_tags)
+        raise TypeError(
+            'Object of type {} is not JSON serializable'.format(
+                type(val).__name__
+            )
+        )
+
+    encode = json.JSONEncoder(default=default).encode
+
+    yield '{'
+    stack = [(obj, _iter_field_items(obj, full), True)]
+    while stack:
+        curr, items, first = stack.pop()
+
+        for fn, val in items:
+            if not first:
+                yield ', '
+            first = False
+            yield encode(fn)
+            yield ': '
+            if isinstance(type(val), ProgrammableTupleMeta):
+                # Descend into the child, resuming the parent later.
+                stack.append((curr, items, False))
+                stack.append((val, _iter_field_items(val, full), True))
+                yield '{'
+                break
+            yield encode(val)
+            continue
+        else:
+            if class_tags:
+                if not first:
+                    yield ', '
+                yield '"__class__": '
+                yield encode(class_tags[type(curr)])
+            yield '}'
+
+        continue
+
+
+def dump(objs, fp, full=False, class_tags=None):
+    """Writes programmable tuple objects into a file as NDJSON
+
+    Each object is written as a JSON document on its own line, without
+    forming its dictionary in memory.
+
+    :param Iterable objs: The programmable tuple objects to write.
+    :param fp: The text file-like object to write to.
+    :param bool full: If the data fields are going to be included.
+    :param Mapping class_tags: The mapping from classes to their tags.
+    :returns: The number of objects written.
+    """
+
+    count = 0
+    for obj in objs:
+        for chunk in iterencode(obj, full=full, class_tags=class_tags):
+            fp.write(chunk)
+            continue
+        fp.write('\n')
+        count += 1
+        continue
+
+    return count
+
+
+def load(fp, cls=None, full=False, class_tags=None):
+    """Reads programmable tuple objects from NDJSON
+
+    The objects are read lazily, one line at a time, and blank lines are
+    skipped.
+
+    :param fp: The text file-like object to read from, or any iterable of
+        lines.
+    :param cls: The programmable tuple class for records without class tags.
+    :param bool full: If the data fields are going to be read and used.
+    :param Mapping class_tags: The mapping from class tags to the classes.
+    :returns: A generator of the programmable tuple objects.
+    """
+
+    for line in fp:
+        if not line.strip():
+            continue
+        dict_ = json.loads(line)
+
+        obj_class = cls
+        if obj_class is None:
+            try:
+                obj_class = class_tags[dict_['__class__']]
+            except (KeyError, TypeError):
+                raise ValueError(
+                    'The class of the record cannot be resolved: {}'.format(
+                        line.strip()
+                    )
+                )
+
+        yield obj_class._load_from_dict(
+            dict_, full=full, class_tags=class_tags
+        )
+        continue
@@ -0,0 +1,163 @@
+"""
+==========================================
+Parallel processing of programmable tuples
+==========================================
+
+Helpers for constructing and transforming programmable tuples across the
+processes of a ``concurrent.futures`` process pool. The work is split into
+chunks automatically, and each chunk is moved between the processes as a
+single pickle, where programmable tuples are transported by the values of
+all their fields. So they are not initialized again in the receiving
+process, different from the default pickling through ``__getnewargs_ex__``.
+This relies on the ``reducer_override`` hook of picklers, which is only
+available from Python 3.8, the minimum version required by the package.
+
+The functions to be mapped, as well as the programmable tuple classes, need
+to be able to be pickled by reference, like module-level definitions.
+
+"""
+
+
+import concurrent.futures
+import io
+import itertools
+import os
+import pickle
+import sys
+
+from . import ProgrammableTupleMeta, _restore_content
+
+
+# Older picklers would silently ignore the reducer override and initialize
+# the objects again.
+if sys.version_info < (3, 8):
+    raise ImportError(
+        'Python 3.8 or later is required for the parallel processing.'
+    )
+
+
+#
+# Public functions
+# ----------------
+#
+
+
+def map_objects(func, objs, max_workers=None, chunksize=None, executor=None):
+    """Maps a function over programmable tuples in parallel
+
+    :param Callable func: The function to be applied to each object.
+    :param Iterable objs: The objects, normally programmable tuples.
+    :param int max_workers: The number of worker processes, by default the
+        number of processors.
+    :param int chunksize: The number of objects in each chunk, by default
+        chosen so that each worker gets about four chunks.
+    :param executor: An existing executor to use. By default, a new process
+        pool is created and shut down after the work.
+    :returns: The list of the results in the order of the objects.
+    """
+
+    return _run_chunks(
+        _map_chunk, lambda chunk: (func, chunk), objs,
+        max_workers, chunksize, executor
+    )
+
+
+def construct_objects(cls, rows, init=True, max_workers=None, chunksize=None,
+                      executor=None):
+    """Constructs programmable tuples from rows in parallel
+
+    The rows are handled by the :py:meth:`_from_rows` method of the class in
+    the worker processes.
+
+    :param cls: The programmable tuple class.
+    :param Iterable rows: The rows for the objects.
+    :param bool init: If the initialization process is going to be
+        performed.
+    :returns: The list of the objects in the order of the rows.
+    """
+
+    if not isinstance(cls, ProgrammableTupleMeta):
+        raise ValueError(
+            'Invalid programmable tuple class {}'.format(cls)
+        )
+
+    return _run_chunks(
+        _construct_chunk, lambda chunk: (cls, chunk, init), rows,
+        max_workers, chunksize, executor
+    )
+
+
+def dumps(obj):
+    """Pickles a value with programmable tuples transported by content"""
+    buf = io.BytesIO()
+    _ContentPickler(buf, pickle.HIGHEST_PROTOCOL).dump(obj)
+    return buf.getvalue()
+
+
+def loads(data):
+    """Unpickles a value pickled by :py:func:`dumps`"""
+    return pickle.loads(data)
+
+
+#
+# Internal functions
+# ------------------
+#
+
+
+class _ContentPickler(pickle.Pickler):
+
+    """Pickler reducing all programmable tuples to their content
+
+    The reduction is applied to programmable tuples of any class, regardless
+    of the pickling defined by the class.
+    """
+
+    def reducer_override(self, obj):
+        """Reduces programmable tuples to their content"""
+        if isinstance(type(obj), ProgrammableTupleMeta):
+            return _restore_content, (type(obj), tuple(obj.__content__))
+        return NotImplemented
+
+
+def _run_chunks(worker, form_task, items, max_workers, chunksize, executor):
+    """Runs the worker on chunks of the items in a process pool
+
+    :param worker: The module-level worker function, taking the pickled task
+        for a chunk and returning the pickled list of results.
+    :param form_task: The function forming the task from a list of items.
+    :returns: The concatenated list of the results.
+    """
+
+    items = list(items)
+    if not items:
+        return []
+
+    if chunksize is None:
+        n_workers = max_workers or os.cpu_count() or 1
+        chunksize = max(1, -(-len(items) // (n_workers * 4)))
+
+    tasks = [
+        dumps(form_task(items[i:i + chunksize]))
+        for i in range(0, len(items), chunksize)
+    ]
+
+    if executor is None:
+        with concurrent.futures.ProcessPoolExecutor(max_workers) as pool:
+            results = list(pool.map(worker, tasks))
+    else:
+        results = list(executor.map(worker, tasks))
+
+    return list(itertools.chain.from_iterable(map(loads, results)))
+
+
+def _map_chunk(task):
+    """Maps the function over a chunk in a worker process"""
+    func, objs = loads(task)
+    return dumps([func(i) for i in objs])
+
+
+def _construct_chunk(task):
+    """Constructs the objects for a chunk in a worker process"""
+    cls, rows, init = loads(task)
+    return dumps(cls._from_rows(rows, init=init))
@@ -0,0 +1,357 @@
+"""
+==================================================
+Structural pattern matching of programmable tuples
+==================================================
+
+Patterns describe programmable tuples by their exact classes and the values
+of their defining fields. The values can be given as literal values, nested
+patterns, tuples or lists of patterns, or wildcards capturing the values
+matched under their names.
+
+Many patterns can be compiled into a :py:class:`PatternIndex`, which is a
+discrimination net keyed on the classes of the nodes and the values at the
+positions of the defining fields. Matching a node against the index filters
+the candidate patterns in one walk over the node, and only the candidates are
+verified against the node. So the cost does not grow with the number of
+patterns that cannot match.
+
+"""
+
+
+from . import ProgrammableTupleMeta
+from .traversal import preorder
+
+
+#
+# Patterns
+# --------
+#
+
+
+class Wildcard(object):
+
+    """Wildcard matching any value
+
+    Wildcards with a name capture the value they match under the name. All
+    the wildcards with the same name in a pattern need to match equal
+    values.
+    """
+
+    __slots__ = ['name', 'cls', 'predicate']
+
+    def __init__(self, name=None, cls=None, predicate=None):
+        """Initializes the wildcard
+
+        :param str name: The name to capture the value, None for no capture.
+        :param cls: The class, or tuple of classes, that the values need to
+            be instances of.
+        :param predicate: A callable that the values need to satisfy.
+        """
+        self.name = name
+        self.cls = cls
+        self.predicate = predicate
+
+    def accepts(self, val):
+        """Tests if the value satisfies the constraints of the wildcard"""
+        if self.cls is not None and not isinstance(val, self.cls):
+            return False
+        if self.predicate is not None and not self.predicate(val):
+            return False
+        return True
+
+    def __repr__(self):
+        """Formats the wildcard"""
+        return '{}({!r})'.format(type(self).__name__, self.name)
+
+
+class Pattern(object):
+
+    """Pattern of programmable tuples of a class
+
+    The values of the defining fields are constrained by the positional and
+    keyword arguments. The fields not given are not constrained.
+    """
+
+    __slots__ = ['cls', 'constraints']
+
+    def __init__(self, cls, *args, **kwargs):
+        """Initializes the pattern
+
+        :param cls: The exact programmable tuple class of the nodes matched.
+        :param args: The constraints of the leading defining fields.
+        :param kwargs: The constraints of the defining fields by their names.
+        """
+
+        if not isinstance(cls, ProgrammableTupleMeta):
+            raise ValueError(
+                'Invalid programmable tuple class {}'.format(cls)
+            )
+
+        names = list(cls._gen_defining_field_names())
+        if len(args) > len(names):
+            raise ValueError(
+                'Too many constraints for the defining fields of {}'.format(
+                    cls.__name__
+                )
+            )
+        constraints = dict(zip(names, args))
+        for fn, val in kwargs.items():
+            if fn not in names:
+                raise ValueError(
+                    'Invalid defining field {} of {}'.format(fn, cls.__name__)
+                )
+            if fn in constraints:
+                raise ValueError(
+                    'Multiple constraints for field {}'.format(fn)
+                )
+            constraints[fn] = val
+            continue
+
+        self.cls = cls
+        self.constraints = tuple(
+            (idx, constraints[fn]) for idx, fn in enumerate(names)
+            if fn in constraints
+        )
+
+    def match(self, node):
+        """Matches the node against the pattern
+
+        :returns: The dictionary of the values captured by the named
+            wildcards, or None when the node does not match.
+        """
+        return match(self, node)
+
+    def __repr__(self):
+        """Formats the pattern"""
+        names = list(self.cls._gen_defining_field_names())
+        return '{}({}{})'.format(
+            type(self).__name__, self.cls.__name__, ''.join(
+                ', {}={!r}'.format(names[idx], val)
+                for idx, val in self.constraints
+            )
+        )
+
+
+def match(pattern, val):
+    """Matches a value against a pattern
+
+    :param pattern: A pattern, a wildcard, or any value to be matched
+        literally, possibly with patterns and wildcards nested in tuples and
+        lists.
+    :param val: The value to match.
+    :returns: The dictionary of the values captured by the named wildcards,
+        or None when the value does not match.
+    """
+
+    bindings = {}
+    stack = [(pattern, val)]
+    while stack:
+        pat, curr = stack.pop()
+
+        if isinstance(pat, Wildcard):
+            if not pat.accepts(curr):
+                return None
+            if pat.name is not None:
+                if pat.name in bindings:
+                    bound = bindings[pat.name]
+                    if bound is not curr and not bound == curr:
+                        return None
+                else:
+                    bindings[pat.name] = curr
+        elif isinstance(pat, Pattern):
+            if type(curr) is not pat.cls:
+                return None
+            content = curr.__content__
+            stack.extend(
+                (sub, content[idx]) for idx, sub in reversed(pat.constraints)
+            )
+        elif type(pat) is tuple or type(pat) is list:
+            if type(curr) is not type(pat) or len(curr) != len(pat):
+                return None
+            stack.extend(zip(reversed(pat), reversed(curr)))
+        elif pat is not curr and not pat == curr:
+            return None
+
+        continue
+
+    return bindings
+
+
+#
+# Discrimination net
+# ------------------
+#
+
+
+_ANY = object()
+
+_ANY_FIELD = Wildcard()
+
+
+class _NetNode(object):
+
+    """Node of the discrimination net"""
+
+    __slots__ = ['edges', 'leaves']
+
+    def __init__(self):
+        """Initializes an empty node"""
+        self.edges = {}
+        self.leaves = []
+
+
+class PatternIndex(object):
+
+    """Index of many patterns for matching them at once
+
+    Each of the patterns is added with a payload, like a rule to apply or a
+    name. The patterns are compiled into paths in a discrimination net, from
+    the keys of the values at the positions in the pre-order of the pattern,
+    where wildcards and the fields not constrained are keyed as matching
+    anything.
+    """
+
+    __slots__ = ['_root', '_count']
+
+    def __init__(self, patterns=None):
+        """Initializes the index
+
+        :param patterns: An iterable of the pairs of the patterns and their
+            payloads to add.
+        """
+        self._root = _NetNode()
+        self._count = 0
+        if patterns is not None:
+            for pattern, payload in patterns:
+                self.add(pattern, payload)
+                continue
+
+    def add(self, pattern, payload=None):
+        """Adds a pattern with its payload to the index"""
+
+        net_node = self._root
+        for key in _compile(pattern):
+            net_node = net_node.edges.setdefault(key, _NetNode())
+            continue
+        net_node.leaves.append((self._count, pattern, payload))
+        self._count += 1
+
+    def __len__(self):
+        """Gets the number of patterns in the index"""
+        return self._count
+
+    def candidates(self, val):
+        """Gets the patterns that possibly match the value from the net
+
+        :returns: The list of the triples of the order of addition, the
+            pattern and its payload, in the order of addition.
+        """
+
+        found = []
+        # The pending values are kept as linked lists of pairs.
+        stack = [(self._root, (val, None))]
+        while stack:
+            net_node, pending = stack.pop()
+            if pending is None:
+                found.extend(net_node.leaves)
+                continue
+
+            curr, rest = pending
+            edges = net_node.edges
+            if _ANY in edges:
+                stack.append((edges[_ANY], rest))
+            key, children = _key_value(curr)
+            if key is not None and key in edges:
+                for i in reversed(children):
+                    rest = (i, rest)
+                    continue
+                stack.append((edges[key], rest))
+            continue
+
+        found.sort(key=lambda x: x[0])
+        return found
+
+    def match(self, val):
+        """Matches the value against all the patterns in the index
+
+        :returns: The list of the pairs of the payloads and the bindings of
+            the patterns matching the value, in the order of addition.
+        """
+
+        result = []
+        for _, pattern, payload in self.candidates(val):
+            bindings = match(pattern, val)
+            if bindings is not None:
+                result.append((payload, bindings))
+            continue
+
+        return result
+
+    def find_all(self, tree, unique=True):
+        """Finds all the matches of all the patterns in a tree
+
+        :param tree: The root programmable tuple object.
+        :param bool unique: If shared subtrees are searched only once.
+        :returns: The list of the triples of the nodes, the payloads, and
+            the bindings, in the pre-order of the nodes.
+        """
+
+        result = []
+        for node in preorder(tree, unique=unique):
+            for payload, bindings in self.match(node):
+                result.append((node, payload, bindings))
+                continue
+            continue
+
+        return result
+
+
+def _key_value(val):
+    """Gets the key of a value in the net and its children
+
+    :returns: The key, None for unhashable values, and the list of the
+        children values to be keyed after it.
+    """
+
+    type_ = type(val)
+    if isinstance(type_, ProgrammableTupleMeta):
+        return (
+            ('node', type_), val.__content__[0:val.__defining_count__]
+        )
+    elif type_ is tuple or type_ is list:
+        return ('seq', type_, len(val)), val
+
+    try:
+        hash(val)
+    except TypeError:
+        return None, ()
+    return ('lit', val), ()
+
+
+def _compile(pattern):
+    """Compiles a pattern into the keys of its path in the net"""
+
+    keys = []
+    stack = [pattern]
+    while stack:
+        pat = stack.pop()
+        if isinstance(pat, Wildcard):
+            keys.append(_ANY)
+        elif isinstance(pat, Pattern):
+            keys.append(('node', pat.cls))
+            constraints = dict(pat.constraints)
+            stack.extend(
+                constraints.get(i, _ANY_FIELD)
+                for i in reversed(range(pat.cls.__defining_count__))
+            )
+        else:
+            key, children = _key_value(pat)
+            if key is None:
+                # Unhashable literals are checked in the verification.
+                keys.append(_ANY)
+            else:
+                keys.append(key)
+                stack.extend(reversed(children))
+        continue
+
+    return keys
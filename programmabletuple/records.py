@@ -0,0 +1,344 @@
+"""
+=============================================
+Fixed binary records of programmable tuples
+=============================================
+
+For programmable tuples with only primitive values in their fields, the
+objects can be stored as fixed-size binary records, laid out by the order
+of the fields in ``__fields__``. The layout and the lazy views of the records
+here are the basis of the shared-memory and memory-mapped storages.
+
+The format of each field is a code of the ``struct`` module for numbers and
+booleans. Bytes are stored with the ``struct`` code like ``16s`` for at most
+16 bytes, and strings are stored in their UTF-8 encoding with the special
+code like ``16u``. Both are padded with null bytes, which are stripped on
+reading.
+
+"""
+
+
+import json
+import struct
+
+from . import ProgrammableTupleMeta, _form_content_maker
+
+
+class RecordLayout(object):
+
+    """Fixed binary layout of the fields of a programmable tuple class
+
+    The records are packed in little-endian standard sizes without any
+    alignment.
+    """
+
+    __slots__ = [
+        'cls',
+        'formats',
+        'size',
+        '_struct',
+        '_field_structs',
+        '_str_idxes',
+        '_decode_idxes',
+        '_make',
+        '_view_class',
+    ]
+
+    def __init__(self, cls, formats):
+        """Initializes the layout
+
+        :param cls: The programmable tuple class.
+        :param formats: The mapping from field names to their formats, or a
+            sequence of the formats in the order of the fields.
+        """
+
+        if not isinstance(cls, ProgrammableTupleMeta):
+            raise ValueError(
+                'Invalid programmable tuple class {}'.format(cls)
+            )
+
+        if hasattr(formats, 'keys'):
+            try:
+                formats = [formats[i] for i in cls.__fields__]
+            except KeyError as exc:
+                raise ValueError(
+                    'Format for field {} is not given'.format(exc.args[0])
+                )
+        formats = tuple(formats)
+        if len(formats) != len(cls.__fields__):
+            raise ValueError('Invalid formats {} for {}'.format(
+                formats, cls.__name__
+            ))
+
+        self.cls = cls
+        self.formats = formats
+
+        # The struct codes with the strings stored as bytes.
+        codes = [
+            i[:-1] + 's' if i.endswith('u') else i for i in formats
+        ]
+        self._struct = struct.Struct('<' + ''.join(codes))
+        self.size = self._struct.size
+        self._str_idxes = tuple(
+            i for i, v in enumerate(formats) if v.endswith('u')
+        )
+        self._decode_idxes = tuple(
+            i for i, v in enumerate(formats) if v[-1] in 'us'
+        )
+
+        self._field_structs = []
+        offset = 0
+        for code in codes:
+            field_struct = struct.Struct('<' + code)
+            self._field_structs.append((offset, field_struct))
+            offset += field_struct.size
+            continue
+
+        self._make = _form_content_maker(cls)
+        self._view_class = None
+
+    @classmethod
+    def infer(cls, pt_cls, objs):
+        """Infers the layout from the values in the given objects
+
+        Booleans, integers and floats are stored as ``?``, ``q`` and ``d``.
+        Bytes and strings are given the width of the longest value.
+        """
+
+        objs = list(objs)
+        formats = []
+        for fn, idx in pt_cls.__fields__.items():
+            values = [i.__content__[idx] for i in objs]
+            types = set(type(i) for i in values)
+            if types <= {bool}:
+                code = '?'
+            elif types <= {int}:
+                code = 'q'
+            elif types <= {int, float}:
+                code = 'd'
+            elif types <= {str}:
+                code = '{}u'.format(
+                    max([len(i.encode('utf-8')) for i in values] + [1])
+                )
+            elif types <= {bytes}:
+                code = '{}s'.format(max([len(i) for i in values] + [1]))
+            else:
+                raise ValueError(
+                    'Values of field {} cannot be stored in records'.format(
+                        fn
+                    )
+                )
+            formats.append(code)
+            continue
+
+        return cls(pt_cls, formats)
+
+    #
+    # Packing and unpacking
+    #
+
+    def pack_into(self, buf, offset, obj):
+        """Packs the object into the buffer at the offset"""
+
+        values = obj.__content__
+        if self._decode_idxes:
+            values = list(values)
+            for i in self._str_idxes:
+                values[i] = values[i].encode('utf-8')
+                continue
+            for i in self._decode_idxes:
+                width = self._field_structs[i][1].size
+                if len(values[i]) > width:
+                    raise ValueError(
+                        'Value {!r} is longer than {} bytes'.format(
+                            values[i], width
+                        )
+                    )
+                continue
+        self._struct.pack_into(buf, offset, *values)
+
+    def pack(self, obj):
+        """Packs the object into bytes"""
+        buf = bytearray(self.size)
+        self.pack_into(buf, 0, obj)
+        return bytes(buf)
+
+    def unpack_from(self, buf, offset):
+        """Unpacks the values of all the fields from the buffer"""
+        values = self._struct.unpack_from(buf, offset)
+        if self._decode_idxes:
+            values = list(values)
+            for i in self._decode_idxes:
+                values[i] = self._decode(i, values[i])
+                continue
+            values = tuple(values)
+        return values
+
+    def unpack_field(self, buf, offset, idx):
+        """Unpacks the value of a single field from the buffer"""
+        field_offset, field_struct = self._field_structs[idx]
+        val, = field_struct.unpack_from(buf, offset + field_offset)
+        return self._decode(idx, val)
+
+    def make(self, buf, offset):
+        """Makes the programmable tuple object from the buffer
+
+        The initialization process is bypassed, like the ``_make`` method.
+        """
+        return self._make(self.unpack_from(buf, offset))
+
+    def view(self, buf, offset):
+        """Gets the lazy view of the record in the buffer"""
+        if self._view_class is None:
+            self._view_class = _form_view_class(self)
+        return self._view_class(buf, offset)
+
+    def _decode(self, idx, val):
+        """Decodes a raw value from the struct module"""
+        if isinstance(val, bytes):
+            val = val.rstrip(b'\x00')
+            if idx in self._str_idxes:
+                val = val.decode('utf-8')
+        return val
+
+    #
+    # Serialization of the layout
+    #
+
+    def to_header(self):
+        """Serializes the layout into bytes for the headers of storages"""
+        return json.dumps({
+            'class': self.cls.__qualname__,
+            'fields': list(self.cls.__fields__),
+            'defining_count': self.cls.__defining_count__,
+            'formats': list(self.formats),
+        }).encode('utf-8')
+
+    @classmethod
+    def from_header(cls, pt_cls, header):
+        """Loads the layout from the header for the given class
+
+        The fields in the header need to match the fields of the class.
+        """
+
+        header = json.loads(bytes(header).decode('utf-8'))
+        if header['fields'] != list(pt_cls.__fields__) or (
+                header['defining_count'] != pt_cls.__defining_count__
+        ):
+            raise ValueError(
+                'The fields {} do not match the fields of class {}'.format(
+                    header['fields'], pt_cls.__name__
+                )
+            )
+        return cls(pt_cls, header['formats'])
+
+
+#
+# Lazy views of the records
+# -------------------------
+#
+
+
+class RecordView(object):
+
+    """Base class for the lazy views of records
+
+    The views behave like the programmable tuple objects they represent for
+    reading the fields, ``_asdict``, hashing and equality. Their ``__class__``
+    is the programmable tuple class, so that they are also considered
+    instances of the class and equal to the objects with the same defining
+    fields. The values are decoded from the buffer only on access.
+    """
+
+    __slots__ = ['_buf', '_offset']
+
+    _layout = None
+
+    def __init__(self, buf, offset):
+        """Initializes the view of the record at the offset of the buffer"""
+        self._buf = buf
+        self._offset = offset
+
+    @property
+    def __class__(self):
+        """The programmable tuple class of the record"""
+        return self._layout.cls
+
+    @property
+    def __content__(self):
+        """The values of all the fields"""
+        return self._layout.unpack_from(self._buf, self._offset)
+
+    @property
+    def __fields__(self):
+        """The fields of the programmable tuple class"""
+        return self._layout.cls.__fields__
+
+    @property
+    def __defining_count__(self):
+        """The number of defining fields of the class"""
+        return self._layout.cls.__defining_count__
+
+    def _materialize(self):
+        """Makes the actual programmable tuple object"""
+        return self._layout.make(self._buf, self._offset)
+
+    def _asdict(self, full=False, class_tags=False):
+        """Returns an dictionary which maps field names to values"""
+        return self._materialize()._asdict(full=full, class_tags=class_tags)
+
+    @property
+    def _defining_values(self):
+        """The values of the defining attributes"""
+        return self.__content__[0:self.__defining_count__]
+
+    def __hash__(self):
+        """The hash, the same as the object"""
+        return hash((self.__class__, ) + self._defining_values)
+
+    def __eq__(self, other):
+        """Equality comparison, the same as the object"""
+        if self.__class__ is not other.__class__:
+            return False
+        return self._defining_values == (
+            other.__content__[0:self.__defining_count__]
+        )
+
+    def __ne__(self, other):
+        """Inequality comparison, the negation of the equality"""
+        return not self.__eq__(other)
+
+    def __repr__(self):
+        """Formats the record as the object"""
+        return repr(self._materialize())
+
+    def __str__(self):
+        """Formats the record as the object"""
+        return str(self._materialize())
+
+
+def _form_view_class(layout):
+    """Forms the view class for the records of the given layout"""
+
+    nmspc = {'__slots__': [], '_layout': layout}
+    for fn, idx in layout.cls.__fields__.items():
+        nmspc[fn] = property(_form_field_reader(layout, idx))
+        continue
+
+    return type(
+        '{}RecordView'.format(layout.cls.__name__), (RecordView, ), nmspc
+    )
+
+
+def _form_field_reader(layout, idx):
+    """Forms the function reading a field from the view"""
+
+    def read(self):
+        """Reads the field from the buffer"""
+        return layout.unpack_field(self._buf, self._offset, idx)
+
+    return read
+
+
+def _align(offset):
+    """Aligns the offset to the next 8-byte boundary"""
+    return -(-offset // 8) * 8
@@ -0,0 +1,217 @@
+"""
+===========================================
+Shared-memory arenas of programmable tuples
+===========================================
+
+A large collection of flat programmable tuples, with only primitive values in
+their fields, can be frozen into a block of shared memory, laid out as the
+fixed binary records of :py:mod:`programmabletuple.records`. Other processes
+attach to the block by its name, and read the objects through lazy views
+without copying the whole collection.
+
+The block starts with the magic bytes ``PTSM``, then the number of records
+and the length of the header as 64-bit unsigned integers, then the header
+serializing the layout. The records follow from the next 8-byte boundary.
+
+"""
+
+
+import struct
+
+try:
+    from multiprocessing import shared_memory
+except ImportError:
+    shared_memory = None
+
+from .records import RecordLayout, _align
+
+
+_MAGIC = b'PTSM'
+
+_PREAMBLE = struct.Struct('<4sQQ')
+
+
+class SharedArena(object):
+
+    """Read-only collection of programmable tuples in shared memory
+
+    The arena is created from the objects by :py:meth:`create` in one process,
+    and attached to by its name through :py:meth:`attach` in the other
+    processes. Indexing the arena gives lazy views of the records, which
+    behave like the objects for reading the fields, ``_asdict``, hashing and
+    equality, and can be materialized into actual objects.
+
+    The arenas can be used as context managers, which closes them on exit.
+    The creator of the arena is responsible for unlinking the block when it
+    is no longer needed by any process.
+    """
+
+    __slots__ = ['_shm', '_layout', '_count', '_start', '_buf']
+
+    def __init__(self, shm, layout, count, start):
+        """Initializes the arena over a shared-memory block
+
+        Normally, :py:meth:`create` or :py:meth:`attach` should be used.
+        """
+        self._shm = shm
+        self._layout = layout
+        self._count = count
+        self._start = start
+        self._buf = shm.buf
+
+    @classmethod
+    def create(cls, pt_cls, objs, formats=None, name=None):
+        """Creates a new arena from the given objects
+
+        :param pt_cls: The programmable tuple class of the objects.
+        :param Iterable objs: The objects to freeze.
+        :param formats: The formats of the fields for the records, see
+            :py:class:`RecordLayout`. By default, they are inferred from the
+            values.
+        :param str name: The name of the shared-memory block, by default a
+            unique name is generated.
+        """
+
+        _check_shared_memory()
+
+        objs = list(objs)
+        for i in objs:
+            if type(i) is not pt_cls:
+                raise ValueError(
+                    'Invalid object {!r} for class {}'.format(
+                        i, pt_cls.__name__
+                    )
+                )
+        if formats is None:
+            layout = RecordLayout.infer(pt_cls, objs)
+        else:
+            layout = RecordLayout(pt_cls, formats)
+
+        header = layout.to_header()
+        start = _align(_PREAMBLE.size + len(header))
+        size = max(1, start + layout.size * len(objs))
+
+        shm = shared_memory.SharedMemory(name=name, create=True, size=size)
+        buf = shm.buf
+        _PREAMBLE.pack_into(buf, 0, _MAGIC, len(objs), len(header))
+        buf[_PREAMBLE.size:_PREAMBLE.size + len(header)] = header
+        pack_into = layout.pack_into
+        for idx, obj in enumerate(objs):
+            pack_into(buf, start + idx * layout.size, obj)
+            continue
+
+        return cls(shm, layout, len(objs), start)
+
+    @classmethod
+    def attach(cls, name, pt_cls):
+        """Attaches to an existing arena by its name
+
+        :param str name: The name of the shared-memory block.
+        :param pt_cls: The programmable tuple class of the records, whose
+            fields need to match the fields of the records in the arena.
+        """
+
+        _check_shared_memory()
+
+        shm = shared_memory.SharedMemory(name=name)
+        try:
+            magic, count, header_len = _PREAMBLE.unpack_from(shm.buf, 0)
+            if magic != _MAGIC:
+                raise ValueError(
+                    'Invalid shared-memory arena {}'.format(name)
+                )
+            header_end = _PREAMBLE.size + header_len
+            layout = RecordLayout.from_header(
+                pt_cls, shm.buf[_PREAMBLE.size:header_end]
+            )
+        except Exception:
+            shm.close()
+            raise
+
+        return cls(shm, layout, count, _align(header_end))
+
+    #
+    # Access of the records
+    #
+
+    @property
+    def name(self):
+        """The name of the shared-memory block"""
+        return self._shm.name
+
+    @property
+    def layout(self):
+        """The layout of the records"""
+        return self._layout
+
+    def __len__(self):
+        """Gets the number of records"""
+        return self._count
+
+    def _get_offset(self, idx):
+        """Gets the offset of the record with the given index"""
+        if idx < 0:
+            idx += self._count
+        if not 0 <= idx < self._count:
+            raise IndexError('Record index out of range')
+        return self._start + idx * self._layout.size
+
+    def __getitem__(self, idx):
+        """Gets the lazy view of the record with the given index"""
+        return self._layout.view(self._buf, self._get_offset(idx))
+
+    def __iter__(self):
+        """Iterates over the lazy views of all the records"""
+        view = self._layout.view
+        buf = self._buf
+        size = self._layout.size
+        for i in range(self._count):
+            yield view(buf, self._start + i * size)
+            continue
+
+    def materialize(self, idx):
+        """Makes the actual object of the record with the given index"""
+        return self._layout.make(self._buf, self._get_offset(idx))
+
+    def materialize_all(self):
+        """Makes the actual objects of all the records"""
+        return [self.materialize(i) for i in range(self._count)]
+
+    #
+    # Life cycle
+    #
+
+    def close(self):
+        """Closes the access to the block from this arena
+
+        The views from this arena can no longer be read afterwards.
+        """
+        self._buf = None
+        self._shm.close()
+
+    def unlink(self):
+        """Requests the block to be destroyed"""
+        self._shm.unlink()
+
+    def __enter__(self):
+        """Enters the context"""
+        return self
+
+    def __exit__(self, *_):
+        """Closes the arena on exit"""
+        self.close()
+
+    def __repr__(self):
+        """Formats the arena"""
+        return '{}({!r}, {} x {})'.format(
+            type(self).__name__, self.name, self._count,
+            self._layout.cls.__name__
+        )
+
+
+def _check_shared_memory():
+    """Checks if shared memory is supported"""
+    if shared_memory is None:
+        raise ImportError(
+            'Shared memory is not supported by this Python'
+        )
@@ -0,0 +1,360 @@
+"""
+===============================================
+Indexed in-memory tables of programmable tuples
+===============================================
+
+Since programmable tuples are immutable, indexes on their fields never go
+stale while the objects are in a table. The :py:class:`ProgrammableTupleTable`
+keeps the objects of a class with hash indexes for equality lookups, and
+sorted indexes for range queries, on chosen fields. Objects are only changed
+by replacing them, through which the indexes of the changed fields are
+maintained.
+
+"""
+
+
+import bisect
+import itertools
+
+from . import ProgrammableTupleMeta
+
+
+class ProgrammableTupleTable(object):
+
+    """In-memory table of programmable tuples with secondary indexes
+
+    The objects are kept in the order of insertion, which is also the order
+    of the results of the queries for the same values.
+    """
+
+    __slots__ = [
+        '_cls',
+        '_rows',
+        '_row_ids',
+        '_next_id',
+        '_hash_indexes',
+        '_sorted_indexes',
+    ]
+
+    def __init__(self, cls, hash_fields=(), sorted_fields=(), objs=()):
+        """Initializes the table
+
+        :param cls: The programmable tuple class of the objects.
+        :param hash_fields: The names of the fields with hash indexes, whose
+            values need to be hashable.
+        :param sorted_fields: The names of the fields with sorted indexes,
+            whose values need to be comparable.
+        :param objs: The initial objects.
+        """
+
+        if not isinstance(cls, ProgrammableTupleMeta):
+            raise ValueError(
+                'Invalid programmable tuple class {}'.format(cls)
+            )
+
+        self._cls = cls
+        self._rows = {}  # From row identifier to object.
+        self._row_ids = {}  # From object identity to row identifiers.
+        self._next_id = 0
+
+        # From field name to its location and its index.
+        self._hash_indexes = {
+            i: (self._get_idx(i), {}) for i in hash_fields
+        }
+        self._sorted_indexes = {
+            i: (self._get_idx(i), []) for i in sorted_fields
+        }
+
+        self.extend(objs)
+
+    def _get_idx(self, field):
+        """Gets the location of a field"""
+        try:
+            return self._cls.__fields__[field]
+        except KeyError:
+            raise ValueError(
+                'Invalid field {} of {}'.format(field, self._cls.__name__)
+            )
+
+    @property
+    def cls(self):
+        """The programmable tuple class of the objects"""
+        return self._cls
+
+    #
+    # Modification
+    #
+
+    def insert(self, obj):
+        """Inserts an object into the table"""
+
+        if type(obj) is not self._cls:
+            raise ValueError(
+                'Invalid object {!r} for class {}'.format(
+                    obj, self._cls.__name__
+                )
+            )
+
+        row_id = self._next_id
+        content = obj.__content__
+        for idx, index in self._hash_indexes.values():
+            index.setdefault(content[idx], {})[row_id] = None
+            continue
+        for idx, index in self._sorted_indexes.values():
+            bisect.insort(index, (content[idx], row_id))
+            continue
+
+        self._next_id += 1
+        self._rows[row_id] = obj
+        self._row_ids.setdefault(id(obj), []).append(row_id)
+
+    def extend(self, objs):
+        """Inserts all the objects into the table"""
+        for obj in objs:
+            self.insert(obj)
+            continue
+
+    def remove(self, obj):
+        """Removes an object from the table
+
+        The object itself is removed when it is in the table. Or the first
+        object equal to it is removed.
+        """
+
+        row_id = self._find_row(obj)
+        content = self._rows[row_id].__content__
+
+        for idx, index in self._hash_indexes.values():
+            self._remove_hashed(index, content[idx], row_id)
+            continue
+        for idx, index in self._sorted_indexes.values():
+            self._remove_sorted(index, content[idx], row_id)
+            continue
+
+        self._remove_row(row_id)
+
+    def update(self, obj, **kwargs):
+        """Updates the defining fields of an object in the table
+
+        The object is replaced by the result of its :py:meth:`_update`
+        method, and only the indexes of the fields whose values are changed
+        are maintained.
+
+        :returns: The updated object.
+        """
+
+        row_id = self._find_row(obj)
+        obj = self._rows[row_id]
+        new_obj = obj._update(**kwargs)
+        self._replace_row(row_id, obj, new_obj)
+        return new_obj
+
+    def _find_row(self, obj):
+        """Finds the identifier of the row of an object"""
+
+        try:
+            return self._row_ids[id(obj)][0]
+        except KeyError:
+            pass
+
+        for row_id in self._gen_candidates({}, obj):
+            if self._rows[row_id] == obj:
+                return row_id
+            continue
+
+        raise KeyError('Object {!r} is not in the table'.format(obj))
+
+    def _replace_row(self, row_id, obj, new_obj):
+        """Replaces the object in a row, updating the changed indexes"""
+
+        content = obj.__content__
+        new_content = new_obj.__content__
+
+        for idx, index in self._hash_indexes.values():
+            old_val, new_val = content[idx], new_content[idx]
+            if old_val is new_val or old_val == new_val:
+                continue
+            self._remove_hashed(index, old_val, row_id)
+            index.setdefault(new_val, {})[row_id] = None
+            continue
+
+        for idx, index in self._sorted_indexes.values():
+            old_val, new_val = content[idx], new_content[idx]
+            if old_val is new_val or old_val == new_val:
+                continue
+            self._remove_sorted(index, old_val, row_id)
+            bisect.insort(index, (new_val, row_id))
+            continue
+
+        self._forget_identity(obj, row_id)
+        self._rows[row_id] = new_obj
+        self._row_ids.setdefault(id(new_obj), []).append(row_id)
+
+    def _remove_row(self, row_id):
+        """Removes the row from the storage of the objects"""
+        self._forget_identity(self._rows.pop(row_id), row_id)
+
+    def _forget_identity(self, obj, row_id):
+        """Forgets the row as holding the object"""
+        row_ids = self._row_ids[id(obj)]
+        row_ids.remove(row_id)
+        if not row_ids:
+            del self._row_ids[id(obj)]
+
+    @staticmethod
+    def _remove_hashed(index, val, row_id):
+        """Removes a row from a hash index"""
+        row_ids = index[val]
+        del row_ids[row_id]
+        if not row_ids:
+            del index[val]
+
+    @staticmethod
+    def _remove_sorted(index, val, row_id):
+        """Removes a row from a sorted index"""
+        pos = bisect.bisect_left(index, (val, row_id))
+        del index[pos]
+
+    #
+    # Queries
+    #
+
+    def __len__(self):
+        """Gets the number of objects in the table"""
+        return len(self._rows)
+
+    def __iter__(self):
+        """Iterates over the objects in the order of insertion"""
+        return iter(list(self._rows.values()))
+
+    def __contains__(self, obj):
+        """Tests if the object, or an equal one, is in the table"""
+        try:
+            self._find_row(obj)
+        except KeyError:
+            return False
+        return True
+
+    def lookup(self, **kwargs):
+        """Looks up the objects with the given values of the fields
+
+        Indexed fields are used to narrow down the candidates, and the rest
+        of the fields are checked for each candidate.
+
+        :returns: The list of the objects in the order of insertion.
+        """
+
+        conditions = [(self._get_idx(fn), val) for fn, val in kwargs.items()]
+        result = []
+        for row_id in self._gen_candidates(kwargs):
+            obj = self._rows[row_id]
+            content = obj.__content__
+            if all(
+                    content[idx] is val or content[idx] == val
+                    for idx, val in conditions
+            ):
+                result.append(obj)
+            continue
+
+        return result
+
+    def range(self, field, low=None, high=None, include_low=True,
+              include_high=False):
+        """Queries the objects with the values of a field in a range
+
+        :param str field: The name of the field with a sorted index.
+        :param low: The lower bound, None for no lower bound.
+        :param high: The upper bound, None for no upper bound.
+        :param bool include_low: If the lower bound is included.
+        :param bool include_high: If the upper bound is included.
+        :returns: The list of the objects sorted by the field, then by the
+            order of insertion.
+        """
+
+        try:
+            _, index = self._sorted_indexes[field]
+        except KeyError:
+            raise ValueError('Field {} has no sorted index'.format(field))
+
+        start, end = _range_bounds(index, low, high, include_low, include_high)
+        return [self._rows[row_id] for _, row_id in index[start:end]]
+
+    def _gen_candidates(self, conditions, obj=None):
+        """Generates the candidate rows for the conditions
+
+        The most selective index among the fields in the conditions is used.
+        For finding the rows of objects equal to an object, its values of the
+        indexed defining fields are used as the conditions.
+        """
+
+        if obj is not None:
+            content = obj.__content__
+            defining_count = self._cls.__defining_count__
+            conditions = {
+                fn: content[idx] for fn, (idx, _) in itertools.chain(
+                    self._hash_indexes.items(), self._sorted_indexes.items()
+                ) if idx < defining_count
+            }
+
+        best = None
+        for fn, val in conditions.items():
+            if fn in self._hash_indexes:
+                _, index = self._hash_indexes[fn]
+                row_ids = index.get(val, ())
+            elif fn in self._sorted_indexes:
+                _, index = self._sorted_indexes[fn]
+                start, end = _range_bounds(index, val, val, True, True)
+                row_ids = [row_id for _, row_id in index[start:end]]
+            else:
+                continue
+            if best is None or len(row_ids) < len(best):
+                best = row_ids
+            continue
+
+        if best is None:
+            return list(self._rows)
+        return sorted(best)
+
+    def __repr__(self):
+        """Formats the table"""
+        return '{}({}, {} rows)'.format(
+            type(self).__name__, self._cls.__name__, len(self._rows)
+        )
+
+
+def _range_bounds(index, low, high, include_low, include_high):
+    """Gets the bounds of the positions in a sorted index for a range"""
+
+    if low is None:
+        start = 0
+    elif include_low:
+        start = bisect.bisect_left(index, (low, ))
+    else:
+        start = bisect.bisect_left(index, (low, _AFTER))
+
+    if high is None:
+        end = len(index)
+    elif include_high:
+        end = bisect.bisect_left(index, (high, _AFTER))
+    else:
+        end = bisect.bisect_left(index, (high, ))
+
+    return start, max(start, end)
+
+
+class _After(object):
+
+    """Value after all the row identifiers in comparison"""
+
+    __slots__ = []
+
+    def __lt__(self, other):
+        """Less than nothing"""
+        return False
+
+    def __gt__(self, other):
+        """Greater than everything"""
+        return True
+
+
+_AFTER = _After()
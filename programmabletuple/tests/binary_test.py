@@ -0,0 +1,92 @@
+"""
+Unit test for the binary serialization of programmable tuples
+"""
+
+
+import io
+import sys
+import unittest
+
+from programmabletuple import ProgrammableExpr
+from programmabletuple.binary import dumps, loads, dump, load
+from programmabletuple.tests.programmabletuple_test import PersonPT, PersonPE
+
+
+class Node(ProgrammableExpr, auto_defining=True):
+
+    """A toy class for trees"""
+
+    __data_fields__ = ['size']
+
+    def __init__(self, label, children):
+        self.size = 1 + sum(i.size for i in children)
+
+
+class BinaryTest(unittest.TestCase):
+
+    """Test suite for the binary serialization"""
+
+    def setUp(self):
+        self.leaf = Node('leaf', ())
+        self.tree = Node('root', (
+            Node('left', (self.leaf, )), Node('right', (self.leaf, ))
+        ))
+        self.classes = [Node, PersonPT, PersonPE]
+
+    def test_values(self):
+        """Tests the round trip of plain values"""
+
+        value = [
+            None, True, False, 0, -1, 2 ** 100, -2 ** 70, 1.5, 'spam',
+            b'\x00\xff', (), (1, (2, )), {'a': [1, 2], 3: None}, {}
+        ]
+        self.assertEqual(loads(dumps(value), []), value)
+        self.assertRaises(TypeError, dumps, {1, 2})
+
+    def test_round_trip(self):
+        """Tests the round trip of programmable tuples"""
+
+        for obj in [self.tree, PersonPT('John', 'Smith', 49),
+                    PersonPE('John', 'Smith', 49)]:
+            for full in [True, False]:
+                data = dumps(obj, full=full)
+                loaded = loads(data, self.classes)
+                self.assertEqual(loaded, obj)
+                self.assertEqual(loaded.__content__, obj.__content__)
+
+            made = loads(dumps(obj), self.classes, make=True)
+            self.assertEqual(made.__content__, obj.__content__)
+
+        self.assertRaises(
+            ValueError, loads, dumps(self.tree, full=False), self.classes,
+            make=True
+        )
+        self.assertRaises(ValueError, loads, dumps(self.tree), [PersonPT])
+
+        # Custom class tags.
+        data = dumps(self.tree, class_tags={Node: 'N'})
+        self.assertEqual(loads(data, {'N': Node}), self.tree)
+
+        fp = io.BytesIO()
+        dump(self.tree, fp)
+        fp.seek(0)
+        self.assertEqual(load(fp, self.classes), self.tree)
+
+    def test_sharing(self):
+        """Tests the back-references for shared objects"""
+
+        loaded = loads(dumps(self.tree), self.classes)
+        left, right = loaded.children
+        self.assertIs(left.children[0], right.children[0])
+
+        # The shared subtree is written only once.
+        data = dumps(self.tree)
+        self.assertEqual(data.count(b'leaf'), 1)
+
+        # Deep trees beyond the recursion limit.
+        chain = self.leaf
+        for _ in range(sys.getrecursionlimit() + 10):
+            chain = Node('link', (chain, ))
+            continue
+        loaded = loads(dumps(chain), self.classes, make=True)
+        self.assertEqual(loaded.size, chain.size)
@@ -0,0 +1,93 @@
+"""
+Unit test for the columnar storage of programmable tuples
+"""
+
+
+import array
+import unittest
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+from programmabletuple.columns import ProgrammableTupleColumns
+from programmabletuple.tests.programmabletuple_test import PersonPT, PersonPE
+
+
+class ColumnsTest(unittest.TestCase):
+
+    """Test suite for the columnar collection"""
+
+    def setUp(self):
+        self.rows = [
+            ('John', 'Smith', 49), ('Doug', 'Smith', 3), ('Andy', 'Johnson', 8)
+        ]
+
+    def _gen_columns(self, **kwargs):
+        """Generates the collections of all the classes"""
+        for cls in [PersonPT, PersonPE]:
+            yield cls, ProgrammableTupleColumns.from_objects(
+                cls, cls._from_rows(self.rows), **kwargs
+            )
+
+    def test_rows(self):
+        """Tests the access of the rows"""
+
+        for cls, columns in self._gen_columns(typecodes={'age': 'q'}):
+            self.assertEqual(len(columns), 3)
+            self.assertIsInstance(columns.column('age'), array.array)
+            self.assertEqual(columns[0], cls('John', 'Smith', 49))
+            self.assertEqual(columns[-1].full_name, 'Johnson, Andy')
+            self.assertEqual(list(columns), cls._from_rows(self.rows))
+            self.assertEqual(
+                list(columns.iter_rows(['first_name', 'age'])),
+                [('John', 49), ('Doug', 3), ('Andy', 8)]
+            )
+
+            extended = columns.extend([cls('Bob', 'Smith', 20)])
+            self.assertEqual(len(extended), 4)
+            self.assertEqual(len(columns), 3)
+            self.assertEqual(extended[3].first_name, 'Bob')
+            self.assertRaises(ValueError, columns.column, 'spam')
+
+    def test_operations(self):
+        """Tests the vectorized operations"""
+
+        for cls, columns in self._gen_columns(typecodes={'age': 'q'}):
+            ages = columns.column('age')
+
+            adults = columns.filter([i > 18 for i in ages])
+            self.assertEqual(list(adults), [cls('John', 'Smith', 49)])
+
+            by_age = columns.sort('age')
+            self.assertEqual(list(by_age.column('age')), [3, 8, 49])
+            by_name = columns.sort('last_name', 'first_name', reverse=True)
+            self.assertEqual(
+                list(by_name.column('first_name')), ['John', 'Doug', 'Andy']
+            )
+            self.assertEqual(list(columns[1:].column('age')), [3, 8])
+
+            projected = columns.project('age', 'first_name')
+            self.assertEqual(list(projected.keys()), ['age', 'first_name'])
+
+    @unittest.skipIf(numpy is None, 'NumPy is not available')
+    def test_numpy(self):
+        """Tests the columns stored as NumPy arrays"""
+
+        for cls, columns in self._gen_columns(
+                typecodes={'age': 'q'}, use_numpy=True
+        ):
+            ages = columns.column('age')
+            self.assertIsInstance(ages, numpy.ndarray)
+            self.assertEqual(columns[0].age, 49)
+            self.assertIs(type(columns[0].age), int)
+
+            adults = columns.filter(ages > 18)
+            self.assertEqual(list(adults), [cls('John', 'Smith', 49)])
+            self.assertEqual(
+                list(columns.sort('age', reverse=True).column('age')),
+                [49, 8, 3]
+            )
+            arrays = columns.to_numpy()
+            self.assertEqual(arrays['first_name'][2], 'Andy')
@@ -0,0 +1,83 @@
+"""
+Unit test for the memory-mapped stores of programmable tuples
+"""
+
+
+import os
+import tempfile
+import unittest
+
+from programmabletuple.mmapstore import MmapStore
+from programmabletuple.tests.programmabletuple_test import (
+    PersonPT, PersonPE, BlobPT
+)
+
+
+class MmapStoreTest(unittest.TestCase):
+
+    """Test suite for the memory-mapped stores"""
+
+    def setUp(self):
+        self.rows = [
+            ('John', 'Smith', 49), ('Doug', 'Smith', 3), ('Andy', 'Johnson', 8)
+        ]
+        self.formats = {
+            'first_name': '16u', 'last_name': '16u', 'age': 'q',
+            'full_name': '40u',
+        }
+        self.dir = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.dir.cleanup()
+
+    def test_append_and_read(self):
+        """Tests appending to the store and reading it back"""
+
+        for cls in [PersonPT, PersonPE]:
+            path = os.path.join(self.dir.name, cls.__name__)
+            people = cls._from_rows(self.rows)
+
+            with MmapStore(path, cls, self.formats) as store:
+                self.assertEqual(len(store), 0)
+                store.append(people[0])
+                self.assertEqual(store[0].first_name, 'John')
+                self.assertEqual(store.extend(people[1:]), 2)
+                self.assertEqual(store[-1].full_name, 'Johnson, Andy')
+                self.assertRaises(
+                    ValueError, store.append, cls('J' * 20, 'Smith', 1)
+                )
+                self.assertEqual(len(store), 3)
+
+            with MmapStore(path, cls, readonly=True) as store:
+                self.assertEqual(len(store), 3)
+                view = store[1]
+                self.assertIsInstance(view, cls)
+                self.assertEqual(view, people[1])
+                self.assertEqual(view._asdict(full=True),
+                                 people[1]._asdict(full=True))
+                self.assertEqual(list(store), people)
+                made = store.materialize(2)
+                self.assertIs(type(made), cls)
+                self.assertEqual(made, people[2])
+                self.assertRaises(IndexError, store.__getitem__, 3)
+                self.assertRaises(ValueError, store.append, people[0])
+
+            with MmapStore(path, cls) as store:
+                store.append(cls('Bob', 'Smith', 20))
+                self.assertEqual(store.materialize_all()[3].age, 20)
+
+            self.assertRaises(ValueError, MmapStore, path, BlobPT)
+            self.assertRaises(
+                ValueError, MmapStore, path, cls,
+                dict(self.formats, age='i')
+            )
+
+    def test_inferred_formats(self):
+        """Tests the formats inferred from the first objects"""
+
+        path = os.path.join(self.dir.name, 'inferred')
+        with MmapStore(path, PersonPT) as store:
+            store.extend(PersonPT._from_rows(self.rows))
+            self.assertEqual(store.layout.formats,
+                             ('4u', '7u', 'q', '13u'))
+            self.assertEqual(store[2].last_name, 'Johnson')
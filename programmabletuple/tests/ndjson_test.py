@@ -0,0 +1,73 @@
+"""
+Unit test for the streaming JSON of programmable tuples
+"""
+
+
+import io
+import json
+import unittest
+
+from programmabletuple import ProgrammableExpr
+from programmabletuple.ndjson import iterencode, dump, load
+from programmabletuple.tests.programmabletuple_test import PersonPT, PersonPE
+
+
+class Couple(ProgrammableExpr, auto_defining=True):
+
+    """A toy class with programmable tuple fields"""
+
+    __data_fields__ = ['names']
+
+    def __init__(self, first, second, since):
+        self.names = [first.first_name, second.first_name]
+
+
+class NDJSONTest(unittest.TestCase):
+
+    """Test suite for the streaming JSON"""
+
+    def setUp(self):
+        self.couple = Couple(
+            PersonPE('John', 'Smith', 49), PersonPT('Jane', 'Smith', 47), 1990
+        )
+        self.class_tags = {
+            Couple: 'Couple', PersonPE: 'PersonPE', PersonPT: 'PersonPT'
+        }
+        self.tags_class = {v: k for k, v in self.class_tags.items()}
+
+    def test_encoding(self):
+        """Tests if the encoding matches the dictionary form"""
+
+        for full in [True, False]:
+            for class_tags in [None, self.class_tags]:
+                self.assertEqual(
+                    ''.join(iterencode(
+                        self.couple, full=full, class_tags=class_tags
+                    )),
+                    json.dumps(self.couple._asdict(
+                        full=full, class_tags=class_tags
+                    ))
+                )
+
+    def test_round_trip(self):
+        """Tests writing and reading NDJSON"""
+
+        couples = [self.couple, self.couple._update(since=2000)]
+
+        for full in [True, False]:
+            fp = io.StringIO()
+            self.assertEqual(dump(
+                couples, fp, full=full, class_tags=self.class_tags
+            ), 2)
+            fp.seek(0)
+            loaded = load(fp, full=full, class_tags=self.tags_class)
+            self.assertEqual(next(loaded), couples[0])
+            self.assertEqual(list(loaded), couples[1:])
+
+        # Records without class tags.
+        fp = io.StringIO()
+        dump([PersonPT('John', 'Smith', 49)], fp)
+        fp.seek(0)
+        self.assertEqual(
+            list(load(fp, PersonPT)), [PersonPT('John', 'Smith', 49)]
+        )
@@ -0,0 +1,51 @@
+"""
+Unit test for the parallel processing of programmable tuples
+"""
+
+
+import unittest
+
+from programmabletuple.parallel import (
+    map_objects, construct_objects, dumps, loads
+)
+from programmabletuple.tests.programmabletuple_test import (
+    PersonPT, PersonPE, BlobPT, _BLOB_INITS
+)
+
+
+def _get_older(person):
+    """Gets the person one year older"""
+    return person._update(age=person.age + 1)
+
+
+class ParallelTest(unittest.TestCase):
+
+    """Test suite for the parallel processing"""
+
+    def setUp(self):
+        self.rows = [('John', 'Smith', i) for i in range(20)]
+
+    def test_transport(self):
+        """Tests the transport of objects by their content"""
+
+        blob = BlobPT('blob', b'spam')
+        del _BLOB_INITS[:]
+        loaded = loads(dumps([blob, {'nested': (blob, )}]))
+        self.assertEqual(loaded, [blob, {'nested': (blob, )}])
+        self.assertEqual(_BLOB_INITS, [])
+
+    def test_construct_and_map(self):
+        """Tests the construction and mapping in a process pool"""
+
+        for cls in [PersonPT, PersonPE]:
+            people = construct_objects(cls, self.rows, max_workers=2)
+            self.assertEqual(people, cls._from_rows(self.rows))
+
+            older = map_objects(_get_older, people, max_workers=2, chunksize=3)
+            self.assertEqual(
+                [i.age for i in older], [i + 1 for i in range(20)]
+            )
+            self.assertEqual(older[0].full_name, 'Smith, John')
+
+        self.assertEqual(map_objects(_get_older, []), [])
+        self.assertRaises(ValueError, construct_objects, dict, self.rows)
@@ -0,0 +1,83 @@
+"""
+Unit test for the structural pattern matching of programmable tuples
+"""
+
+
+import unittest
+
+from programmabletuple.patterns import (
+    Pattern, Wildcard, PatternIndex, match
+)
+from programmabletuple.tests.traversal_test import Num, Add, Neg
+
+
+class PatternsTest(unittest.TestCase):
+
+    """Test suite for the patterns and the pattern index"""
+
+    def setUp(self):
+        self.x = Wildcard('x')
+        self.y = Wildcard('y')
+        self.expr = Add((Neg(Neg(Num(1))), Add((Num(2), Num(2)))))
+
+    def test_match(self):
+        """Tests the matching against single patterns"""
+
+        double_neg = Pattern(Neg, Pattern(Neg, self.x))
+        self.assertEqual(
+            match(double_neg, self.expr.terms[0]), {'x': Num(1)}
+        )
+        self.assertIsNone(double_neg.match(self.expr))
+
+        same = Pattern(Add, terms=(self.x, self.x))
+        self.assertEqual(same.match(self.expr.terms[1]), {'x': Num(2)})
+        self.assertIsNone(same.match(self.expr))
+        self.assertIsNone(same.match(Add((Num(1), Num(2)))))
+
+        small = Pattern(Num, Wildcard('v', predicate=lambda v: v < 2))
+        self.assertEqual(small.match(Num(1)), {'v': 1})
+        self.assertIsNone(small.match(Num(3)))
+        self.assertEqual(Pattern(Num, 1).match(Num(1)), {})
+
+        self.assertRaises(ValueError, Pattern, Num, 1, 2)
+        self.assertRaises(ValueError, Pattern, Num, spam=1)
+        self.assertRaises(ValueError, Pattern, int)
+
+    def test_index(self):
+        """Tests the matching of many patterns by the index"""
+
+        index = PatternIndex([
+            (Pattern(Neg, Pattern(Neg, self.x)), 'double_neg'),
+            (Pattern(Add, terms=(self.x, self.x)), 'double'),
+            (Pattern(Add, (self.x, self.y)), 'binary'),
+            (Pattern(Num, 2), 'two'),
+            (Pattern(Num, [2]), 'list'),
+            (self.x, 'any'),
+        ])
+        for i in range(100):
+            index.add(Pattern(Num, i + 10), 'num')
+            continue
+        self.assertEqual(len(index), 106)
+
+        # Patterns of other classes or values are not even candidates.
+        candidates = index.candidates(Num(2))
+        self.assertEqual([i[2] for i in candidates], ['two', 'any'])
+
+        self.assertEqual(index.match(Add((Num(2), Num(2)))), [
+            ('double', {'x': Num(2)}),
+            ('binary', {'x': Num(2), 'y': Num(2)}),
+            ('any', {'x': Add((Num(2), Num(2)))}),
+        ])
+
+        found = [
+            (node, payload) for node, payload, _ in index.find_all(self.expr)
+            if payload != 'any'
+        ]
+        self.assertEqual(found, [
+            (self.expr, 'binary'),
+            (self.expr.terms[0], 'double_neg'),
+            (self.expr.terms[1], 'double'),
+            (self.expr.terms[1], 'binary'),
+            (Num(2), 'two'),
+            (Num(2), 'two'),
+        ])
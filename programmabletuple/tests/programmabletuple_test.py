@@ -3,10 +3,17 @@ Unit test for the programmable tuple metaclass
 """
 
 
+import gc
+import inspect
+import json
+import pickle
+import sys
 import unittest
 import itertools
 
-from programmabletuple import ProgrammableTuple, ProgrammableExpr
+from programmabletuple import (
+    ProgrammableTuple, ProgrammableExpr, lazy_field, derived_field
+)
 
 
 #
@@ -89,6 +96,57 @@ class PersonPE(ProgrammableExpr):
 
 
 
+_BLOB_INITS = []
+
+
+class BlobPT(ProgrammableTuple, pickle_content=True):
+
+    """A toy class for binary payloads pickled with the content"""
+
+    __data_fields__ = ['size']
+
+    def __init__(self, name, payload):
+        """Initialize a blob with the initializations recorded"""
+        _BLOB_INITS.append(name)
+        self.name = name
+        self.payload = payload
+        self.size = len(payload)
+
+
+class BlobPE(ProgrammableExpr, pickle_content=True):
+
+    """A toy class for binary payloads pickled with the content"""
+
+    __data_fields__ = ['size']
+
+    def __init__(self, name, payload):
+        """Initialize a blob with the initializations recorded"""
+        _BLOB_INITS.append(name)
+        self.name = name
+        self.payload = payload
+        self.size = len(payload)
+
+
+class CallPT(ProgrammableTuple, auto_defining=True):
+
+    """A toy class with all kinds of arguments to the initializer"""
+
+    __data_fields__ = ['n_args']
+
+    def __init__(self, func, scale=2, *args, flag=False, **options):
+        """Initialize a call with the extra arguments counted"""
+        self.n_args = len(args)
+
+
+class TokenPE(ProgrammableExpr, intern=True, pickle_content=True):
+
+    """A toy interned class pickled with the content"""
+
+    def __init__(self, text):
+        """Initialize a token"""
+        self.text = text
+
+
 #
 # Subclass definition
 # ===================
@@ -148,6 +206,22 @@ class ImmutableClassTest(unittest.TestCase):
             self.assertEqual(jsmith.age, 49)
             self.assertEqual(jsmith.full_name, 'Smith, John')
 
+    def test_field_descriptors(self):
+        """Tests the descriptors for the fields in the classes"""
+
+        for cls in [PersonPT, PersonPE, JohnsonsPT, JohnsonsPE]:
+            for fn, idx in cls.__fields__.items():
+                self.assertIsInstance(cls.__dict__[fn], property)
+                continue
+            continue
+
+        # Methods of tuple should not be shadowed by fields.
+        class Counter(ProgrammableTuple, auto_defining=True):
+            def __init__(self, count):
+                pass
+
+        self.assertEqual(Counter(2).count(2), 1)
+
     def test_method(self):
         """Tests if the method defined in the class can be called"""
 
@@ -165,6 +239,55 @@ class ImmutableClassTest(unittest.TestCase):
         self.assertRaises(AttributeError, mutate_pt)
         self.assertRaises(AttributeError, mutate_pe)
 
+    def test_unset_field(self):
+        """Tests the error for fields not set in the initializer"""
+
+        class Incomplete(ProgrammableExpr):
+            __data_fields__ = ['full_name']
+
+            def __init__(self, first_name):
+                self.first_name = first_name
+
+        self.assertRaises(AttributeError, Incomplete, 'John')
+
+    def test_keyword_arguments(self):
+        """Tests construction with keyword arguments"""
+
+        for jsmith in self.jsmiths:
+            person = type(jsmith)(age=49, last_name='Smith', first_name='John')
+            self.assertEqual(person, jsmith)
+            self.assertEqual(person.full_name, 'Smith, John')
+
+    def test_generated_code(self):
+        """Tests the code generated for classes of the same shape"""
+
+        class Point(ProgrammableTuple, auto_defining=True):
+            __data_fields__ = ['norm']
+
+            def __init__(self, x, y=0):
+                self.norm = abs(x) + abs(y)
+
+        class Span(ProgrammableTuple, auto_defining=True):
+            __data_fields__ = ['length']
+
+            def __init__(self, begin, end=0):
+                self.length = end - begin
+
+        point = Point(3, y=-4)
+        span = Span(end=5, begin=2)
+        self.assertEqual((point.x, point.y, point.norm), (3, -4, 7))
+        self.assertEqual((span.begin, span.end, span.length), (2, 5, 3))
+        self.assertEqual(Span(1).length, -1)
+        with self.assertRaisesRegex(TypeError, "'begin'"):
+            Span(end=1)
+
+        # The code is shared, with the names of the fields replaced.
+        point_code = Point.__new__.__code__
+        span_code = Span.__new__.__code__
+        self.assertEqual(point_code.co_code, span_code.co_code)
+        self.assertIn('length', span_code.co_names)
+        self.assertNotIn('norm', span_code.co_names)
+
     def test_subclassing(self):
         """Tests if the subclassing is working properly"""
 
@@ -176,6 +299,103 @@ class ImmutableClassTest(unittest.TestCase):
             self.assertEqual(andy.full_name, 'Johnson, Andy')
             self.assertTrue(andy.is_johnsons())
 
+    def test_lazy_proxy_class(self):
+        """Tests the building of the proxy classes on first construction"""
+
+        for base in [PersonPT, PersonPE]:
+
+            class Kid(base):
+                """A kid named explicitly with the base initializer"""
+
+                def __init__(self, first_name, last_name):
+                    base.__init__(self, first_name, last_name, 5)
+
+            class Baby(Kid):
+                """A baby without its own initializer"""
+                pass
+
+            for cls in [Kid, Baby]:
+                self.assertNotIn('__proxy_class__', cls.__dict__)
+                continue
+            self.assertEqual(
+                list(inspect.signature(Kid).parameters),
+                ['first_name', 'last_name']
+            )
+
+            # Building the subclass builds the base on the way.
+            baby = Baby('Ann', 'Smith')
+            self.assertIn('__proxy_class__', Kid.__dict__)
+            self.assertEqual(baby.age, 5)
+            self.assertEqual(baby.full_name, 'Smith, Ann')
+            self.assertEqual(Kid('Ann', 'Smith'), Kid('Ann', 'Smith'))
+
+            # Pickling constructs the object through the class as well.
+            class Toddler(Kid):
+                """A toddler only ever unpickled"""
+                pass
+
+            self.assertNotIn('__proxy_class__', Toddler.__dict__)
+            self.assertEqual(
+                Toddler.__new__(Toddler, 'Bob', 'Smith').age, 5
+            )
+            continue
+
+    def test_proxy_slots(self):
+        """Tests the slots of the proxy objects for the initialization"""
+
+        seen = []
+
+        class Scratch(ProgrammableExpr, auto_defining=True):
+            def __init__(self, x):
+                seen.append(hasattr(self, '__dict__'))
+                self._tmp = x
+
+        with self.assertRaisesRegex(AttributeError, '_tmp.*proxy_dict'):
+            Scratch(1)
+        self.assertEqual(seen, [False])
+
+        # Attributes not set by the statements are left unexplained.
+        class Indirect(ProgrammableExpr):
+            def __init__(self, x):
+                setattr(self, '_tmp', x)
+
+        with self.assertRaises(AttributeError) as err:
+            Indirect(1)
+        self.assertNotIn('proxy_dict', str(err.exception))
+
+        # Fields read before they are set are not explained by proxy_dict.
+        class Early(ProgrammableExpr):
+            def __init__(self, x):
+                self.x = self.x
+
+        with self.assertRaises(AttributeError) as err:
+            Early(1)
+        self.assertNotIn('proxy_dict', str(err.exception))
+
+        class Loose(ProgrammableExpr, auto_defining=True, proxy_dict=True):
+            __data_fields__ = ['double']
+
+            def __init__(self, x):
+                self._tmp = x
+                self.double = self._tmp * 2
+
+        class Looser(Loose):
+            def __init__(self, x):
+                self.super().__init__(x + 1)
+
+        self.assertEqual(Loose(1).double, 2)
+        self.assertEqual(Looser(1).double, 4)
+
+        # Proxy classes of multiple bases do not conflict in their layouts.
+        class Both(PersonPE, Scratch):
+            def __init__(self, first_name):
+                PersonPE.__init__(self, first_name, 'Smith', 1)
+                self.x = 2
+
+        both = Both('John')
+        self.assertEqual(both.full_name, 'Smith, John')
+        self.assertEqual(both.x, 2)
+
     def test_hashing(self):
         """Tests the correctness of hashing and equality testing"""
 
@@ -208,6 +428,424 @@ class ImmutableClassTest(unittest.TestCase):
             # Continue to the next chunk.
             continue
 
+    def test_equality_shortcuts(self):
+        """Tests the shortcuts in the equality comparison"""
+
+        for cls in [PersonPT, PersonPE]:
+            nan_person = cls('John', 'Smith', float('nan'))
+            self.assertTrue(nan_person == nan_person)
+            self.assertFalse(nan_person != nan_person)
+
+        # Tuples with the same content but of different classes.
+        plain = ('John', 'Smith', 49, 'Smith, John')
+        self.assertTrue(self.jsmith_pt != plain)
+        self.assertFalse(self.jsmith_pt == plain)
+
+    def test_cached_hash(self):
+        """Tests the caching of the hash values"""
+
+        class Node(ProgrammableExpr, auto_defining=True, cache_hash=True):
+            def __init__(self, children):
+                pass
+
+        class SubNode(Node):
+            pass
+
+        leaf = Node(())
+        tree = Node((leaf, leaf))
+        self.assertEqual(hash(tree), hash(Node((Node(()), Node(())))))
+        self.assertEqual(hash(tree), hash(tree))
+        self.assertEqual(tree.__hash_cache__, hash(tree))
+        self.assertNotEqual(tree, Node((leaf, )))
+        self.assertEqual(tree, Node((Node(()), Node(()))))
+        self.assertNotEqual(hash(SubNode(())), hash(leaf))
+
+        # Objects with unhashable fields can still be created.
+        unhashable = Node([])
+        self.assertRaises(TypeError, hash, unhashable)
+
+        # The hash function and equality given in the class are kept.
+        class Folded(ProgrammableExpr, auto_defining=True, cache_hash=True):
+            def __init__(self, name):
+                pass
+
+            def __eq__(self, other):
+                return self.name.lower() == other.name.lower()
+
+            def __hash__(self):
+                return hash(self.name.lower())
+
+        folded = Folded('A')
+        self.assertEqual(folded, Folded('a'))
+        self.assertEqual(hash(folded), hash('a'))
+        self.assertEqual(folded.__hash_cache__, hash('a'))
+
+        def make_cached_eq():
+            class CachedEq(ProgrammableExpr, cache_hash=True):
+                def __eq__(self, other):
+                    return True
+        self.assertRaises(ValueError, make_cached_eq)
+
+        def make_cached_tuple():
+            class Cached(ProgrammableTuple, cache_hash=True):
+                pass
+        self.assertRaises(ValueError, make_cached_tuple)
+
+    def test_memoization(self):
+        """Tests the construction cache"""
+
+        calls = []
+
+        class Parsed(ProgrammableExpr, memoize=2):
+            def __init__(self, text, base=10):
+                calls.append(text)
+                self.text = text
+                self.base = base
+
+        one = Parsed('1')
+        self.assertIs(Parsed('1'), one)
+        self.assertEqual(calls, ['1'])
+        self.assertIs(Parsed('2', base=8), Parsed('2', base=8))
+        self.assertEqual(Parsed._cache_info(), (2, 2, 0, 2, 2))
+
+        Parsed('3')
+        self.assertEqual(Parsed._cache_info().evictions, 1)
+        Parsed('1')
+        self.assertEqual(calls, ['1', '2', '3', '1'])
+
+        unhashable = Parsed([])
+        self.assertIsNot(Parsed([]), unhashable)
+        Parsed._cache_clear()
+        self.assertEqual(Parsed._cache_info(), (0, 0, 0, 2, 0))
+
+        # Keyword arguments are not confused with positional ones.
+        self.assertIsNot(Parsed(('2', ), (('base', 8), )), Parsed('2', base=8))
+
+        class Typed(ProgrammableExpr, memoize=True, memoize_typed=True):
+            def __init__(self, x):
+                self.x = x
+
+        self.assertIs(type(Typed(1).x), int)
+        self.assertIs(type(Typed(1.0).x), float)
+        self.assertIs(Typed(x=1.0), Typed(x=1.0))
+
+        class Timed(ProgrammableExpr, memoize=True, memoize_ttl=10):
+            def __init__(self, x):
+                self.x = x
+
+        now = [0]
+        Timed.__construction_cache__.clock = lambda: now[0]
+        timed = Timed(1)
+        self.assertIs(Timed(1), timed)
+        now[0] = 11
+        self.assertIsNot(Timed(1), timed)
+        self.assertEqual(Timed._cache_info().evictions, 1)
+
+        # Expired objects are evicted when others are cached.
+        now[0] = 30
+        for i in range(5):
+            Timed(i + 2)
+            now[0] += 20
+            continue
+        self.assertEqual(Timed._cache_info().currsize, 1)
+
+        class Plain(Parsed):
+            pass
+        self.assertRaises(ValueError, Plain._cache_info)
+
+    def test_lazy_fields(self):
+        """Tests the lazily computed data fields"""
+
+        calls = []
+
+        class Word(ProgrammableExpr, auto_defining=True):
+            __data_fields__ = ['length']
+
+            def __init__(self, text):
+                self.length = len(self.upper)
+
+            @lazy_field
+            def upper(self):
+                """The upper-case form"""
+                calls.append(self.text)
+                return self.text.upper()
+
+        class SubWord(Word):
+            @lazy_field
+            def lower(self):
+                return self.text.lower()
+
+        word = Word('spam')
+        self.assertEqual(calls, ['spam'])
+        self.assertNotIn('upper', Word.__fields__)
+        self.assertEqual(word.length, 4)
+        self.assertEqual(word.upper, 'SPAM')
+        self.assertEqual(word.upper, 'SPAM')
+        self.assertEqual(calls, ['spam', 'spam'])
+
+        made = word._replace(text='eggs')
+        self.assertEqual(calls, ['spam', 'spam'])
+        self.assertEqual(made.upper, 'EGGS')
+        self.assertEqual(word, Word('spam'))
+
+        sub = SubWord('Ham')
+        self.assertEqual((sub.upper, sub.lower), ('HAM', 'ham'))
+        self.assertRaises(AttributeError, setattr, sub, 'lower', 'x')
+
+        def make_lazy_tuple():
+            class Lazy(ProgrammableTuple):
+                @lazy_field
+                def spam(self):
+                    return 1
+        self.assertRaises(ValueError, make_lazy_tuple)
+
+    def test_derived_fields(self):
+        """Tests the incremental updating with derived fields"""
+
+        calls = []
+
+        for base in [ProgrammableTuple, ProgrammableExpr]:
+
+            class Body(base, auto_defining=True):
+
+                def __init__(self, mass, velocity, name):
+                    calls.append('init')
+
+                @derived_field('mass', 'velocity')
+                def momentum(self):
+                    calls.append('momentum')
+                    return self.mass * self.velocity
+
+                @derived_field('name')
+                def label(self):
+                    calls.append('label')
+                    return self.name.title()
+
+            body = Body(2, 3, 'rock')
+            self.assertEqual((body.momentum, body.label), (6, 'Rock'))
+            self.assertEqual(list(Body.__fields__), [
+                'mass', 'velocity', 'name', 'label', 'momentum'
+            ])
+            del calls[:]
+
+            moved = body._update(velocity=5)
+            self.assertEqual(calls, ['momentum'])
+            self.assertEqual(moved, Body(2, 5, 'rock'))
+            self.assertEqual(moved.momentum, 10)
+            self.assertEqual(moved.label, 'Rock')
+            self.assertRaises(ValueError, body._update, momentum=1)
+            del calls[:]
+            self.assertEqual(
+                Body._update_many([body, moved], columns={'mass': [1, 4]}),
+                [Body(1, 3, 'rock'), Body(4, 5, 'rock')]
+            )
+            # Only the expected objects are initialized.
+            self.assertEqual(calls.count('init'), 2)
+            self.assertEqual(calls.count('label'), 2)
+
+            # Undeclared data fields fall back to the initializer.
+            class Tagged(Body):
+                __data_fields__ = ['tag']
+
+                def __init__(self, mass, velocity, name):
+                    self.super().__init__(mass, velocity, name)
+                    self.tag = name[0]
+
+            del calls[:]
+            tagged = Tagged(1, 1, 'sand')._update(name='dust')
+            self.assertEqual(tagged.tag, 'd')
+            self.assertIn('init', calls)
+            self.assertEqual(tagged.label, 'Dust')
+
+        # Derived fields set by the initializer would not be updated.
+        class Offset(ProgrammableExpr, auto_defining=True):
+            def __init__(self, x):
+                self.v = x + 100
+
+            @derived_field('x')
+            def v(self):
+                return self.x
+
+        self.assertRaises(ValueError, Offset, 1)
+
+        class Unplanned(ProgrammableExpr, auto_defining=True):
+            def __init__(self, x):
+                self.v = x + 100
+
+            @derived_field()
+            def v(self):
+                return self.x
+
+        self.assertEqual(Unplanned(1)._update(x=2).v, 102)
+
+        # Derived fields reading other derived fields get the updated ones.
+        class Rect(ProgrammableExpr, auto_defining=True):
+            def __init__(self, w, h):
+                pass
+
+            @derived_field('w', 'h')
+            def doubled(self):
+                return self.area * 2
+
+            @derived_field('w', 'h')
+            def area(self):
+                return self.w * self.h
+
+        rect = Rect(2, 3)
+        self.assertEqual(rect._update(w=10).doubled, 60)
+        self.assertEqual(
+            [i.doubled for i in Rect._update_many([rect], h=5)], [20]
+        )
+
+        def make_invalid():
+            class Invalid(ProgrammableExpr):
+                def __init__(self, x):
+                    self.x = x
+
+                @derived_field('y')
+                def z(self):
+                    return self.x
+        self.assertRaises(ValueError, make_invalid)
+
+    def test_interning(self):
+        """Tests the interning of objects"""
+
+        calls = []
+
+        class Sym(ProgrammableExpr, intern=True):
+            def __init__(self, name):
+                calls.append(name)
+                self.name = name.lower()
+
+        x = Sym('x')
+        self.assertIs(Sym('x'), x)
+        self.assertIs(Sym(name='x'), x)
+        self.assertEqual(calls, ['x'])
+
+        # Non-canonical arguments are interned after the initialization.
+        self.assertIs(Sym('X'), x)
+        self.assertEqual(calls, ['x', 'X'])
+
+        # Unused objects are not retained.
+        table = Sym.__intern_table__
+        y = Sym('y')
+        self.assertEqual(len(table), 2)
+        del y
+        gc.collect()
+        self.assertEqual(len(table), 1)
+
+        # Equal values of different types are not the same object.
+        class Num(ProgrammableExpr, intern=True, auto_defining=True):
+            def __init__(self, val):
+                pass
+
+        one = Num(1)
+        self.assertIs(Num(1), one)
+        self.assertIs(Num(True).val, True)
+        self.assertIs(Num(1.0).val, 1.0)
+        self.assertIs(Num._make(val=True).val, True)
+        self.assertIs(Num._make(val=1), one)
+
+        # Objects made without the initialization are interned as well.
+        self.assertIs(x._replace(name='x'), x)
+        self.assertIs(Sym._make(name='x'), x)
+        self.assertIs(Sym._from_rows([('x', )], init=False)[0], x)
+
+        # But not with data fields different from the canonical object.
+        class Weighted(ProgrammableExpr, intern=True, auto_defining=True):
+            __data_fields__ = ['weight']
+
+            def __init__(self, name):
+                self.weight = len(name)
+
+        w = Weighted('w')
+        self.assertIs(w._replace(weight=1), w)
+        self.assertRaises(ValueError, w._replace, weight=5)
+        self.assertRaises(ValueError, Weighted._make, name='w', weight=7)
+        self.assertRaises(
+            ValueError, Weighted._make_many, [{'name': 'w', 'weight': 7}]
+        )
+        self.assertEqual(w.weight, 1)
+
+        token = TokenPE('x')
+        self.assertIs(pickle.loads(pickle.dumps(token)), token)
+
+        def make_interned_tuple():
+            class Interned(ProgrammableTuple, intern=True):
+                pass
+        self.assertRaises(ValueError, make_interned_tuple)
+
+    def test_argument_layout(self):
+        """Tests the defining fields from all kinds of arguments"""
+
+        call = CallPT('f', 3, 4, 5, flag=True, spam=1)
+        self.assertEqual(list(CallPT._gen_defining_field_names()), [
+            'func', 'scale', 'args', 'flag'
+        ])
+        self.assertEqual(call._defining_values, ('f', 3, (4, 5), True))
+        self.assertEqual(call.n_args, 2)
+        self.assertEqual(CallPT('f')._defining_values, ('f', 2, (), False))
+        self.assertRaises(TypeError, CallPT)
+        self.assertRaises(TypeError, CallPT, 'f', spam=1, func='g')
+
+        # Reconstruction from the defining fields.
+        self.assertEqual(call._update(scale=1).args, (4, 5))
+        self.assertEqual(call._update(flag=False), CallPT('f', 3, 4, 5))
+        self.assertEqual(CallPT._update_many([call], flag=False)[0].n_args, 2)
+        for protocol in range(2, pickle.HIGHEST_PROTOCOL + 1):
+            self.assertEqual(
+                pickle.loads(pickle.dumps(call, protocol=protocol)), call
+            )
+            continue
+
+        # Interning by the values bound with the defaults.
+        class Node(ProgrammableExpr, auto_defining=True, intern=True):
+            def __init__(self, label, /, weight=1):
+                pass
+
+        node = Node('a')
+        self.assertIs(Node('a', 1), node)
+        self.assertIs(Node('a', weight=1), node)
+        self.assertIsNot(Node('a', 2), node)
+        self.assertEqual(node._update(weight=2), Node('a', 2))
+
+    def test_pickling(self):
+        """Tests the pickling of the objects"""
+
+        for obj in self.jsmiths + [self.ajohnson_pt, self.ajohnson_pe]:
+            self.assertEqual(pickle.loads(pickle.dumps(obj)), obj)
+
+    def test_pickle_content(self):
+        """Tests the pickling of the content without initialization"""
+
+        for cls in [BlobPT, BlobPE]:
+            for payload in [b'spam' * 10, bytearray(b'eggs')]:
+                blob = cls('blob', payload)
+                del _BLOB_INITS[:]
+
+                for protocol in range(2, pickle.HIGHEST_PROTOCOL + 1):
+                    loaded = pickle.loads(pickle.dumps(blob, protocol))
+                    self.assertEqual(loaded, blob)
+                    self.assertIs(type(loaded.payload), type(payload))
+                    self.assertEqual(loaded.size, len(payload))
+                    continue
+
+                # Out-of-band buffers.
+                if pickle.HIGHEST_PROTOCOL >= 5:
+                    buffers = []
+                    data = pickle.dumps(
+                        blob, 5, buffer_callback=buffers.append
+                    )
+                    self.assertEqual(len(buffers), 1)
+                    self.assertNotIn(bytes(payload), data)
+                    loaded = pickle.loads(data, buffers=buffers)
+                    self.assertEqual(loaded.payload, payload)
+                    self.assertIs(type(loaded.payload), type(payload))
+
+                self.assertEqual(_BLOB_INITS, [])
+                continue
+            continue
+
     #
     # Tests of the utilities in the mixin class
     #
@@ -231,6 +869,204 @@ class ImmutableClassTest(unittest.TestCase):
             self.assertEqual(doug_inconsistent.last_name, 'Smith')
             self.assertEqual(doug_inconsistent.full_name, 'Smith, John')
 
+    def test_asdict_shared(self):
+        """Tests the conversion of deep and shared trees to dictionaries"""
+
+        class Node(ProgrammableExpr, auto_defining=True):
+            def __init__(self, left, right):
+                pass
+
+        # A deep chain beyond the recursion limit.
+        chain = None
+        for i in range(sys.getrecursionlimit() + 10):
+            chain = Node(chain, i)
+            continue
+        dict_ = chain._asdict()
+        depth = 0
+        while dict_ is not None:
+            dict_ = dict_['left']
+            depth += 1
+        self.assertEqual(depth, sys.getrecursionlimit() + 10)
+
+        # A diamond, with separate dictionaries for the shared node, unless
+        # it is converted only once by aliasing.
+        leaf = Node(None, None)
+        diamond = Node(Node(leaf, 1), Node(leaf, 2))
+        dict_ = diamond._asdict()
+        self.assertIsNot(dict_['left']['left'], dict_['right']['left'])
+        self.assertEqual(dict_['left']['left'], {'left': None, 'right': None})
+        self.assertEqual(dict_['right']['left'], {'left': None, 'right': None})
+        dict_ = diamond._asdict(alias=True)
+        self.assertIs(dict_['left']['left'], dict_['right']['left'])
+        self.assertEqual(dict_['left']['left'], {'left': None, 'right': None})
+
+        # The reference mode.
+        class_tags = {Node: 'Node'}
+        dict_ = diamond._asdict(class_tags=class_tags, refs=True)
+        self.assertEqual(dict_, {
+            'left': {
+                'left': {
+                    '__id__': 0, 'left': None, 'right': None,
+                    '__class__': 'Node'
+                },
+                'right': 1, '__class__': 'Node'
+            },
+            'right': {
+                'left': {'__ref__': 0}, 'right': 2, '__class__': 'Node'
+            },
+            '__class__': 'Node'
+        })
+
+    def test_load_shared(self):
+        """Tests the loading of deep and shared trees from dictionaries"""
+
+        class Node(ProgrammableExpr, auto_defining=True):
+            def __init__(self, left, right):
+                pass
+
+        class_tags = {Node: 'Node'}
+        tags_class = {'Node': Node}
+
+        # A deep chain beyond the recursion limit.
+        chain = None
+        for i in range(sys.getrecursionlimit() + 10):
+            chain = Node(chain, i)
+            continue
+        loaded = Node._load_from_dict(
+            chain._asdict(class_tags=class_tags), class_tags=tags_class
+        )
+        while chain is not None:
+            self.assertEqual(loaded.right, chain.right)
+            loaded, chain = loaded.left, chain.left
+        self.assertIsNone(loaded)
+
+        # Diamonds, from the shared dictionaries, the references, and
+        # structurally identical dictionaries.
+        leaf = Node(None, 0)
+        diamond = Node(Node(leaf, 1), Node(leaf, 2))
+        for full in [True, False]:
+            for dict_, dedupe in [
+                (diamond._asdict(
+                    full=full, class_tags=class_tags, alias=True
+                ), False),
+                (diamond._asdict(
+                    full=full, class_tags=class_tags, refs=True
+                ), False),
+                (json.loads(json.dumps(
+                    diamond._asdict(full=full, class_tags=class_tags)
+                )), True)
+            ]:
+                loaded = Node._load_from_dict(
+                    dict_, full=full, class_tags=tags_class, dedupe=dedupe
+                )
+                self.assertEqual(loaded, diamond)
+                self.assertIs(loaded.left.left, loaded.right.left)
+
+        # Equal values of different types are not identical, and deep
+        # chains are deduplicated without recursive hashing.
+        loaded = Node._load_from_dict({
+            'left': {'__class__': 'Node', 'left': None, 'right': 1},
+            'right': {'__class__': 'Node', 'left': None, 'right': True}
+        }, class_tags=tags_class, dedupe=True)
+        self.assertIs(loaded.right.right, True)
+        self.assertIsNot(loaded.left, loaded.right)
+        chain = None
+        for i in range(sys.getrecursionlimit() + 10):
+            chain = Node(chain, i)
+            continue
+        loaded = Node._load_from_dict(
+            chain._asdict(class_tags=class_tags), class_tags=tags_class,
+            dedupe=True
+        )
+        self.assertEqual(loaded.right, chain.right)
+
+        self.assertRaises(ValueError, Node._load_from_dict, {
+            'left': {'__ref__': 0}, 'right': None
+        }, class_tags=tags_class)
+
+        # Cyclic references cannot be loaded.
+        self.assertRaises(ValueError, Node._load_from_dict, {
+            '__id__': 0, '__class__': 'Node', 'left': {'__ref__': 0},
+            'right': None
+        }, class_tags=tags_class)
+        self.assertRaises(ValueError, Node._load_from_dict, {
+            '__id__': 0, '__class__': 'Node', 'right': None, 'left': {
+                '__class__': 'Node', 'left': {'__ref__': 0}, 'right': None
+            }
+        }, class_tags=tags_class)
+
+    def test_bulk_construction(self):
+        """Tests the construction of objects in bulk"""
+
+        for jsmith in self.jsmiths:
+            cls = type(jsmith)
+
+            # With the initialization.
+            for rows in [
+                [('John', 'Smith', 49), ('Doug', 'Smith', 3)],
+                [
+                    {'first_name': 'John', 'last_name': 'Smith', 'age': 49},
+                    {'first_name': 'Doug', 'last_name': 'Smith', 'age': 3}
+                ]
+            ]:
+                john, doug = cls._from_rows(rows)
+                self.assertEqual(john, jsmith)
+                self.assertEqual(doug.full_name, 'Smith, Doug')
+
+            # Without the initialization.
+            fields = list(cls.__fields__.keys())
+            content = [getattr(jsmith, i) for i in fields]
+            for rows in [[content], [dict(zip(fields, content))]]:
+                made, = cls._make_many(rows)
+                self.assertEqual(made, jsmith)
+                self.assertEqual(made.full_name, 'Smith, John')
+
+            self.assertEqual(cls._make_many([]), [])
+            self.assertRaises(ValueError, cls._make_many, [content[1:]])
+            self.assertRaises(AttributeError, cls._make_many, [
+                dict(zip(fields[1:], content[1:]))
+            ])
+            self.assertRaises(ValueError, cls._make_many, [
+                dict(zip(fields, content), spam=1)
+            ])
+
+    def test_bulk_replacement(self):
+        """Tests the replacing and updating of fields in bulk"""
+
+        for jsmith in self.jsmiths:
+            cls = type(jsmith)
+            people = [jsmith, cls('Doug', 'Smith', 3)]
+
+            replaced = cls._replace_many(
+                people, columns={'age': [50, 4]}, last_name='Johnson'
+            )
+            self.assertEqual(replaced, [
+                i._replace(age=i.age + 1, last_name='Johnson')
+                for i in people
+            ])
+            self.assertEqual(replaced[1].full_name, 'Smith, Doug')
+
+            updated = cls._update_many(
+                people, columns={'first_name': ['Bob', 'Ann']}, age=20
+            )
+            self.assertEqual(updated, [
+                cls('Bob', 'Smith', 20), cls('Ann', 'Smith', 20)
+            ])
+            self.assertEqual(updated[1].full_name, 'Smith, Ann')
+
+            self.assertRaises(
+                ValueError, cls._update_many, people, full_name='x'
+            )
+            self.assertRaises(ValueError, cls._replace_many, people, spam=1)
+            self.assertRaises(
+                ValueError, cls._replace_many, people, columns={'age': [1]}
+            )
+            self.assertRaises(
+                ValueError, cls._replace_many, people,
+                columns={'age': [1, 2]}, age=3
+            )
+            self.assertRaises(ValueError, cls._replace_many, [1], age=3)
+
     def test_formating(self):
         """Tests the formatting as repr and str"""
 
@@ -0,0 +1,77 @@
+"""
+Unit test for the shared-memory arenas of programmable tuples
+"""
+
+
+import concurrent.futures
+import unittest
+
+from programmabletuple.sharedmem import SharedArena
+from programmabletuple.tests.programmabletuple_test import (
+    PersonPT, PersonPE, BlobPT
+)
+
+
+def _read_ages(name):
+    """Reads the ages from an arena in another process"""
+    with SharedArena.attach(name, PersonPT) as arena:
+        return [i.age for i in arena]
+
+
+class SharedArenaTest(unittest.TestCase):
+
+    """Test suite for the shared-memory arenas"""
+
+    def setUp(self):
+        self.rows = [
+            ('John', 'Smith', 49), ('Doug', 'Smith', 3), ('Andy', 'Johnson', 8)
+        ]
+
+    def test_views(self):
+        """Tests the lazy views of the records"""
+
+        for cls in [PersonPT, PersonPE]:
+            people = cls._from_rows(self.rows)
+            arena = SharedArena.create(cls, people)
+            try:
+                attached = SharedArena.attach(arena.name, cls)
+                self.assertEqual(len(attached), 3)
+
+                view = attached[-1]
+                self.assertEqual(view.first_name, 'Andy')
+                self.assertEqual(view.full_name, 'Johnson, Andy')
+                self.assertIsInstance(view, cls)
+                self.assertEqual(view, people[2])
+                self.assertEqual(people[2], view)
+                self.assertNotEqual(view, people[0])
+                self.assertEqual(hash(view), hash(people[2]))
+                self.assertEqual(view._asdict(), people[2]._asdict())
+                self.assertEqual(list(attached), people)
+
+                made = attached.materialize(0)
+                self.assertIs(type(made), cls)
+                self.assertEqual(made.full_name, 'Smith, John')
+                self.assertRaises(IndexError, attached.__getitem__, 3)
+                attached.close()
+            finally:
+                arena.close()
+                arena.unlink()
+
+        self.assertRaises(
+            ValueError, SharedArena.create, PersonPT, [PersonPE('a', 'b', 1)]
+        )
+
+    def test_attach_from_process(self):
+        """Tests the attachment from another process"""
+
+        people = PersonPT._from_rows(self.rows)
+        with SharedArena.create(PersonPT, people) as arena:
+            try:
+                with concurrent.futures.ProcessPoolExecutor(1) as pool:
+                    ages = pool.submit(_read_ages, arena.name).result()
+                self.assertEqual(ages, [49, 3, 8])
+                self.assertRaises(
+                    ValueError, SharedArena.attach, arena.name, BlobPT
+                )
+            finally:
+                arena.unlink()
@@ -0,0 +1,81 @@
+"""
+Unit test for the indexed tables of programmable tuples
+"""
+
+
+import unittest
+
+from programmabletuple.table import ProgrammableTupleTable
+from programmabletuple.tests.programmabletuple_test import PersonPT, PersonPE
+
+
+class TableTest(unittest.TestCase):
+
+    """Test suite for the indexed tables"""
+
+    def setUp(self):
+        self.rows = [
+            ('John', 'Smith', 49), ('Doug', 'Smith', 3),
+            ('Andy', 'Johnson', 8), ('Ann', 'Smith', 8)
+        ]
+
+    def _gen_tables(self):
+        """Generates the tables of all the classes"""
+        for cls in [PersonPT, PersonPE]:
+            people = cls._from_rows(self.rows)
+            yield people, ProgrammableTupleTable(
+                cls, hash_fields=['last_name', 'full_name'],
+                sorted_fields=['age'], objs=people
+            )
+
+    def test_queries(self):
+        """Tests the lookup and range queries"""
+
+        for people, table in self._gen_tables():
+            john, doug, andy, ann = people
+            self.assertEqual(len(table), 4)
+            self.assertEqual(list(table), people)
+
+            self.assertEqual(
+                table.lookup(last_name='Smith'), [john, doug, ann]
+            )
+            self.assertEqual(table.lookup(last_name='Smith', age=8), [ann])
+            self.assertEqual(table.lookup(first_name='Andy'), [andy])
+            self.assertEqual(table.lookup(full_name='Smith, Doug'), [doug])
+            self.assertEqual(table.lookup(last_name='Brown'), [])
+
+            self.assertEqual(table.range('age', 8), [andy, ann, john])
+            self.assertEqual(table.range('age', 3, 8), [doug])
+            self.assertEqual(
+                table.range('age', 3, 8, include_low=False, include_high=True),
+                [andy, ann]
+            )
+            self.assertEqual(table.range('age', high=4), [doug])
+            self.assertRaises(ValueError, table.range, 'last_name')
+            self.assertRaises(ValueError, table.lookup, spam=1)
+
+    def test_modification(self):
+        """Tests the removal and updating of the objects"""
+
+        for people, table in self._gen_tables():
+            cls = table.cls
+            john, doug, andy, ann = people
+
+            table.remove(cls('Doug', 'Smith', 3))
+            self.assertNotIn(doug, table)
+            self.assertEqual(table.lookup(last_name='Smith'), [john, ann])
+            self.assertEqual(table.range('age', high=8), [])
+            self.assertRaises(KeyError, table.remove, doug)
+
+            older = table.update(ann, age=9, last_name='Brown')
+            self.assertEqual(older.full_name, 'Brown, Ann')
+            self.assertIn(older, table)
+            self.assertEqual(table.lookup(last_name='Smith'), [john])
+            self.assertEqual(table.lookup(full_name='Brown, Ann'), [older])
+            self.assertEqual(table.range('age', 9, 10), [older])
+
+            # The position in the order of insertion is retained.
+            self.assertEqual(list(table), [john, andy, older])
+            renamed = table.update(john, first_name='Jack')
+            self.assertEqual(list(table), [renamed, andy, older])
+            self.assertRaises(ValueError, table.insert, ('a', 'b', 1))
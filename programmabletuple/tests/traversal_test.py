@@ -0,0 +1,154 @@
+"""
+Unit test for the traversal and rewriting of programmable tuple trees
+"""
+
+
+import unittest
+
+from programmabletuple import ProgrammableExpr
+from programmabletuple.traversal import (
+    iter_children, preorder, postorder, rewrite
+)
+
+
+class Num(ProgrammableExpr, auto_defining=True):
+
+    """A toy number expression"""
+
+    def __init__(self, val):
+        pass
+
+
+class Add(ProgrammableExpr, auto_defining=True):
+
+    """A toy sum expression, with the number of nodes as a data field"""
+
+    __data_fields__ = ['size']
+
+    def __init__(self, terms):
+        self.size = 1 + sum(i.size if type(i) is Add else 1 for i in terms)
+
+
+class Neg(ProgrammableExpr, auto_defining=True):
+
+    """A toy negation expression"""
+
+    def __init__(self, arg):
+        pass
+
+
+def _fold_add(node):
+    """Folds sums of numbers"""
+    if type(node) is Add and all(type(i) is Num for i in node.terms):
+        return Num(sum(i.val for i in node.terms))
+    return None
+
+
+def _cancel_neg(node):
+    """Cancels double negations"""
+    if type(node) is Neg and type(node.arg) is Neg:
+        return node.arg.arg
+    return None
+
+
+class TraversalTest(unittest.TestCase):
+
+    """Test suite for the walkers and the rewriting"""
+
+    def setUp(self):
+        self.one = Num(1)
+        self.shared = Add((self.one, Num(2)))
+        self.expr = Add([Neg(Neg(self.shared)), self.shared, Num(3)])
+
+    def test_walkers(self):
+        """Tests the pre-order and post-order walkers"""
+
+        self.assertEqual(len(list(iter_children(self.expr))), 3)
+
+        nodes = list(preorder(self.expr))
+        self.assertIs(nodes[0], self.expr)
+        self.assertEqual(len(nodes), 7)
+        self.assertEqual(len(list(preorder(self.expr, unique=False))), 10)
+
+        nodes = list(postorder(self.expr))
+        self.assertIs(nodes[-1], self.expr)
+        self.assertIs(nodes[0], self.one)
+        self.assertLess(nodes.index(self.shared), nodes.index(self.expr))
+
+        # Deep trees are not limited by the recursion limit.
+        deep = Num(0)
+        for _ in range(5000):
+            deep = Neg(deep)
+        self.assertEqual(len(list(postorder(deep))), 5001)
+
+    def test_rewrite(self):
+        """Tests the bottom-up rewriting"""
+
+        calls = []
+
+        def fold_add(node):
+            calls.append(node)
+            return _fold_add(node)
+
+        for memo in ['identity', 'hash']:
+            del calls[:]
+            result = rewrite(self.expr, [_cancel_neg, fold_add], memo=memo)
+            self.assertEqual(result, Num(9))
+            # The shared sum is folded only once.
+            self.assertEqual(
+                len([i for i in calls if i == self.shared]), 1
+            )
+
+        # Unchanged nodes are kept.
+        self.assertIs(rewrite(self.expr, _cancel_neg).terms[1], self.shared)
+        self.assertIs(rewrite(self.shared, []), self.shared)
+
+        # Data fields are computed again only by updating.
+        to_add = lambda node: Add((node.arg, )) if type(node) is Neg else None
+        updated = rewrite(Add([Neg(Num(1))]), to_add)
+        self.assertEqual(updated.size, 3)
+        made = rewrite(Add([Neg(Num(1))]), to_add, rebuild='make')
+        self.assertEqual(made, updated)
+        self.assertEqual(made.size, 2)
+
+        self.assertRaises(ValueError, rewrite, self.expr, [], memo='spam')
+
+    def test_rewrite_fixpoint(self):
+        """Tests the rewriting by rules giving equal nodes and deep trees"""
+
+        def canonicalize(node):
+            if type(node) is Add:
+                return Add(sorted(node.terms, key=lambda x: x.val))
+            return None
+
+        for memo in ['identity', 'hash']:
+            result = rewrite(Add([Num(2), Num(1)]), canonicalize, memo=memo)
+            self.assertEqual(result, Add([Num(1), Num(2)]))
+            continue
+
+        # Structures are keyed without recursive hashing.
+        deep = Num(0)
+        for _ in range(5000):
+            deep = Neg(deep)
+        self.assertIs(rewrite(deep, [], memo='hash'), deep)
+
+        # Values equal but of different types are different structures.
+        def to_str(node):
+            if type(node) is Num and type(node.val) is not str:
+                return Num(repr(node.val))
+            return None
+
+        result = rewrite(Add([Num(1), Num(True)]), to_str, memo='hash')
+        self.assertEqual(result, Add([Num('1'), Num('True')]))
+
+        # Replacements containing the node itself would never terminate.
+        def negate(node):
+            if type(node) is Num:
+                return Neg(node)
+            return None
+
+        for memo in ['identity', 'hash']:
+            self.assertRaises(
+                ValueError, rewrite, Add([Num(1)]), negate, memo=memo
+            )
+            continue
@@ -0,0 +1,338 @@
+"""
+===================================================
+Traversal and rewriting of programmable tuple trees
+===================================================
+
+Programmable tuples nested in the defining fields of other programmable
+tuples form trees, or directed acyclic graphs when subtrees are shared, like
+the expressions in the Wolfram language. The functions here walk such trees
+and rewrite them bottom-up by rules. The children of a node are the
+programmable tuples in its defining fields, either directly or as elements
+of tuples or lists in the fields.
+
+All the functions work iteratively with explicit stacks, so deep trees are
+not limited by the recursion limit of Python. Shared subtrees are visited
+and transformed only once.
+
+"""
+
+
+from . import ProgrammableTupleMeta
+
+
+#
+# Walkers
+# -------
+#
+
+
+def iter_children(node):
+    """Iterates over the children of a node
+
+    :param node: The programmable tuple object.
+    :returns: An iterator of the programmable tuples in the defining fields,
+        in the order of the fields.
+    """
+
+    for val in node.__content__[0:node.__defining_count__]:
+        if _is_node(val):
+            yield val
+        elif type(val) is tuple or type(val) is list:
+            for i in val:
+                if _is_node(i):
+                    yield i
+                continue
+        continue
+
+
+def preorder(node, unique=True):
+    """Walks a tree in pre-order
+
+    :param node: The root programmable tuple object.
+    :param bool unique: If shared subtrees are walked only at their first
+        occurrence. Otherwise the nodes are given at all their occurrences.
+    :returns: An iterator of the nodes, parents before their children.
+    """
+
+    seen = set()
+    stack = [node]
+    while stack:
+        curr = stack.pop()
+        if unique:
+            if id(curr) in seen:
+                continue
+            seen.add(id(curr))
+        yield curr
+        stack.extend(reversed(list(iter_children(curr))))
+        continue
+
+
+def postorder(node, unique=True):
+    """Walks a tree in post-order
+
+    :param node: The root programmable tuple object.
+    :param bool unique: If shared subtrees are walked only at their first
+        occurrence. Otherwise the nodes are given at all their occurrences.
+    :returns: An iterator of the nodes, children before their parents.
+    """
+
+    seen = set()
+    stack = [(node, False)]
+    while stack:
+        curr, expanded = stack.pop()
+        if expanded:
+            yield curr
+            continue
+        if unique:
+            if id(curr) in seen:
+                continue
+            seen.add(id(curr))
+        stack.append((curr, True))
+        stack.extend(
+            (i, False) for i in reversed(list(iter_children(curr)))
+        )
+        continue
+
+
+#
+# Rewriting
+# ---------
+#
+
+
+def rewrite(node, rules, memo='identity', rebuild='update'):
+    """Rewrites a tree bottom-up by rules
+
+    Each node is handled after all its children have been rewritten. When
+    none of its children is changed, the node itself is kept, or it is
+    rebuilt with the rewritten children. Then the rules are tried on the
+    node in order, and the first replacement given is rewritten again in the
+    same way, until no rule applies. Rules giving replacements forever lead
+    to endless rewriting, except for replacements containing the nodes they
+    replace, which raise ValueError.
+
+    :param node: The root programmable tuple object.
+    :param rules: A rule or a sequence of rules. Each rule is a callable
+        called with a node, returning its replacement, or None when it does
+        not apply.
+    :param str memo: How the nodes that have been rewritten are recognized.
+        With ``identity``, a shared node is rewritten once. With ``hash``,
+        nodes of the same structure as a node rewritten are not rewritten
+        again either. The structure is the classes of the nodes with the
+        values of their defining fields, where other values need to be
+        equal and of the same type. The structures are keyed bottom-up, so
+        deep trees are not hashed or compared recursively.
+    :param str rebuild: How the nodes with changed children are rebuilt. With
+        ``update``, the initialization process is performed by
+        :py:meth:`_update`, so that the data fields are computed again. With
+        ``make``, the fields are replaced directly by :py:meth:`_replace`.
+    :returns: The rewritten tree.
+    """
+
+    if callable(rules):
+        rules = [rules]
+    else:
+        rules = list(rules)
+
+    if memo == 'identity':
+        key = id
+    elif memo == 'hash':
+        key = _StructuralKeys()
+    else:
+        raise ValueError('Invalid memoization {}'.format(memo))
+
+    if rebuild not in ('update', 'make'):
+        raise ValueError('Invalid rebuilding {}'.format(rebuild))
+
+    done = {}  # From the keys of the nodes to their final results.
+    redirects = {}  # From the keys of the nodes to their replacements.
+    alive = []  # Nodes whose identities are used as keys.
+
+    stack = [node]
+    while stack:
+        curr = stack[-1]
+        curr_key = key(curr)
+        if curr_key in done:
+            stack.pop()
+            continue
+
+        # Nodes replaced by rules get the result of their replacement.
+        if curr_key in redirects:
+            replacement = redirects[curr_key]
+            try:
+                done[curr_key] = done[key(replacement)]
+            except KeyError:
+                # The node is met again while its replacement is still
+                # being rewritten, which would never finish.
+                raise ValueError(
+                    'Non-terminating rules, the replacement of {!r} '
+                    'contains the node itself'.format(curr)
+                )
+            stack.pop()
+            continue
+
+        pending = [i for i in iter_children(curr) if key(i) not in done]
+        if pending:
+            stack.extend(reversed(pending))
+            continue
+
+        rebuilt = _rebuild(curr, done, key, rebuild)
+        result = _apply_rules(rebuilt, rules)
+
+        alive.append(curr)
+        if result is None:
+            done[curr_key] = rebuilt
+            alive.append(rebuilt)
+            done.setdefault(key(rebuilt), rebuilt)
+            stack.pop()
+        else:
+            alive.append(result)
+            result_key = key(result)
+            if result_key == curr_key:
+                # An equal node by structure is given back.
+                done[curr_key] = result
+                stack.pop()
+            elif result_key in done:
+                done[curr_key] = done[result_key]
+                stack.pop()
+            else:
+                redirects[curr_key] = result
+                stack.append(result)
+
+        continue
+
+    return done[key(node)]
+
+
+def _rebuild(node, done, key, rebuild):
+    """Rebuilds a node with its rewritten children
+
+    :returns: The node itself when none of its children is changed.
+    """
+
+    changes = {}
+    for fn, val in zip(
+            node._gen_defining_field_names(),
+            node.__content__[0:node.__defining_count__]
+    ):
+        if _is_node(val):
+            new_val = done[key(val)]
+            if new_val is not val:
+                changes[fn] = new_val
+        elif type(val) is tuple or type(val) is list:
+            new_elems = [
+                done[key(i)] if _is_node(i) else i for i in val
+            ]
+            if any(i is not j for i, j in zip(new_elems, val)):
+                changes[fn] = type(val)(new_elems)
+        continue
+
+    if not changes:
+        return node
+    elif rebuild == 'update':
+        return node._update(**changes)
+    else:
+        return node._replace(**changes)
+
+
+def _apply_rules(node, rules):
+    """Applies the first applicable rule to a node
+
+    :returns: The replacement, or None when no rule gives a different node.
+        Replacements equal to the node are not taken as different, so that
+        rules giving canonical forms reach a fixpoint.
+    """
+
+    for rule in rules:
+        result = rule(node)
+        if result is not None and result is not node and not (
+                result == node
+        ):
+            return result
+        continue
+
+    return None
+
+
+def _is_node(val):
+    """Tests if a value is a programmable tuple"""
+    return isinstance(type(val), ProgrammableTupleMeta)
+
+
+_UNHASHABLE = object()
+
+
+class _StructuralKeys(object):
+
+    """Structural keys of nodes for the memoization by hash
+
+    Nodes of the same structure are given the same integer, which is
+    assigned bottom-up from the class of each node and the keys of the
+    values of its defining fields, where children are keyed by their
+    integers. So each node is keyed once, without hashing or comparing its
+    subtrees. Other values are keyed by their types and themselves, or by
+    their identities when they are unhashable.
+    """
+
+    __slots__ = ['_keys', '_table', '_alive']
+
+    def __init__(self):
+        """Initializes the empty keys"""
+        self._keys = {}  # From the identities of the nodes to their keys.
+        self._table = {}  # From the structures to their keys.
+        self._alive = []  # Objects whose identities are used in keys.
+
+    def __call__(self, node):
+        """Gets the key of a node"""
+
+        keys = self._keys
+        try:
+            return keys[id(node)]
+        except KeyError:
+            pass
+
+        stack = [node]
+        while stack:
+            curr = stack[-1]
+            if id(curr) in keys:
+                stack.pop()
+                continue
+            pending = [i for i in iter_children(curr) if id(i) not in keys]
+            if pending:
+                stack.extend(pending)
+                continue
+
+            structure = (type(curr), tuple(
+                self._key_value(i)
+                for i in curr.__content__[0:curr.__defining_count__]
+            ))
+            keys[id(curr)] = self._table.setdefault(
+                structure, len(self._table)
+            )
+            self._alive.append(curr)
+            stack.pop()
+            continue
+
+        return keys[id(node)]
+
+    def _key_value(self, val):
+        """Keys a value in a defining field, with its children keyed"""
+
+        if _is_node(val):
+            return self._keys[id(val)]
+        elif type(val) is tuple or type(val) is list:
+            return type(val), tuple(
+                self._keys[id(i)] if _is_node(i) else self._key_leaf(i)
+                for i in val
+            )
+        return self._key_leaf(val)
+
+    def _key_leaf(self, val):
+        """Keys a value other than the children"""
+        key = (type(val), val)
+        try:
+            hash(key)
+        except TypeError:
+            self._alive.append(val)
+            return _UNHASHABLE, id(val)
+        return key
@@ -3,7 +3,7 @@
 from setuptools import setup
 
 setup(name='programmabletuple',
-      version='0.5.0',
+      version='0.6.0',
       description='Python metaclass for making named tuples with programmability',
       long_description=open('README.rst').read(),
       author='Tschijnmo TSCHAU',
@@ -11,10 +11,12 @@ setup(name='programmabletuple',
       url='https://github.com/tschijnmo/programmabletuple',
       license='MIT',
       packages=['programmabletuple', ],
+      python_requires='>=3.8',
       classifiers=[
         'License :: OSI Approved :: MIT License',
         'Programming Language :: Python',
         'Programming Language :: Python :: 3',
+        'Programming Language :: Python :: 3 :: Only',
         'Topic :: Software Development :: Libraries :: Python Modules',
         ],
      )